@@ -35,6 +35,7 @@ class CMD(object):
     BAN = ["ban", f"ban@{bot}"]
     AUTH = ["auth", f"auth@{bot}"]
     LOG = ["log", f"log@{bot}"]
+    FILECACHE = ["filecache", f"filecache@{bot}"]
     UPLOADERSETTINGS = ["uploadersettings", f"uploadersettings@{bot}"]
 
 cmd = CMD()
@@ -17,6 +17,7 @@ from config import Config
 from bot.logger import LOGGER
 from . import bot_loop
 from .tgclient import Bot
+from .helpers.rclone_rc import rclone_rc, RcloneError
 
 async def main():
     # Ensure download directory exists
@@ -48,6 +49,13 @@ async def main():
     await aio.start()
     LOGGER.info("Bot Started!")
 
+    # Warm up the rclone daemon so the first upload doesn't wait for it
+    if rclone_rc.available():
+        try:
+            await rclone_rc.start()
+        except RcloneError as e:
+            LOGGER.warning(f"rclone rcd unavailable, using the rclone CLI: {e}")
+
     # Keep the main coroutine alive to listen for tasks
     await asyncio.Event().wait()
 
@@ -60,5 +68,10 @@ if __name__ == "__main__":
     except Exception as e:
         LOGGER.error(f"Bot exited with an error: {e}", exc_info=True)
     finally:
+        # Don't leave the rclone rcd child (and its client session) behind
+        try:
+            bot_loop.run_until_complete(rclone_rc.stop())
+        except Exception as e:
+            LOGGER.error(f"Failed to stop rclone rcd: {e}")
         bot_loop.stop()
         LOGGER.info("Bot event loop stopped.")
@@ -0,0 +1,295 @@
+import os
+import asyncio
+import zipfile
+
+from typing import Callable, Optional
+
+from ..logger import LOGGER
+
+
+# Only these are worth compressing; audio/video/everything else is stored as-is
+DEFLATE_EXTENSIONS = {
+    '.txt', '.lrc', '.ttml', '.json', '.nfo', '.cue', '.log', '.m3u', '.m3u8', '.xml', '.csv',
+    '.jpg', '.jpeg', '.png', '.webp', '.bmp', '.gif',
+}
+COPY_BUFFER = 1024 * 1024  # 1 MiB reads/writes
+WRITE_BUFFER = 8 * 1024 * 1024
+
+# Upper bounds of zip structure overhead (zip64 extras included), used to
+# decide split points before a file is written
+_LOCAL_HEADER = 30 + 20
+_CENTRAL_HEADER = 46 + 28
+_END_RECORDS = 22 + 56 + 20
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class ArchiveCancelled(Exception):
+    pass
+
+
+def compression_for(path: str) -> int:
+    """STORED for media (already compressed), DEFLATED for text and images."""
+    ext = os.path.splitext(path)[1].lower()
+    return zipfile.ZIP_DEFLATED if ext in DEFLATE_EXTENSIONS else zipfile.ZIP_STORED
+
+
+def list_files(folderpath: str) -> list:
+    """Return (file_path, arcname, size) for every file below folderpath."""
+    entries = []
+    for root, _, files in os.walk(folderpath):
+        for file in files:
+            file_path = os.path.join(root, file)
+            try:
+                size = os.path.getsize(file_path)
+            except OSError:
+                continue
+            entries.append((file_path, os.path.relpath(file_path, folderpath), size))
+    return entries
+
+
+def _entry_bound(arcname: str, size: int, compress_type: int) -> int:
+    """Largest number of bytes a file can add to the archive body."""
+    name_len = len(arcname.encode('utf-8'))
+    data = size
+    if compress_type == zipfile.ZIP_DEFLATED:
+        # deflate worst case: stored blocks, 5 bytes per 16 KiB + stream overhead
+        data = size + (size // 16384 + 1) * 5 + 64
+    return _LOCAL_HEADER + name_len + data
+
+
+def _central_bound(arcname: str) -> int:
+    return _CENTRAL_HEADER + len(arcname.encode('utf-8'))
+
+
+class _Writer:
+    """Write entries to one zip file with large buffered I/O and byte progress."""
+
+    def __init__(self, zip_path: str):
+        self.zip_path = zip_path
+        self._fh = open(zip_path, 'wb', buffering=WRITE_BUFFER)
+        self._zipf = zipfile.ZipFile(self._fh, 'w', allowZip64=True)
+        self.central_size = _END_RECORDS
+        self.count = 0
+
+    def tell(self) -> int:
+        return self._fh.tell()
+
+    def add(self, file_path: str, arcname: str, size: int, on_bytes: Callable[[int], None],
+            cancel_event: Optional[asyncio.Event]):
+        zinfo = zipfile.ZipInfo.from_file(file_path, arcname)
+        zinfo.compress_type = compression_for(file_path)
+        with open(file_path, 'rb') as src, self._zipf.open(zinfo, 'w') as dst:
+            while True:
+                if cancel_event and cancel_event.is_set():
+                    raise ArchiveCancelled()
+                chunk = src.read(COPY_BUFFER)
+                if not chunk:
+                    break
+                dst.write(chunk)
+                on_bytes(len(chunk))
+        self.central_size += _central_bound(arcname)
+        self.count += 1
+
+    def close(self) -> int:
+        self._zipf.close()
+        self._fh.close()
+        return os.path.getsize(self.zip_path)
+
+    def abort(self):
+        try:
+            self._zipf.close()
+        except Exception:
+            pass
+        try:
+            self._fh.close()
+        except Exception:
+            pass
+        try:
+            os.remove(self.zip_path)
+        except OSError:
+            pass
+
+
+def iter_archive(folderpath: str, zip_path: str, max_size: Optional[int] = None, delete_sources: bool = False,
+                 progress: Optional[ProgressCallback] = None, cancel_event: Optional[asyncio.Event] = None):
+    """
+    Zip a folder, optionally split into parts no larger than max_size,
+    yielding each part as soon as it is complete. The next part is only
+    written when the consumer asks for it.
+    Split points come from the real position in the archive being written
+    plus an upper bound for the next entry and the central directory, so a
+    part never overshoots max_size (unless a single file alone is larger).
+    Args:
+        folderpath: Folder to archive
+        zip_path: Path of the first part; later parts are named <base>.partN.zip
+        max_size: Maximum part size in bytes, None for a single archive
+        delete_sources: Remove each source file once its part is complete
+        progress: Called as progress(done_bytes, total_bytes) from the writing thread
+        cancel_event: Optional asyncio.Event to signal cancellation
+    Yields:
+        Archive part paths
+    """
+    entries = list_files(folderpath)
+    total = sum(size for _, _, size in entries)
+    done = 0
+
+    def on_bytes(n):
+        nonlocal done
+        done += n
+        if progress:
+            progress(done, total)
+
+    base = zip_path[:-4] if zip_path.endswith('.zip') else zip_path
+    part_num = 1
+    part_sources = []
+
+    def finish_part(writer) -> str:
+        size = writer.close()
+        if max_size and size > max_size:
+            LOGGER.warning(f"Archive part {writer.zip_path} is {size} bytes, above the {max_size} limit (single large file)")
+        if delete_sources:
+            for src in part_sources:
+                try:
+                    os.remove(src)
+                except OSError:
+                    pass
+        part_sources.clear()
+        return writer.zip_path
+
+    writer = _Writer(zip_path)
+    try:
+        for file_path, arcname, size in entries:
+            if max_size and writer.count:
+                needed = writer.tell() + _entry_bound(arcname, size, compression_for(file_path)) \
+                    + writer.central_size + _central_bound(arcname)
+                if needed > max_size:
+                    path = finish_part(writer)
+                    writer = None
+                    yield path
+                    part_num += 1
+                    writer = _Writer(f"{base}.part{part_num}.zip")
+            writer.add(file_path, arcname, size, on_bytes, cancel_event)
+            part_sources.append(file_path)
+        path = finish_part(writer)
+        writer = None
+        yield path
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        raise
+
+
+def write_archive(folderpath: str, zip_path: str, max_size: Optional[int] = None, delete_sources: bool = False,
+                  progress: Optional[ProgressCallback] = None, cancel_event: Optional[asyncio.Event] = None) -> list:
+    """
+    Build every part of the archive (see iter_archive).
+    Returns:
+        List of archive paths
+    """
+    paths = []
+    try:
+        for path in iter_archive(folderpath, zip_path, max_size, delete_sources, progress, cancel_event):
+            paths.append(path)
+    except BaseException:
+        # Finished parts are the only copy once their sources are deleted
+        if not delete_sources:
+            for p in paths:
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+        raise
+    return paths
+
+
+def _thread_progress(progress, loop):
+    """Adapt a ProgressReporter to the (done_bytes, total_bytes) callback used in worker threads."""
+    if not progress:
+        return None
+
+    def callback(done, total):
+        if progress.should_update() or done == total:
+            asyncio.run_coroutine_threadsafe(progress.update_zip(done, total), loop)
+
+    return callback
+
+
+class _StopFlag:
+    """Cancellation flag for the writing thread: the task's cancel_event or a local stop."""
+
+    def __init__(self, cancel_event: Optional[asyncio.Event] = None):
+        self.cancel_event = cancel_event
+        self.stopped = False
+
+    def is_set(self) -> bool:
+        return self.stopped or bool(self.cancel_event and self.cancel_event.is_set())
+
+
+class ArchiveParts:
+    """
+    Zip parts of a folder built one at a time for upload.
+    Iterating with `async for` writes a part, hands it to the loop body and
+    deletes it before the next part is written. Source files are removed as
+    soon as their part is complete, so the extra disk needed is one part
+    rather than a second copy of the whole folder.
+    """
+
+    def __init__(self, folderpath: str, zip_path: Optional[str] = None, max_size: Optional[int] = None,
+                 progress=None, cancel_event: Optional[asyncio.Event] = None):
+        self.folderpath = folderpath
+        self.zip_path = zip_path or f"{folderpath}.zip"
+        self.max_size = max_size
+        self.progress = progress
+        self.cancel_event = cancel_event
+        self.current: Optional[str] = None
+
+    async def __aiter__(self):
+        callback = _thread_progress(self.progress, asyncio.get_running_loop())
+        stop = _StopFlag(self.cancel_event)
+        parts = iter_archive(self.folderpath, self.zip_path, self.max_size, True, callback, stop)
+        pending = None
+        try:
+            while True:
+                if self.progress:
+                    await self.progress.set_stage("Zipping")
+                pending = asyncio.ensure_future(asyncio.to_thread(next, parts, None))
+                try:
+                    # Shielded so a cancelled task can still wait for the thread below
+                    path = await asyncio.shield(pending)
+                except ArchiveCancelled:
+                    raise asyncio.CancelledError()
+                pending = None
+                if path is None:
+                    break
+                self.current = path
+                try:
+                    yield path
+                finally:
+                    self.discard()
+        finally:
+            if pending is not None:
+                # Cancelled while a part was being written: stop the thread and
+                # let it finish, the generator cannot be closed while it runs
+                stop.stopped = True
+                try:
+                    await asyncio.wait([pending])
+                except asyncio.CancelledError:
+                    pass
+                if pending.done() and not pending.cancelled() and pending.exception() is None:
+                    self.current = pending.result()
+                    self.discard()
+            try:
+                parts.close()
+            except ValueError:
+                # Still running after a second cancel; it stops at its next chunk
+                pass
+
+    def discard(self):
+        """Remove the part currently on disk, if any."""
+        if self.current:
+            try:
+                os.remove(self.current)
+            except OSError:
+                pass
+            self.current = None
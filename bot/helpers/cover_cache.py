@@ -0,0 +1,157 @@
+import os
+import time
+import shutil
+import asyncio
+import hashlib
+
+from collections import OrderedDict
+
+from config import Config
+from ..logger import LOGGER
+from .http_client import download_file
+
+
+class CoverCache:
+    """
+    Persistent on-disk cache for cover art and thumbnails, shared by every provider.
+    Files are keyed by a hash of the source URL, written atomically, and
+    evicted least-recently-used once the cache grows past max_bytes.
+    Callers get a hard link (or copy) of the cached file, so the per-request
+    cleanup that deletes covers never touches the cache itself.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._index: OrderedDict[str, int] = OrderedDict()  # path -> size, oldest first
+        self._size = 0
+        self._loaded = False
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def stats(self) -> dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'files': len(self._index),
+            'bytes': self._size,
+        }
+
+    def _load(self):
+        """Index files left from earlier runs, least recently used first."""
+        if self._loaded:
+            return
+        self._loaded = True
+        os.makedirs(self.root, exist_ok=True)
+        entries = []
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith('.part'):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, path, st.st_size))
+        for _, path, size in sorted(entries):
+            self._index[path] = size
+            self._size += size
+
+    def _path_for(self, key: str, ext: str) -> str:
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.root, digest[:2], digest + ext)
+
+    @staticmethod
+    def _ext(url: str) -> str:
+        ext = os.path.splitext(url.split('?', 1)[0])[1].lower()
+        return ext if ext in ('.jpg', '.jpeg', '.png', '.webp') else '.jpg'
+
+    def _touch(self, path: str):
+        self._index.move_to_end(path)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _add(self, path: str):
+        size = os.path.getsize(path)
+        self._size += size - self._index.get(path, 0)
+        self._index[path] = size
+        self._index.move_to_end(path)
+        while self._size > self.max_bytes and len(self._index) > 1:
+            old, old_size = self._index.popitem(last=False)
+            self._size -= old_size
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+    def _lookup(self, path: str) -> bool:
+        if path in self._index:
+            if os.path.exists(path):
+                self._touch(path)
+                return True
+            self._size -= self._index.pop(path)
+        return False
+
+    async def get(self, url: str) -> str | None:
+        """Return the cached path for url, downloading it once on a miss."""
+        if not url:
+            return None
+        await asyncio.to_thread(self._load)
+        path = self._path_for(url, self._ext(url))
+        if self._lookup(path):
+            self.hits += 1
+            return path
+
+        # Concurrent requests for the same image share one download
+        if path in self._inflight:
+            self.hits += 1
+            return await self._inflight[path]
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[path] = future
+        result = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{time.monotonic_ns()}.part"
+            err = await download_file(url, tmp, 1, 5)
+            if err:
+                LOGGER.debug(f"Cover download failed for {url}: {err}")
+            else:
+                os.replace(tmp, path)
+                self._add(path)
+                result = path
+        finally:
+            future.set_result(result)
+            del self._inflight[path]
+        return result
+
+    @staticmethod
+    def link(src: str, dest: str):
+        """Hard link src to dest (copy across filesystems), replacing dest atomically."""
+        os.makedirs(os.path.dirname(dest) or '.', exist_ok=True)
+        tmp = f"{dest}.{os.getpid()}.{time.monotonic_ns()}.part"
+        try:
+            os.link(src, tmp)
+        except OSError:
+            shutil.copyfile(src, tmp)
+        os.replace(tmp, dest)
+
+    async def fetch_to(self, url: str, dest: str) -> bool:
+        """Place the image at url on dest through the cache. Returns False on failure."""
+        path = await self.get(url)
+        if not path:
+            return False
+        try:
+            await asyncio.to_thread(self.link, path, dest)
+            return True
+        except OSError as e:
+            LOGGER.debug(f"Could not place cached cover at {dest}: {e}")
+            return False
+
+
+cover_cache = CoverCache(Config.COVER_CACHE_DIR, Config.COVER_CACHE_SIZE_MB * 1024 * 1024)
@@ -0,0 +1,33 @@
+# bot/helpers/database/async_repo.py
+# Awaitable facade over the synchronous repositories. Every call runs on a
+# bounded thread pool sized to the database connection pool, so coroutines
+# never block the Pyrogram event loop on psycopg2/pymongo I/O.
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+
+class AsyncRepo:
+    """Wrap a repository so each public method returns an awaitable.
+
+    Example:
+        history = await async_download_history.get_user_history(user_id)
+    """
+
+    def __init__(self, repo: Any, executor: ThreadPoolExecutor):
+        self._repo = repo
+        self._executor = executor
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._repo, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def _call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(attr, *args, **kwargs))
+
+        return _call
@@ -14,6 +14,21 @@ class AbstractSettingsRepo(ABC):
     def get_variable(self, var_name: str) -> Tuple[Optional[Any], Optional[bytes]]:
         raise NotImplementedError
 
+    @abstractmethod
+    def get_all_variables(self) -> Dict[str, Tuple[Optional[Any], Optional[bytes]]]:
+        """Load every setting in one query, keyed by var_name."""
+        raise NotImplementedError
+
+    def set_variables(self, items: List[Tuple[str, Any, bool, Optional[bytes]]]) -> None:
+        """Apply several (var_name, var_value, update_blob, blob_val) writes.
+        Backends override this to use a single round-trip."""
+        for var_name, var_value, update_blob, blob_val in items:
+            self.set_variable(var_name, var_value, update_blob, blob_val)
+
+    def normalize_value(self, var_value: Any) -> Any:
+        """Return var_value the way get_variable would read it back after a write."""
+        return var_value
+
 class AbstractHistoryRepo(ABC):
     """Abstract repository for download history."""
 
@@ -53,6 +68,61 @@ class AbstractRcloneSessionsRepo(ABC):
     def delete_session(self, token: str) -> None:
         raise NotImplementedError
 
+class AbstractQueueRepo(ABC):
+    """Abstract repository for persisted download queue jobs."""
+
+    @abstractmethod
+    def save_job(self, qid: str, user_id: int, link: str, options: Dict[str, Any], context: Dict[str, Any], priority: int = 0) -> None:
+        """Insert a queued job (or overwrite it if the qid already exists)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_job(self, qid: str, status: Optional[str] = None, stage: Optional[str] = None, task_id: Optional[str] = None) -> None:
+        """Update the lifecycle fields of a job; None leaves a field unchanged."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_job(self, qid: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_jobs(self) -> List[Dict[str, Any]]:
+        """Return all persisted jobs, oldest first."""
+        raise NotImplementedError
+
+class AbstractFileCacheRepo(ABC):
+    """Abstract repository for Telegram file_ids of already uploaded content."""
+
+    @abstractmethod
+    def get_files(self, provider: str, content_id: str, quality: str) -> List[Dict[str, Any]]:
+        """Return the cached files of a content (track_id, file_id, kind, caption, file_size) in send order."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_files(self, provider: str, content_id: str, quality: str, files: List[Dict[str, Any]]) -> None:
+        """Replace the cached files of a content."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def touch(self, provider: str, content_id: str, quality: str) -> None:
+        """Count a hit and mark the content as recently used."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, provider: Optional[str] = None, content_id: Optional[str] = None) -> int:
+        """Drop cached files (all of them when no filter is given). Returns the number removed."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def trim(self, max_files: int) -> int:
+        """Drop least recently used contents until at most max_files remain. Returns the number removed."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Return totals: contents, files, bytes, hits."""
+        raise NotImplementedError
+
 class DatabaseInterface(ABC):
     """Abstract interface for the entire database backend."""
 
@@ -61,6 +131,8 @@ class DatabaseInterface(ABC):
         self.history: AbstractHistoryRepo = None
         self.user_settings: AbstractUserSettingsRepo = None
         self.rclone_sessions: AbstractRcloneSessionsRepo = None
+        self.queue: AbstractQueueRepo = None
+        self.file_cache: AbstractFileCacheRepo = None
 
     @abstractmethod
     def connect(self, db_url: str, **kwargs) -> None:
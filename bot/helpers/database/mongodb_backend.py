@@ -5,9 +5,11 @@ from .interface import (
     AbstractHistoryRepo,
     AbstractUserSettingsRepo,
     AbstractRcloneSessionsRepo,
+    AbstractQueueRepo,
+    AbstractFileCacheRepo,
     DatabaseInterface
 )
-from pymongo import MongoClient, ASCENDING
+from pymongo import MongoClient, ASCENDING, UpdateOne
 from pymongo.collection import Collection
 from pymongo.errors import DuplicateKeyError
 import datetime
@@ -19,6 +21,11 @@ class MongoSettingsRepo(AbstractSettingsRepo):
         self._collection.create_index("var_name", unique=True)
 
     def set_variable(self, var_name: str, var_value: Any, update_blob: bool = False, blob_val: Optional[bytes] = None) -> None:
+        doc = self._doc(var_name, var_value, update_blob, blob_val)
+        self._collection.update_one({"var_name": var_name}, {"$set": doc}, upsert=True)
+
+    @staticmethod
+    def _doc(var_name: str, var_value: Any, update_blob: bool, blob_val: Optional[bytes]) -> Dict[str, Any]:
         vtype = "str"
         if isinstance(var_value, bool):
             vtype = "bool"
@@ -26,20 +33,15 @@ class MongoSettingsRepo(AbstractSettingsRepo):
             vtype = "int"
         if update_blob:
             vtype = "blob"
-
-        doc = {
+        return {
             "var_name": var_name,
             "var_value": blob_val if update_blob else var_value,
             "vtype": vtype,
             "date_changed": datetime.datetime.now(datetime.timezone.utc)
         }
-        self._collection.update_one({"var_name": var_name}, {"$set": doc}, upsert=True)
-
-    def get_variable(self, var_name: str) -> Tuple[Optional[Any], Optional[bytes]]:
-        doc = self._collection.find_one({"var_name": var_name})
-        if not doc:
-            return None, None
 
+    @staticmethod
+    def _decode(doc: Dict[str, Any]) -> Tuple[Optional[Any], Optional[bytes]]:
         val = doc.get("var_value")
         vtype = doc.get("vtype")
         blob_val = None
@@ -50,6 +52,23 @@ class MongoSettingsRepo(AbstractSettingsRepo):
 
         return val, blob_val
 
+    def get_variable(self, var_name: str) -> Tuple[Optional[Any], Optional[bytes]]:
+        doc = self._collection.find_one({"var_name": var_name})
+        if not doc:
+            return None, None
+        return self._decode(doc)
+
+    def get_all_variables(self) -> Dict[str, Tuple[Optional[Any], Optional[bytes]]]:
+        return {doc["var_name"]: self._decode(doc) for doc in self._collection.find()}
+
+    def set_variables(self, items: List[Tuple[str, Any, bool, Optional[bytes]]]) -> None:
+        ops = [
+            UpdateOne({"var_name": name}, {"$set": self._doc(name, value, update_blob, blob)}, upsert=True)
+            for name, value, update_blob, blob in items
+        ]
+        if ops:
+            self._collection.bulk_write(ops, ordered=True)
+
 class MongoHistoryRepo(AbstractHistoryRepo):
     def __init__(self, db_client: MongoClient, db_name: str):
         self._collection: Collection = db_client[db_name]["download_history"]
@@ -119,6 +138,137 @@ class MongoRcloneSessionsRepo(AbstractRcloneSessionsRepo):
     def delete_session(self, token: str) -> None:
         self._collection.delete_one({"_id": token})
 
+class MongoQueueRepo(AbstractQueueRepo):
+    def __init__(self, db_client: MongoClient, db_name: str):
+        self._collection: Collection = db_client[db_name]["queue_jobs"]
+        self._collection.create_index("created_at")
+
+    def save_job(self, qid: str, user_id: int, link: str, options: Dict[str, Any], context: Dict[str, Any], priority: int = 0) -> None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+        self._collection.update_one(
+            {"_id": qid},
+            {
+                "$set": {
+                    "user_id": user_id,
+                    "link": link,
+                    "options": options,
+                    "context": context,
+                    "priority": priority,
+                    "updated_at": now
+                },
+                "$setOnInsert": {"status": "queued", "stage": None, "task_id": None, "created_at": now}
+            },
+            upsert=True
+        )
+
+    def update_job(self, qid: str, status: Optional[str] = None, stage: Optional[str] = None, task_id: Optional[str] = None) -> None:
+        fields = {"status": status, "stage": stage, "task_id": task_id}
+        update = {k: v for k, v in fields.items() if v is not None}
+        update["updated_at"] = datetime.datetime.now(datetime.timezone.utc)
+        self._collection.update_one({"_id": qid}, {"$set": update})
+
+    def delete_job(self, qid: str) -> None:
+        self._collection.delete_one({"_id": qid})
+
+    def get_jobs(self) -> List[Dict[str, Any]]:
+        jobs = []
+        for doc in self._collection.find().sort("created_at", ASCENDING):
+            doc["qid"] = doc.pop("_id")
+            jobs.append(doc)
+        return jobs
+
+class MongoFileCacheRepo(AbstractFileCacheRepo):
+    """One document per cached content, holding its files in send order."""
+
+    def __init__(self, db_client: MongoClient, db_name: str):
+        self._collection: Collection = db_client[db_name]["file_cache"]
+        self._collection.create_index(
+            [("provider", ASCENDING), ("content_id", ASCENDING), ("quality", ASCENDING)], unique=True
+        )
+        self._collection.create_index("last_used")
+
+    @staticmethod
+    def _key(provider: str, content_id: str, quality: str) -> Dict[str, Any]:
+        return {"provider": provider, "content_id": content_id, "quality": quality}
+
+    def get_files(self, provider: str, content_id: str, quality: str) -> List[Dict[str, Any]]:
+        doc = self._collection.find_one(self._key(provider, content_id, quality), {"files": 1})
+        return doc["files"] if doc else []
+
+    def save_files(self, provider: str, content_id: str, quality: str, files: List[Dict[str, Any]]) -> None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+        files = [
+            {
+                "track_id": f.get("track_id"),
+                "file_id": f["file_id"],
+                "kind": f["kind"],
+                "caption": f.get("caption"),
+                "file_size": f.get("file_size") or 0
+            }
+            for f in files
+        ]
+        self._collection.replace_one(
+            self._key(provider, content_id, quality),
+            {
+                **self._key(provider, content_id, quality),
+                "files": files,
+                "file_count": len(files),
+                "bytes": sum(f["file_size"] for f in files),
+                "hits": 0,
+                "created_at": now,
+                "last_used": now
+            },
+            upsert=True
+        )
+
+    def touch(self, provider: str, content_id: str, quality: str) -> None:
+        self._collection.update_one(
+            self._key(provider, content_id, quality),
+            {"$inc": {"hits": 1}, "$set": {"last_used": datetime.datetime.now(datetime.timezone.utc)}}
+        )
+
+    def delete(self, provider: Optional[str] = None, content_id: Optional[str] = None) -> int:
+        query = {}
+        if provider is not None:
+            query["provider"] = provider
+        if content_id is not None:
+            query["content_id"] = content_id
+        removed = 0
+        for doc in self._collection.find(query, {"file_count": 1}):
+            removed += doc.get("file_count", 0)
+        self._collection.delete_many(query)
+        return removed
+
+    def trim(self, max_files: int) -> int:
+        kept = 0
+        stale = []
+        removed = 0
+        for doc in self._collection.find({}, {"file_count": 1}).sort("last_used", -1):
+            count = doc.get("file_count", 0)
+            if kept + count > max_files:
+                stale.append(doc["_id"])
+                removed += count
+            else:
+                kept += count
+        if stale:
+            self._collection.delete_many({"_id": {"$in": stale}})
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        result = list(self._collection.aggregate([{
+            "$group": {
+                "_id": None,
+                "contents": {"$sum": 1},
+                "files": {"$sum": "$file_count"},
+                "bytes": {"$sum": "$bytes"},
+                "hits": {"$sum": "$hits"}
+            }
+        }]))
+        if not result:
+            return {"contents": 0, "files": 0, "bytes": 0, "hits": 0}
+        result[0].pop("_id")
+        return result[0]
+
 # --- Main Backend Class ---
 
 class MongoDatabase(DatabaseInterface):
@@ -137,7 +287,9 @@ class MongoDatabase(DatabaseInterface):
         if self._client:
             return
 
-        self._client = MongoClient(db_url)
+        # MongoClient is thread-safe and pools internally; size it for the DB executor
+        pool_size = kwargs.get('pool_size', 5) + 1
+        self._client = MongoClient(db_url, maxPoolSize=pool_size)
 
         # Determine the database name
         db_name = Config.MONGODB_DATABASE
@@ -168,6 +320,8 @@ class MongoDatabase(DatabaseInterface):
         self.history = MongoHistoryRepo(self._client, self._db_name)
         self.user_settings = MongoUserSettingsRepo(self._client, self._db_name)
         self.rclone_sessions = MongoRcloneSessionsRepo(self._client, self._db_name)
+        self.queue = MongoQueueRepo(self._client, self._db_name)
+        self.file_cache = MongoFileCacheRepo(self._client, self._db_name)
 
     def disconnect(self) -> None:
         """Disconnect from the database."""
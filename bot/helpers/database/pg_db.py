@@ -1,20 +1,34 @@
 import time
+import threading
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
 
 from bot.logger import LOGGER
 
 class DataBaseHandle:
-    _active_connections = []
-    _connection_users = []
-
-    def __init__(self, dburl: str = None) -> None:
+    _pool: psycopg2.pool.ThreadedConnectionPool = None
+    _pool_lock = threading.Lock()
+    # One slot per pooled connection: getconn() raises PoolError instead of waiting
+    _slots: threading.BoundedSemaphore = None
+    # id(connection) -> monotonic time it was last returned to the pool
+    _last_used = {}
+
+    def __init__(self, dburl: str = None, pool_size: int = 5, health_check_idle: float = 30.0,
+                 checkout_timeout: float = 30.0) -> None:
         """Load the DB URL if available
         Args:
             dburl (str, optional): The database URI to connect to. Defaults to None.
+            pool_size (int, optional): Maximum number of pooled connections. Defaults to 5.
+            health_check_idle (float, optional): Connections idle for longer than this
+            many seconds are pinged before being handed out. Defaults to 30.
+            checkout_timeout (float, optional): How many seconds a caller waits for a
+            free connection when all of them are checked out. Defaults to 30.
         """
 
         self._dburl = dburl
+        self._health_check_idle = health_check_idle
+        self._checkout_timeout = checkout_timeout
 
         if isinstance(self._dburl, bool):
             self._block = True
@@ -24,105 +38,125 @@ class DataBaseHandle:
         if self._block:
             return
 
-        if self._active_connections:
-            self._conn = self._active_connections[0]
-            self._connection_users.append(1)
-        else:
-            LOGGER.info("DATABASE : Established Connection")
-            self._conn = psycopg2.connect(
-                self._dburl,
-                connect_timeout=10,
-                keepalives=1,
-                keepalives_idle=30,
-                keepalives_interval=10,
-                keepalives_count=5,
-                application_name="apple-bot",
-            )
-            self._connection_users.append(1)
-            self._active_connections.append(self._conn)
-
-    def scur(self, dictcur: bool = False) -> psycopg2.extensions.cursor:
-        """Starts a new cursor for the connection.
-        Args:
-            dictcur (bool, optional): If this is true the returned cursor
-            is in dict form insted of list. Defaults to False.
-        Returns:
-            psycopg2.extensions.cursor: A cursor to execute sql queries.
+        with self._pool_lock:
+            if DataBaseHandle._pool is None:
+                DataBaseHandle._pool = psycopg2.pool.ThreadedConnectionPool(
+                    1,
+                    max(1, pool_size),
+                    self._dburl,
+                    connect_timeout=10,
+                    keepalives=1,
+                    keepalives_idle=30,
+                    keepalives_interval=10,
+                    keepalives_count=5,
+                    application_name="apple-bot",
+                )
+                DataBaseHandle._slots = threading.BoundedSemaphore(max(1, pool_size))
+                LOGGER.info(f"DATABASE : Established Connection Pool (max {pool_size})")
+
+    def _getconn(self) -> psycopg2.extensions.connection:
+        """Check a healthy connection out of the pool.
+        Connections that are closed are discarded; connections that sat idle for
+        longer than health_check_idle get a single ping before being reused.
+        Waits up to checkout_timeout for a free connection when the pool is exhausted.
         """
 
-        cur = None
-        for i in range(0, 5):
-            try:
-                if dictcur:
-                    cur = self._conn.cursor(
-                        cursor_factory=psycopg2.extras.DictCursor
-                    )
-                else:
-                    cur = self._conn.cursor()
-                # Lightweight health check to proactively detect dropped connections
+        slots = self._slots
+        if not slots.acquire(timeout=self._checkout_timeout):
+            raise psycopg2.pool.PoolError("Timed out waiting for a free database connection")
+        last_error = None
+        try:
+            for i in range(0, 5):
+                conn = self._pool.getconn()
+                if conn.closed:
+                    self._pool.putconn(conn, close=True)
+                    continue
+                idle_since = self._last_used.get(id(conn))
+                if idle_since is None or time.monotonic() - idle_since < self._health_check_idle:
+                    return conn
                 try:
-                    cur.execute("SELECT 1")
+                    with conn.cursor() as cur:
+                        cur.execute("SELECT 1")
+                    conn.rollback()
+                    return conn
                 except psycopg2.Error as ping_err:
+                    last_error = ping_err
                     LOGGER.debug(
-                        f"Cursor health check failed (attempt {i+1}), reconnecting. {ping_err}"
+                        f"Pool health check failed (attempt {i+1}), dropping connection. {ping_err}"
                     )
-                    try:
-                        cur.close()
-                    except Exception:
-                        pass
-                    self.re_establish()
-                    continue
-                break
+                    self._last_used.pop(id(conn), None)
+                    self._pool.putconn(conn, close=True)
+        except BaseException:
+            slots.release()
+            raise
+        slots.release()
+        raise psycopg2.OperationalError(f"No healthy database connection available: {last_error}")
 
-            except psycopg2.Error as e:
-                LOGGER.debug(
-                    f"Attempting to Re-establish the connection to server {i} times. {e}"
-                )
-                self.re_establish()
+    def _putconn(self, conn: psycopg2.extensions.connection, close: bool = False) -> None:
+        """Return a connection checked out with _getconn() and free its slot."""
 
-        return cur
+        try:
+            self._pool.putconn(conn, close=close)
+        finally:
+            self._slots.release()
 
-    def re_establish(self) -> None:
-        """Re tries to connect to the database if in any case it disconnects.
+    def scur(self, dictcur: bool = False) -> psycopg2.extensions.cursor:
+        """Starts a new cursor on a pooled connection.
+        Args:
+            dictcur (bool, optional): If this is true the returned cursor
+            is in dict form insted of list. Defaults to False.
+        Returns:
+            psycopg2.extensions.cursor: A cursor to execute sql queries.
+            Must be released with ccur() to return the connection to the pool.
         """
 
+        conn = self._getconn()
         try:
-            LOGGER.debug("Re-establishing database connection...")
-            new_conn = psycopg2.connect(
-                self._dburl,
-                connect_timeout=10,
-                keepalives=1,
-                keepalives_idle=30,
-                keepalives_interval=10,
-                keepalives_count=5,
-                application_name="apple-bot",
-            )
-            self._conn = new_conn
-            if self._active_connections:
-                self._active_connections[0] = new_conn
-            else:
-                self._active_connections.append(new_conn)
-            LOGGER.debug("Re-establish Success.")
-        except Exception:
-            time.sleep(1)  # Blocking call ... this stage is panic.
+            if dictcur:
+                return conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
+            return conn.cursor()
+        except psycopg2.Error:
+            self._putconn(conn, close=True)
+            raise
 
     def ccur(self, cursor: psycopg2.extensions.cursor) -> None:
-        """Closes the cursor that is passed to it.
+        """Commits, closes the cursor that is passed to it and returns its
+        connection to the pool.
         Args:
             cursor (psycopg2.extensions.cursor): The cursor that needs to be closed.
         """
 
-        if cursor is not None:
-            self._conn.commit()
-            cursor.close()
+        if cursor is None:
+            return
+        conn = cursor.connection
+        try:
+            conn.commit()
+        except psycopg2.Error as e:
+            LOGGER.debug(f"Commit failed, discarding connection. {e}")
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                pass
+        finally:
+            try:
+                cursor.close()
+            except psycopg2.Error:
+                pass
+            broken = bool(conn.closed)
+            if broken:
+                self._last_used.pop(id(conn), None)
+            else:
+                self._last_used[id(conn)] = time.monotonic()
+            self._putconn(conn, close=broken)
 
-    def __del__(self):
-        """Close connection so that it will not overload the database server..
+    def close(self) -> None:
+        """Close every pooled connection so that it will not overload the database server.
         """
 
         if self._block:
             return
-        self._connection_users.pop()
-
-        if not self._connection_users:
-            self._conn.close()
+        with self._pool_lock:
+            if DataBaseHandle._pool is not None:
+                DataBaseHandle._pool.closeall()
+                DataBaseHandle._pool = None
+                self._last_used.clear()
@@ -2,8 +2,12 @@
 # This file is responsible for initializing the correct database backend
 # based on the bot's configuration.
 
+from concurrent.futures import ThreadPoolExecutor
+
 from config import Config
 from .interface import DatabaseInterface
+from .async_repo import AsyncRepo
+from .settings_cache import CachedSettingsRepo
 
 def get_db() -> DatabaseInterface:
     """Factory function to get the configured database backend."""
@@ -22,7 +26,7 @@ def get_db() -> DatabaseInterface:
         exit(1)
     
     # Establish the connection
-    db_instance.connect(Config.DATABASE_URL)
+    db_instance.connect(Config.DATABASE_URL, pool_size=Config.DB_POOL_SIZE)
     return db_instance
 
 # Initialize the database. This will be imported by other parts of the app.
@@ -31,7 +35,21 @@ db = get_db()
 # For backward compatibility, we expose the repository instances under the old
 # variable names that are used throughout the application.
 # This avoids having to refactor every single file that uses the database.
-set_db = db.settings
+# Settings are read from an in-memory cache loaded in one query; writes go
+# straight to the database and then update the cache.
+set_db = CachedSettingsRepo(db.settings)
 download_history = db.history
 user_set_db = db.user_settings
 rclone_sessions_db = db.rclone_sessions
+queue_db = db.queue
+file_cache_db = db.file_cache
+
+# Awaitable versions of the repositories for use inside coroutines. Calls run
+# on a thread pool no larger than the connection pool.
+db_executor = ThreadPoolExecutor(max_workers=Config.DB_POOL_SIZE, thread_name_prefix="db")
+async_set_db = AsyncRepo(set_db, db_executor)
+async_download_history = AsyncRepo(download_history, db_executor)
+async_user_set_db = AsyncRepo(user_set_db, db_executor)
+async_rclone_sessions_db = AsyncRepo(rclone_sessions_db, db_executor)
+async_queue_db = AsyncRepo(queue_db, db_executor)
+async_file_cache_db = AsyncRepo(file_cache_db, db_executor)
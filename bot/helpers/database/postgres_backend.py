@@ -5,6 +5,8 @@ from .interface import (
     AbstractHistoryRepo,
     AbstractUserSettingsRepo,
     AbstractRcloneSessionsRepo,
+    AbstractQueueRepo,
+    AbstractFileCacheRepo,
     DatabaseInterface
 )
 from .pg_db import DataBaseHandle
@@ -63,6 +65,19 @@ class PostgresSettingsRepo(AbstractSettingsRepo):
         finally:
             self._db.ccur(cur)
 
+    @staticmethod
+    def _decode_row(row) -> Tuple[Optional[Any], Optional[bytes]]:
+        vtype = row['vtype']
+        val = row['var_value']
+        if vtype == "int":
+            val = int(val) if val is not None else None
+        elif vtype == "bool":
+            val = str(val).strip().lower() in ("true", "1", "yes", "on")
+        blob_val = row['blob_val']
+        if isinstance(blob_val, memoryview):
+            blob_val = blob_val.tobytes()
+        return val, blob_val
+
     def get_variable(self, var_name: str) -> Tuple[Optional[Any], Optional[bytes]]:
         cur = self._db.scur(dictcur=True)
         val = None
@@ -70,18 +85,55 @@ class PostgresSettingsRepo(AbstractSettingsRepo):
         try:
             cur.execute("SELECT * FROM bot_settings WHERE var_name = %s", (var_name,))
             if cur.rowcount > 0:
-                row = cur.fetchone()
-                vtype = row['vtype']
-                val = row['var_value']
-                if vtype == "int":
-                    val = int(val) if val is not None else None
-                elif vtype == "bool":
-                    val = str(val).strip().lower() in ("true", "1", "yes", "on")
-                blob_val = row['blob_val']
+                val, blob_val = self._decode_row(cur.fetchone())
         finally:
             self._db.ccur(cur)
         return val, blob_val
 
+    def normalize_value(self, var_value: Any) -> Any:
+        # var_value is a text column; only bool and int survive the round-trip typed
+        return var_value if isinstance(var_value, (bool, int)) else str(var_value)
+
+    def get_all_variables(self) -> Dict[str, Tuple[Optional[Any], Optional[bytes]]]:
+        cur = self._db.scur(dictcur=True)
+        result = {}
+        try:
+            cur.execute("SELECT var_name, var_value, vtype, blob_val FROM bot_settings")
+            for row in cur.fetchall():
+                result[row['var_name']] = self._decode_row(row)
+        finally:
+            self._db.ccur(cur)
+        return result
+
+    def set_variables(self, items: List[Tuple[str, Any, bool, Optional[bytes]]]) -> None:
+        if not items:
+            return
+        now = datetime.datetime.now()
+        value_rows = []
+        blob_rows = []
+        for var_name, var_value, update_blob, blob_val in items:
+            if update_blob:
+                blob_rows.append((var_name, blob_val, "blob", now))
+            else:
+                vtype = "bool" if isinstance(var_value, bool) else "int" if isinstance(var_value, int) else "str"
+                value_rows.append((var_name, str(var_value), vtype, now))
+        cur = self._db.scur()
+        try:
+            if value_rows:
+                psycopg2.extras.execute_values(cur, """
+                    INSERT INTO bot_settings (var_name, var_value, vtype, date_changed) VALUES %s
+                    ON CONFLICT (var_name) DO UPDATE SET var_value = EXCLUDED.var_value,
+                        vtype = EXCLUDED.vtype, date_changed = EXCLUDED.date_changed
+                """, value_rows)
+            if blob_rows:
+                psycopg2.extras.execute_values(cur, """
+                    INSERT INTO bot_settings (var_name, blob_val, vtype, date_changed) VALUES %s
+                    ON CONFLICT (var_name) DO UPDATE SET blob_val = EXCLUDED.blob_val,
+                        vtype = EXCLUDED.vtype, date_changed = EXCLUDED.date_changed
+                """, blob_rows)
+        finally:
+            self._db.ccur(cur)
+
 class PostgresHistoryRepo(AbstractHistoryRepo):
     def __init__(self, db_handle: DataBaseHandle):
         self._db = db_handle
@@ -235,6 +287,204 @@ class PostgresRcloneSessionsRepo(AbstractRcloneSessionsRepo):
         finally:
             self._db.ccur(cur)
 
+class PostgresQueueRepo(AbstractQueueRepo):
+    def __init__(self, db_handle: DataBaseHandle):
+        self._db = db_handle
+        schema = """
+        CREATE TABLE IF NOT EXISTS queue_jobs (
+            qid VARCHAR(20) PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            link TEXT NOT NULL,
+            options JSONB NOT NULL,
+            context JSONB NOT NULL,
+            priority INTEGER DEFAULT 0,
+            status VARCHAR(20) DEFAULT 'queued',
+            stage VARCHAR(50) DEFAULT NULL,
+            task_id VARCHAR(20) DEFAULT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_queue_jobs_created_at ON queue_jobs(created_at);
+        """
+        cur = self._db.scur()
+        try:
+            cur.execute(schema)
+        finally:
+            self._db.ccur(cur)
+
+    def save_job(self, qid: str, user_id: int, link: str, options: Dict[str, Any], context: Dict[str, Any], priority: int = 0) -> None:
+        sql = """
+        INSERT INTO queue_jobs (qid, user_id, link, options, context, priority)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        ON CONFLICT (qid)
+        DO UPDATE SET link = EXCLUDED.link, options = EXCLUDED.options, context = EXCLUDED.context,
+                      priority = EXCLUDED.priority, updated_at = CURRENT_TIMESTAMP;
+        """
+        cur = self._db.scur()
+        try:
+            cur.execute(sql, (qid, user_id, link, psycopg2.extras.Json(options), psycopg2.extras.Json(context), priority))
+        finally:
+            self._db.ccur(cur)
+
+    def update_job(self, qid: str, status: Optional[str] = None, stage: Optional[str] = None, task_id: Optional[str] = None) -> None:
+        sql = """
+        UPDATE queue_jobs SET status = COALESCE(%s, status), stage = COALESCE(%s, stage),
+                              task_id = COALESCE(%s, task_id), updated_at = CURRENT_TIMESTAMP
+        WHERE qid = %s
+        """
+        cur = self._db.scur()
+        try:
+            cur.execute(sql, (status, stage, task_id, qid))
+        finally:
+            self._db.ccur(cur)
+
+    def delete_job(self, qid: str) -> None:
+        sql = "DELETE FROM queue_jobs WHERE qid = %s"
+        cur = self._db.scur()
+        try:
+            cur.execute(sql, (qid,))
+        finally:
+            self._db.ccur(cur)
+
+    def get_jobs(self) -> List[Dict[str, Any]]:
+        sql = "SELECT * FROM queue_jobs ORDER BY created_at ASC"
+        cur = self._db.scur(dictcur=True)
+        results = []
+        try:
+            cur.execute(sql)
+            results = cur.fetchall()
+        finally:
+            self._db.ccur(cur)
+        return [dict(row) for row in results]
+
+class PostgresFileCacheRepo(AbstractFileCacheRepo):
+    def __init__(self, db_handle: DataBaseHandle):
+        self._db = db_handle
+        schema = """
+        CREATE TABLE IF NOT EXISTS file_cache (
+            provider VARCHAR(20) NOT NULL,
+            content_id TEXT NOT NULL,
+            quality VARCHAR(100) NOT NULL,
+            position INTEGER NOT NULL,
+            track_id TEXT,
+            file_id TEXT NOT NULL,
+            kind VARCHAR(10) NOT NULL,
+            caption TEXT,
+            file_size BIGINT DEFAULT 0,
+            hits INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (provider, content_id, quality, position)
+        );
+        CREATE INDEX IF NOT EXISTS idx_file_cache_last_used ON file_cache(last_used);
+        """
+        cur = self._db.scur()
+        try:
+            cur.execute(schema)
+        finally:
+            self._db.ccur(cur)
+
+    def get_files(self, provider: str, content_id: str, quality: str) -> List[Dict[str, Any]]:
+        sql = """
+        SELECT track_id, file_id, kind, caption, file_size FROM file_cache
+        WHERE provider = %s AND content_id = %s AND quality = %s ORDER BY position ASC
+        """
+        cur = self._db.scur(dictcur=True)
+        results = []
+        try:
+            cur.execute(sql, (provider, content_id, quality))
+            results = cur.fetchall()
+        finally:
+            self._db.ccur(cur)
+        return [dict(row) for row in results]
+
+    def save_files(self, provider: str, content_id: str, quality: str, files: List[Dict[str, Any]]) -> None:
+        rows = [
+            (provider, content_id, quality, position, f.get('track_id'), f['file_id'], f['kind'],
+             f.get('caption'), f.get('file_size') or 0)
+            for position, f in enumerate(files)
+        ]
+        cur = self._db.scur()
+        try:
+            cur.execute(
+                "DELETE FROM file_cache WHERE provider = %s AND content_id = %s AND quality = %s",
+                (provider, content_id, quality)
+            )
+            if rows:
+                psycopg2.extras.execute_values(
+                    cur,
+                    """INSERT INTO file_cache
+                    (provider, content_id, quality, position, track_id, file_id, kind, caption, file_size)
+                    VALUES %s""",
+                    rows
+                )
+        finally:
+            self._db.ccur(cur)
+
+    def touch(self, provider: str, content_id: str, quality: str) -> None:
+        sql = """
+        UPDATE file_cache SET hits = hits + 1, last_used = CURRENT_TIMESTAMP
+        WHERE provider = %s AND content_id = %s AND quality = %s
+        """
+        cur = self._db.scur()
+        try:
+            cur.execute(sql, (provider, content_id, quality))
+        finally:
+            self._db.ccur(cur)
+
+    def delete(self, provider: Optional[str] = None, content_id: Optional[str] = None) -> int:
+        sql = """
+        DELETE FROM file_cache
+        WHERE (%s IS NULL OR provider = %s) AND (%s IS NULL OR content_id = %s)
+        """
+        cur = self._db.scur()
+        removed = 0
+        try:
+            cur.execute(sql, (provider, provider, content_id, content_id))
+            removed = cur.rowcount
+        finally:
+            self._db.ccur(cur)
+        return removed
+
+    def trim(self, max_files: int) -> int:
+        # Whole contents are dropped, oldest last_used first, so a cached album is never left partial
+        sql = """
+        DELETE FROM file_cache f USING (
+            SELECT provider, content_id, quality FROM (
+                SELECT provider, content_id, quality,
+                       SUM(COUNT(*)) OVER (ORDER BY MAX(last_used) DESC, provider, content_id, quality) AS running
+                FROM file_cache GROUP BY provider, content_id, quality
+            ) ranked WHERE running > %s
+        ) old
+        WHERE f.provider = old.provider AND f.content_id = old.content_id AND f.quality = old.quality
+        """
+        cur = self._db.scur()
+        removed = 0
+        try:
+            cur.execute(sql, (max_files,))
+            removed = cur.rowcount
+        finally:
+            self._db.ccur(cur)
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        sql = """
+        SELECT COUNT(*) AS contents, COALESCE(SUM(files), 0) AS files,
+               COALESCE(SUM(bytes), 0) AS bytes, COALESCE(SUM(hits), 0) AS hits
+        FROM (
+            SELECT COUNT(*) AS files, SUM(file_size) AS bytes, MAX(hits) AS hits
+            FROM file_cache GROUP BY provider, content_id, quality
+        ) contents
+        """
+        cur = self._db.scur(dictcur=True)
+        result = {'contents': 0, 'files': 0, 'bytes': 0, 'hits': 0}
+        try:
+            cur.execute(sql)
+            result = {k: int(v) for k, v in dict(cur.fetchone()).items()}
+        finally:
+            self._db.ccur(cur)
+        return result
+
 # --- Main Backend Class ---
 
 class PostgresDatabase(DatabaseInterface):
@@ -249,14 +499,18 @@ class PostgresDatabase(DatabaseInterface):
         if self._db_handle:
             return
 
-        self._db_handle = DataBaseHandle(db_url)
+        # One extra connection for synchronous callers on the event loop thread
+        pool_size = kwargs.get('pool_size', 5) + 1
+        self._db_handle = DataBaseHandle(db_url, pool_size=pool_size)
         self.settings = PostgresSettingsRepo(self._db_handle)
         self.history = PostgresHistoryRepo(self._db_handle)
         self.user_settings = PostgresUserSettingsRepo(self._db_handle)
         self.rclone_sessions = PostgresRcloneSessionsRepo(self._db_handle)
+        self.queue = PostgresQueueRepo(self._db_handle)
+        self.file_cache = PostgresFileCacheRepo(self._db_handle)
 
     def disconnect(self) -> None:
         """Disconnect from the database."""
         if self._db_handle:
-            # The __del__ method of DataBaseHandle handles closing
+            self._db_handle.close()
             self._db_handle = None
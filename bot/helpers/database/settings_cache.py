@@ -0,0 +1,79 @@
+# bot/helpers/database/settings_cache.py
+# In-memory cache in front of the bot_settings repository. All rows are loaded
+# with one query at startup and reads never touch the database. Writes go to
+# the database first (several keys in one round-trip with set_variables) and
+# only then update the cache and notify subscribers.
+
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bot.logger import LOGGER
+from .interface import AbstractSettingsRepo
+
+# listener(var_name, var_value, blob_val), called with the values as read back
+SettingsListener = Callable[[str, Optional[Any], Optional[bytes]], None]
+
+
+class CachedSettingsRepo(AbstractSettingsRepo):
+    """Write-through settings cache with batched writes and change listeners."""
+
+    def __init__(self, repo: AbstractSettingsRepo):
+        """
+        Args:
+            repo: Backend repository that owns the bot_settings storage
+        """
+        self._repo = repo
+        self._lock = threading.Lock()
+        # Serialises writes so the cache ends up in the same order as the database
+        self._write_lock = threading.Lock()
+        self._listeners: Dict[Optional[str], List[SettingsListener]] = {}
+        self._cache: Dict[str, Tuple[Optional[Any], Optional[bytes]]] = repo.get_all_variables()
+        LOGGER.info(f"SETTINGS : Loaded {len(self._cache)} settings into cache")
+
+    def get_variable(self, var_name: str) -> Tuple[Optional[Any], Optional[bytes]]:
+        with self._lock:
+            return self._cache.get(var_name, (None, None))
+
+    def get_all_variables(self) -> Dict[str, Tuple[Optional[Any], Optional[bytes]]]:
+        with self._lock:
+            return dict(self._cache)
+
+    def set_variable(self, var_name: str, var_value: Any, update_blob: bool = False, blob_val: Optional[bytes] = None) -> None:
+        self.set_variables([(var_name, var_value, update_blob, blob_val)])
+
+    def set_variables(self, items: List[Tuple[str, Any, bool, Optional[bytes]]]) -> None:
+        """Persist the writes in one round-trip, then update the cache.
+        Database errors propagate and leave the cache untouched."""
+        if not items:
+            return
+        with self._write_lock:
+            self._repo.set_variables(items)
+            changed = {}
+            with self._lock:
+                for var_name, var_value, update_blob, blob_val in items:
+                    old_val, old_blob = self._cache.get(var_name, (None, None))
+                    if update_blob:
+                        self._cache[var_name] = (old_val, blob_val)
+                    else:
+                        self._cache[var_name] = (self._repo.normalize_value(var_value), old_blob)
+                    changed[var_name] = self._cache[var_name]
+                listeners = {name: self._listeners.get(name, []) + self._listeners.get(None, []) for name in changed}
+        for var_name, (value, blob) in changed.items():
+            for listener in listeners[var_name]:
+                try:
+                    listener(var_name, value, blob)
+                except Exception as e:
+                    LOGGER.error(f"SETTINGS : Listener for {var_name} failed: {e}")
+
+    def subscribe(self, listener: SettingsListener, var_name: Optional[str] = None) -> None:
+        """Call listener(var_name, value, blob) after a setting is written.
+        Without var_name the listener sees every setting. Listeners run in
+        the writing thread, after the database and the cache are updated."""
+        with self._lock:
+            self._listeners.setdefault(var_name, []).append(listener)
+
+    def reload(self) -> None:
+        """Re-read every row from the database."""
+        fresh = self._repo.get_all_variables()
+        with self._lock:
+            self._cache = fresh
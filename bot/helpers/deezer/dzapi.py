@@ -1,6 +1,6 @@
 import re
 import os
-import aiohttp
+import asyncio
 import aiofiles
 import aiolimiter
 
@@ -14,8 +14,14 @@ from requests.models import HTTPError
 
 from config import Config
 from bot.logger import LOGGER
+from ..http_client import new_session
 
 CHUNK_SIZE = 2048
+# Every third 2048-byte chunk of a track is encrypted
+STRIPE_SIZE = 3 * CHUNK_SIZE
+BLOWFISH_IV = b"\x00\x01\x02\x03\x04\x05\x06\x07"
+# Bytes handed to the decrypt worker at once (a multiple of STRIPE_SIZE)
+DECRYPT_BATCH_SIZE = 64 * STRIPE_SIZE
 
 class APIError(Exception):
     def __init__(self, type, msg, payload):
@@ -71,7 +77,7 @@ class DeezerAPI:
 
 
     async def login(self):
-        self.session = aiohttp.ClientSession()
+        self.session = new_session()
         self.session.headers.update({
             'accept': '*/*',
             'user-agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36',
@@ -234,35 +240,75 @@ class DeezerAPI:
         return key
 
 
-    async def dl_track(self, id, url, path):
+    async def dl_track(self, id, url, path, cancel_event: asyncio.Event | None = None, progress=None):
+        """
+        Stream a track to disk, decrypting stripe by stripe as data arrives.
+        Args:
+            id: Deezer track id (used to derive the Blowfish key)
+            url: Encrypted stream URL
+            path: Full path to save the file
+            cancel_event: Optional asyncio.Event to signal cancellation
+            progress: Optional coroutine function called as progress(done_bytes, total_bytes)
+        Returns:
+            str or None: Error message if failed, else None
+        """
         bf_key = self._get_blowfish_key(id)
+        # One ECB cipher per track; CBC with the fixed IV is rebuilt per stripe in _decrypt_stripes
+        cipher = Blowfish.new(bf_key, Blowfish.MODE_ECB)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        error = None
         async with self.session.get(url, allow_redirects=True) as resp:
+            if resp.status != 200:
+                return f"HTTP Status: {resp.status}"
+            total = resp.content_length or 0
+            done = 0
             buf = bytearray()
-            async for data, _ in resp.content.iter_chunks():
-                buf += data
-
-            encrypt_chunk_size = 3 * 2048
-            os.makedirs(os.path.dirname(path), exist_ok=True)
             async with aiofiles.open(path, "wb") as audio:
-                buflen = len(buf)
-                for i in range(0, buflen, encrypt_chunk_size):
-                    data = buf[i : min(i + encrypt_chunk_size, buflen)]
-                    if len(data) >= 2048:
-                        decrypted_chunk = (
-                            self._decrypt_chunk(bf_key, data[:2048])
-                            + data[2048:]
-                        )
-                    else:
-                        decrypted_chunk = data
-                    await audio.write(decrypted_chunk)
+                async for data, _ in resp.content.iter_chunks():
+                    if cancel_event and cancel_event.is_set():
+                        error = "Cancelled"
+                        break
+                    buf += data
+                    if len(buf) < DECRYPT_BATCH_SIZE:
+                        continue
+                    # Only whole stripes are decrypted; the remainder waits for more data
+                    cut = len(buf) - len(buf) % STRIPE_SIZE
+                    batch = bytes(buf[:cut])
+                    del buf[:cut]
+                    await audio.write(await asyncio.to_thread(self._decrypt_stripes, cipher, batch))
+                    done += cut
+                    if progress:
+                        await progress(done, total)
+                else:
+                    if buf:
+                        await audio.write(await asyncio.to_thread(self._decrypt_stripes, cipher, bytes(buf)))
+                        done += len(buf)
+                    if progress:
+                        await progress(done, total)
+
+        if error:
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except Exception:
+                pass
+        return error
 
 
     @staticmethod
-    def _decrypt_chunk(key, data):
-        return Blowfish.new(
-            key,
-            Blowfish.MODE_CBC,
-            b"\x00\x01\x02\x03\x04\x05\x06\x07",
-        ).decrypt(data)
+    def _decrypt_stripes(cipher, data: bytes) -> bytes:
+        """Decrypt a buffer that starts on a stripe boundary.
+        The first CHUNK_SIZE bytes of every STRIPE_SIZE stripe are Blowfish-CBC
+        encrypted with a fixed IV; the rest of the stripe is plain. CBC is
+        done by hand on top of one ECB cipher so no cipher object is created
+        per stripe."""
+        out = bytearray(data)
+        for i in range(0, len(data) - CHUNK_SIZE + 1, STRIPE_SIZE):
+            enc = data[i : i + CHUNK_SIZE]
+            plain = int.from_bytes(cipher.decrypt(enc), 'big')
+            prev = int.from_bytes(BLOWFISH_IV + enc[:-8], 'big')
+            out[i : i + CHUNK_SIZE] = (plain ^ prev).to_bytes(CHUNK_SIZE, 'big')
+        return bytes(out)
 
 deezerapi = DeezerAPI()
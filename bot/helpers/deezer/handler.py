@@ -5,6 +5,7 @@ from .metadata import *
 from .dzapi import deezerapi
 
 from ..legacy_utils import *
+from ..utils import zip_handler
 from ..legacy_uploader import *
 from ..metadata import set_metadata, get_audio_extension
 
@@ -40,7 +41,7 @@ async def start_track(item_id: int, user: dict, track_meta: dict | None, upload=
         try:
             track_meta = await process_track_metadata(item_id, user['r_id'])
         except Exception as e:
-            return await send_message(user, e)
+            return await send_error(user, e)
 
         filepath = f"{Config.LEGACY_DOWNLOAD_BASE_DIR}/{user['r_id']}/{track_meta['provider']}/{track_meta['albumartist']}/{track_meta['album']}"
 
@@ -58,8 +59,20 @@ async def start_track(item_id: int, user: dict, track_meta: dict | None, upload=
     filepath += f"/{filename}.{track_meta['extension']}"
     track_meta['filepath'] = filepath = sanitize_filepath(filepath)
 
-    # deezerapi.dl_track currently does not support cancel_event; left as-is
-    await deezerapi.dl_track(item_id, url, track_meta['filepath'])
+    progress = None
+    reporter = user.get('progress')
+    if reporter:
+        async def progress(done, total):
+            if total:
+                await reporter.update_download(percent=done * 100 // total)
+
+    err = await deezerapi.dl_track(
+        item_id, url, track_meta['filepath'],
+        cancel_event=user.get('cancel_event'),
+        progress=progress
+    )
+    if err:
+        return await send_error(user, err)
 
     await set_metadata(track_meta)
 
@@ -73,7 +86,7 @@ async def start_album(album_id:int, user:dict, upload=True):
     try:
         raw_data = await deezerapi.get_album(album_id)
     except Exception as e:
-        return await send_message(user, e)
+        return await send_error(user, e)
 
     album_meta = await process_album_metadata(album_id, raw_data['DATA'], raw_data['SONGS'], user['r_id'])
 
@@ -96,6 +109,13 @@ async def start_album(album_id:int, user:dict, upload=True):
         'title': album_meta['title'],
         'type': album_meta['type']
     }
+
+    # Tracks go up (as albums of up to 10 with TG_MEDIA_GROUP) while the rest of the album downloads
+    if upload and bot_set.upload_mode == 'Telegram' and not bot_set.album_zip:
+        await run_pipelined_tasks(tasks, album_meta['tracks'], user, update_details)
+        await cleanup(None, album_meta)
+        return
+
     await run_concurrent_tasks(tasks, update_details)
 
     if bot_set.album_zip:
@@ -0,0 +1,187 @@
+import json
+import re
+
+from config import Config
+from ..logger import LOGGER
+from ..settings import bot_set
+from .database.pg_impl import async_file_cache_db
+from .message import send_message, send_audio_group, MEDIA_GROUP_SIZE
+
+
+TIDAL_NG_SETTINGS_PATH = "/root/.config/tidal_dl_ng/settings.json"
+
+PROVIDERS = {
+    'tidal': ("https://tidal.com", "https://listen.tidal.com", "tidal.com", "listen.tidal.com"),
+    'deezer': ("https://link.deezer.com", "https://deezer.com", "deezer.com", "https://www.deezer.com", "link.deezer.com"),
+    'qobuz': ("https://play.qobuz.com", "https://open.qobuz.com", "https://www.qobuz.com"),
+    'apple': ("https://music.apple.com",),
+}
+
+
+class FileCache:
+    """
+    Telegram file_ids of content that was already uploaded, keyed by
+    (provider, content, quality variant). A repeat request for the same
+    album/track at the same settings is answered by re-sending the stored
+    file_ids, which costs no download and no upload.
+    Entries are saved only for tasks that finished without being cancelled
+    and without a failed track or upload, dropped when a re-send fails (e.g. the file expired on Telegram's side)
+    and trimmed to FILE_CACHE_MAX_FILES, least recently used first.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def enabled() -> bool:
+        return Config.FILE_CACHE_ENABLED and bot_set.upload_mode == 'Telegram'
+
+    @staticmethod
+    def key(link: str, options: dict = None):
+        """Return (provider, content_id, quality) for a link, or None if it is not cacheable."""
+        link = link.strip()
+        provider = next((name for name, prefixes in PROVIDERS.items() if link.startswith(prefixes)), None)
+        if not provider:
+            return None
+        return provider, FileCache.content_id(provider, link), FileCache.variant(provider, options)
+
+    @staticmethod
+    def content_id(provider: str, link: str) -> str:
+        """Identity of the content behind a link, the same for every URL shape (country, slug, tracking query)."""
+        content_id = None
+        if provider == 'apple':
+            from ..providers.apple import AppleMusicProvider
+            kind = re.search(r'/(album|song|playlist|music-video|artist)/', link)
+            item = AppleMusicProvider().extract_content_id(link)
+            if kind and item != "unknown":
+                content_id = f"{kind.group(1)}/{item}"
+                # an album link with ?i= is a single song of that album
+                if track := re.search(r'[?&]i=(\d+)', link):
+                    content_id += f"?i={track.group(1)}"
+        elif provider == 'tidal':
+            from .tidal_ng.handler import get_content_id_from_url
+            kind = re.search(r'/(track|album|playlist|video)/', link)
+            item = get_content_id_from_url(link)
+            if kind and item != "unknown":
+                content_id = f"{kind.group(1)}/{item}"
+        if content_id:
+            return f"{provider}:{content_id}"
+        link = link.split('#')[0].split('?')[0]
+        return re.sub(r'^https?://(www\.)?', '', link).rstrip('/').lower()
+
+    @staticmethod
+    def variant(provider: str, options: dict = None) -> str:
+        """Settings that change the files sent for a link."""
+        parts = []
+        if provider == 'qobuz':
+            parts.append(f"q{getattr(bot_set.qobuz, 'quality', '')}")
+        elif provider == 'deezer':
+            parts.append(str(getattr(bot_set.deezer, 'quality', '')))
+        elif provider == 'tidal':
+            if bot_set.tidal_legacy_enabled:
+                parts.append(f"legacy-{getattr(bot_set.tidal, 'quality', '')}")
+            else:
+                try:
+                    with open(TIDAL_NG_SETTINGS_PATH) as f:
+                        settings = json.load(f)
+                except Exception:
+                    settings = {}
+                parts.append(f"ng-{settings.get('quality_audio', '')}-{settings.get('quality_video', '')}")
+                parts.append(f"z{int(bot_set.tidal_ng_album_zip)}{int(bot_set.tidal_ng_playlist_zip)}")
+        elif provider == 'apple':
+            apple = bot_set.apple or {}
+            parts.append(f"{apple.get('format', '')}-{apple.get('alac_quality', '')}-{apple.get('atmos_quality', '')}")
+            parts.append(f"z{int(bot_set.apple_album_zip)}{int(bot_set.apple_playlist_zip)}")
+        parts.append(f"z{int(bot_set.album_zip)}{int(bot_set.playlist_zip)}{int(bot_set.artist_zip)}")
+        parts.append(f"v{int(bot_set.video_as_document)}")
+        if options:
+            parts.append(','.join(f"{k}={v}" for k, v in sorted(options.items())))
+        return '|'.join(parts)
+
+    async def resend(self, link: str, user: dict, options: dict = None) -> bool:
+        """
+        Send the cached files of a link. Returns False on a miss or when the
+        stored files could not be re-sent; the caller downloads as usual then.
+        """
+        if not self.enabled() or not (key := self.key(link, options)):
+            return False
+        try:
+            files = await async_file_cache_db.get_files(*key)
+        except Exception as e:
+            LOGGER.error(f"File cache lookup failed: {e}")
+            return False
+        if not files:
+            self.misses += 1
+            return False
+
+        if not await self.send_files(user, files):
+            # Something is stale; forget the content and let the normal download redo it
+            LOGGER.warning(f"File cache: re-sending {key[1]} failed, invalidating")
+            await self.invalidate(key[0], key[1])
+            self.misses += 1
+            return False
+        self.hits += 1
+        try:
+            await async_file_cache_db.touch(*key)
+        except Exception:
+            pass
+        return True
+
+    @staticmethod
+    async def send_files(user: dict, files: list) -> bool:
+        """
+        Send already uploaded files to the user's chat by file_id. Returns True
+        if all went out; stops at the first album or file that fails, so a
+        stale entry costs as few duplicates as possible when it is re-downloaded.
+        """
+        index = 0
+        while index < len(files):
+            entry = files[index]
+            if entry['kind'] == 'audio' and Config.TG_MEDIA_GROUP:
+                run = [entry]
+                while index + len(run) < len(files) and len(run) < MEDIA_GROUP_SIZE \
+                        and files[index + len(run)]['kind'] == 'audio':
+                    run.append(files[index + len(run)])
+                if len(run) > 1:
+                    messages = await send_audio_group(
+                        user, [{'file_id': f['file_id'], 'caption': f.get('caption')} for f in run]
+                    )
+                    if len(messages) < len(run):
+                        return False
+                    index += len(run)
+                    continue
+            if not await send_message(user, entry['file_id'], entry['kind'], caption=entry.get('caption')):
+                return False
+            index += 1
+        return True
+
+    async def store(self, link: str, options: dict, files: list):
+        """Remember the files sent for a link."""
+        if not self.enabled() or not files or not (key := self.key(link, options)):
+            return
+        try:
+            await async_file_cache_db.save_files(*key, files)
+            await async_file_cache_db.trim(Config.FILE_CACHE_MAX_FILES)
+        except Exception as e:
+            LOGGER.error(f"File cache save failed: {e}")
+
+    async def invalidate(self, provider: str = None, content_id: str = None) -> int:
+        try:
+            return await async_file_cache_db.delete(provider, content_id)
+        except Exception as e:
+            LOGGER.error(f"File cache invalidation failed: {e}")
+            return 0
+
+    async def stats(self) -> dict:
+        stats = await async_file_cache_db.stats()
+        lookups = self.hits + self.misses
+        stats.update(
+            session_hits=self.hits,
+            session_misses=self.misses,
+            hit_rate=(self.hits / lookups) if lookups else 0.0
+        )
+        return stats
+
+
+file_cache = FileCache()
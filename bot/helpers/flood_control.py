@@ -0,0 +1,62 @@
+import time
+import asyncio
+
+from config import Config
+from ..logger import LOGGER
+
+
+class FloodControl:
+    """
+    Token bucket shared by every Telegram send of the bot.
+    Calls take a token before going out; tokens refill at `rate` per second
+    up to `burst`. A FloodWait blocks the whole bucket for the requested
+    time and halves the rate, which then creeps back up with each
+    successful call, so concurrent uploads back off together instead of
+    each hitting the limit on its own.
+    """
+
+    MIN_RATE_FACTOR = 0.1  # never slow down below this fraction of the configured rate
+    RECOVERY = 0.05        # fraction of the configured rate regained per successful call
+
+    def __init__(self, rate: float, burst: int):
+        self.base_rate = max(rate, 0.01)
+        self.rate = self.base_rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self._stamp = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    async def acquire(self):
+        """Wait for a token (and for any FloodWait in progress to run out)."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def penalize(self, seconds: float):
+        """Record a FloodWait of `seconds`: pause every sender and slow down."""
+        now = time.monotonic()
+        self._blocked_until = max(self._blocked_until, now + seconds)
+        self.rate = max(self.base_rate * self.MIN_RATE_FACTOR, self.rate / 2)
+        self.tokens = 0
+        self._stamp = now
+        LOGGER.warning(f"Telegram FloodWait of {seconds}s, sending at {self.rate:.2f}/s from now")
+
+    def reward(self):
+        """Record a successful call."""
+        self.rate = min(self.base_rate, self.rate + self.base_rate * self.RECOVERY)
+
+
+flood_control = FloodControl(Config.TG_SEND_RATE, Config.TG_UPLOAD_WORKERS)
@@ -0,0 +1,122 @@
+import os
+import aiohttp
+import asyncio
+
+from aiohttp import ClientTimeout
+
+from config import Config
+from ..logger import LOGGER
+
+
+# Process-wide connection pool shared by every provider session.
+# Keeps TCP/TLS connections alive between requests and caches DNS lookups,
+# so covers, segments and tracks from the same CDN reuse one handshake.
+_connector: aiohttp.TCPConnector | None = None
+_session: aiohttp.ClientSession | None = None
+
+
+def get_connector() -> aiohttp.TCPConnector:
+    """Return the shared connector, creating it on first use (inside the running loop)."""
+    global _connector
+    if _connector is None or _connector.closed:
+        _connector = aiohttp.TCPConnector(
+            limit=Config.HTTP_POOL_SIZE,
+            limit_per_host=Config.HTTP_POOL_PER_HOST,
+            ttl_dns_cache=300,
+            keepalive_timeout=60,
+            enable_cleanup_closed=True,
+        )
+    return _connector
+
+
+def new_session(**kwargs) -> aiohttp.ClientSession:
+    """
+    Create a session with its own headers/cookies that draws connections
+    from the shared pool. Closing it does not close the pool.
+    """
+    return aiohttp.ClientSession(connector=get_connector(), connector_owner=False, **kwargs)
+
+
+def get_session() -> aiohttp.ClientSession:
+    """Return the shared session used for plain file downloads."""
+    global _session
+    if _session is None or _session.closed:
+        _session = new_session()
+    return _session
+
+
+async def close():
+    """Close the shared session and every pooled connection."""
+    global _session, _connector
+    if _session is not None and not _session.closed:
+        await _session.close()
+    if _connector is not None and not _connector.closed:
+        await _connector.close()
+    _session = None
+    _connector = None
+
+
+def _remove_partial(path):
+    try:
+        if os.path.exists(path):
+            os.remove(path)
+    except Exception:
+        pass
+
+
+async def download_file(url, path, retries=3, timeout=30, cancel_event: asyncio.Event | None = None,
+                        session: aiohttp.ClientSession | None = None):
+    """
+    Download a file with retry logic, timeout, and cooperative cancellation.
+    Retries resume from the bytes already on disk with an HTTP Range request
+    when the server supports it.
+    Args:
+        url (str): URL to download
+        path (str): Full path to save the file
+        retries (int): Number of retry attempts
+        timeout (int): Timeout in seconds
+        cancel_event: Optional asyncio.Event to signal cancellation
+        session: Session to use (defaults to the shared session)
+    Returns:
+        str or None: Error message if failed, else None
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    session = session or get_session()
+    # Start clean; anything on disk after this point is ours to resume
+    _remove_partial(path)
+
+    for attempt in range(1, retries + 1):
+        try:
+            if cancel_event and cancel_event.is_set():
+                _remove_partial(path)
+                return "Cancelled"
+            offset = os.path.getsize(path) if os.path.exists(path) else 0
+            headers = {'Range': f'bytes={offset}-'} if offset else None
+            async with session.get(url, headers=headers, timeout=ClientTimeout(total=timeout)) as response:
+                if response.status == 206 and offset:
+                    mode = 'ab'
+                elif response.status == 200:
+                    mode = 'wb'
+                elif response.status == 416 and offset:
+                    # Range past the end: the previous attempt already got everything
+                    return None
+                else:
+                    _remove_partial(path)
+                    return f"HTTP Status: {response.status}"
+                with open(path, mode) as f:
+                    async for chunk in response.content.iter_chunked(1024 * 64):
+                        if cancel_event and cancel_event.is_set():
+                            f.close()
+                            _remove_partial(path)
+                            return "Cancelled"
+                        f.write(chunk)
+                return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if attempt == retries:
+                _remove_partial(path)
+                return f"Failed after {retries} attempts: {str(e)}"
+            LOGGER.debug(f"Download attempt {attempt} for {url} failed, retrying: {e}")
+            await asyncio.sleep(2 ** attempt)
+        except Exception as e:
+            _remove_partial(path)
+            return f"Unexpected error: {str(e)}"
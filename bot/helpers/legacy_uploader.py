@@ -1,11 +1,12 @@
 import os
-import asyncio
+from functools import partial
 from config import Config
 
 from ..settings import bot_set
-from .message import send_message, edit_message
+from .message import send_message, edit_message, send_in_order, send_audio_group
 from .utils import *
 from .uploader import _post_rclone_manage_button
+from . import rclone_rc
 
 #
 #
@@ -35,7 +36,7 @@ async def album_upload(metadata, user):
         await local_upload(metadata, user)
     elif bot_set.upload_mode == 'Telegram':
         if bot_set.album_zip:
-            for item in metadata['folderpath']:
+            async for item in metadata['folderpath']:
                 await send_message(user,item,'doc',
                     caption=await create_simple_text(metadata, user)
                 )
@@ -59,7 +60,7 @@ async def artist_upload(metadata, user):
         await local_upload(metadata, user)
     elif bot_set.upload_mode == 'Telegram':
         if bot_set.artist_zip:
-            for item in metadata['folderpath']:
+            async for item in metadata['folderpath']:
                 await send_message(user,item,'doc',
                     caption=await create_simple_text(metadata, user)
                 )
@@ -84,7 +85,7 @@ async def playlist_upload(metadata, user):
         await local_upload(metadata, user)
     elif bot_set.upload_mode == 'Telegram':
         if bot_set.playlist_zip:
-            for item in metadata['folderpath']:
+            async for item in metadata['folderpath']:
                 await send_message(user,item,'doc',
                     caption=await create_simple_text(metadata, user)
                 )
@@ -171,18 +172,14 @@ async def rclone_upload(user, realpath):
             source_for_copy = abs_path
             dest_path = f"{dest_root}/{parent_dir}".rstrip("/")
 
-    copy_cmd = f'rclone copy --config ./rclone.conf "{source_for_copy}" "{dest_path}"'
-    task = await asyncio.create_subprocess_shell(
-        copy_cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
-    )
-    stdout, stderr = await task.communicate()
-    if task.returncode != 0:
-        try:
-            LOGGER.debug(f"Rclone copy failed: {stderr.decode().strip()}")
-        except Exception:
-            pass
+    try:
+        await rclone_rc.copy(
+            source_for_copy, dest_path,
+            progress=rclone_rc.upload_progress(user),
+            cancel_event=user.get('cancel_event')
+        )
+    except rclone_rc.RcloneError as e:
+        LOGGER.debug(f"Rclone copy failed: {e}")
         return None, None, None
 
     # Generate links using legacy helper
@@ -247,28 +244,42 @@ async def local_upload(metadata, user):
     shutil.rmtree(to_move)
 
 
-async def telegram_upload(track, user):
+async def telegram_upload(track, user, order=None):
     """
     Only upload a single track
     Args:
         track: track metadata
+        order: UploadOrder when sent through send_in_order
         """
-    await send_message(user, track['filepath'], 'audio', meta=track)
+    await send_message(user, track['filepath'], 'audio', meta=track, order=order)
 
 
 async def batch_telegram_upload(metadata, user):
     """
+    Uploads tracks as Telegram albums of up to 10 (TG_MEDIA_GROUP), or
+    several single tracks at a time; they still show up in order
     Args:
         metadata: full metadata
         user: user details
     """
     if metadata['type'] == 'album' or metadata['type'] == 'playlist':
-        for track in metadata['tracks']:
-            try:
-                await telegram_upload(track, user)
-            except FileNotFoundError:
-                pass
+        tracks = metadata['tracks']
     elif metadata['type'] == 'artist':
-        for album in metadata['albums']:
-            for track in album['tracks']:
-                await telegram_upload(track, user)
+        tracks = [track for album in metadata['albums'] for track in album['tracks']]
+    else:
+        return
+
+    if Config.TG_MEDIA_GROUP:
+        # tracks that failed to download have no file
+        tracks = [track for track in tracks if os.path.isfile(track['filepath'])]
+        if len(tracks) > 1:
+            await send_audio_group(user, [{'filepath': track['filepath'], 'meta': track} for track in tracks])
+            return
+
+    async def upload(track, order):
+        try:
+            await telegram_upload(track, user, order)
+        except FileNotFoundError:
+            pass
+
+    await send_in_order([partial(upload, track) for track in tracks])
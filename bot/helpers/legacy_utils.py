@@ -1,15 +1,11 @@
 import os
 import math
-import aiohttp
 import asyncio
 import shutil
-import zipfile
 
 from pathlib import Path
 from urllib.parse import quote
-from aiohttp import ClientTimeout
 from pyrogram.errors import MessageNotModified
-from concurrent.futures import ThreadPoolExecutor
 from pyrogram.errors import FloodWait
 
 from config import Config
@@ -18,65 +14,15 @@ import bot.helpers.translations as lang
 from ..logger import LOGGER
 from ..settings import bot_set
 from .buttons.links import links_button
-from .message import send_message, edit_message
+from .message import send_message, send_error, edit_message, TrackSends
+from . import rclone_rc
+from .archive import ArchiveParts
+from .pipeline import Pipeline
 
 
 MAX_SIZE = 1.9 * 1024 * 1024 * 1024  # 2GB
 # download folder structure : BASE_DOWNLOAD_DIR + message_r_id
 
-async def download_file(url, path, retries=3, timeout=30, cancel_event: asyncio.Event | None = None):
-    """
-    Download a file with retry logic, timeout, and cooperative cancellation
-    Args:
-        url (str): URL to download
-        path (str): Full path to save the file
-        retries (int): Number of retry attempts
-        timeout (int): Timeout in seconds
-        cancel_event: Optional asyncio.Event to signal cancellation
-    Returns:
-        str or None: Error message if failed, else None
-    """
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-
-    for attempt in range(1, retries + 1):
-        try:
-            if cancel_event and cancel_event.is_set():
-                # Clean partial file if any
-                try:
-                    if os.path.exists(path):
-                        os.remove(path)
-                except Exception:
-                    pass
-                return "Cancelled"
-            async with aiohttp.ClientSession(timeout=ClientTimeout(total=timeout)) as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        with open(path, 'wb') as f:
-                            async for chunk in response.content.iter_chunked(1024 * 4):
-                                if cancel_event and cancel_event.is_set():
-                                    try:
-                                        f.close()
-                                    except Exception:
-                                        pass
-                                    try:
-                                        if os.path.exists(path):
-                                            os.remove(path)
-                                    except Exception:
-                                        pass
-                                    return "Cancelled"
-                                f.write(chunk)
-                        return None
-                    else:
-                        return f"HTTP Status: {response.status}"
-        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-            if attempt == retries:
-                return f"Failed after {retries} attempts: {str(e)}"
-            await asyncio.sleep(2 ** attempt)
-        except Exception as e:
-            return f"Unexpected error: {str(e)}"
-
-
-
 async def format_string(text:str, data:dict, user=None):
     """
     Args:
@@ -131,6 +77,43 @@ async def run_concurrent_tasks(tasks, progress_details=None):
     await asyncio.gather(*(sem_task(task) for task in tasks))
 
 
+async def run_pipelined_tasks(tasks, items, user, progress_details=None):
+    """
+    Like run_concurrent_tasks, but each downloaded track is sent to Telegram
+    while the remaining tasks are still downloading. Tracks go up
+    TG_UPLOAD_WORKERS at a time, as albums of up to 10 when TG_MEDIA_GROUP
+    is on, and show up in the original order (see TrackSends).
+    Args:
+        tasks: (list) async download functions, one per item
+        items: (list) metadata dicts filled in by the matching task
+        user: user details
+        progress_details: details for progress message (dict)
+    """
+    i = [0]
+    l = len(tasks)
+    async def download(index):
+        result = await tasks[index]
+        if progress_details and result:
+            i[0]+=1 # currently done
+            await progress_message(i[0], l, progress_details)
+        # failed tracks return the error message instead of True
+        if result is not True or not os.path.isfile(items[index].get('filepath') or ''):
+            return None
+        return items[index]
+
+    async def upload(track):
+        await sends.add({'filepath': track['filepath'], 'meta': track})
+
+    sends = TrackSends(user, cancel_event=user.get('cancel_event'), total=l)
+    try:
+        async with Pipeline((download, Config.MAX_WORKERS), (upload, 1)) as pipe:
+            for index in range(l):
+                await pipe.put(index)
+        await sends.join()
+    finally:
+        sends.cancel()
+
+
 async def create_link(path, basepath):
     """
     Creates rclone and index link
@@ -147,20 +130,7 @@ async def create_link(path, basepath):
     index_link = None
 
     if bot_set.link_options == 'RCLONE' or bot_set.link_options=='Both':
-        cmd = f'rclone link --config ./rclone.conf "{Config.RCLONE_DEST}/{path}"'
-        task = await asyncio.create_subprocess_shell(
-            cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-
-        stdout, stderr = await task.communicate()
-
-        if task.returncode == 0:
-            rclone_link = stdout.decode().strip()
-        else:
-            error_message = stderr.decode().strip()
-            LOGGER.debug(f"Failed to get link: {error_message}")
+        rclone_link = await rclone_rc.public_link(f"{Config.RCLONE_DEST}/{path}")
     if bot_set.link_options == 'Index' or bot_set.link_options=='Both':
         if Config.INDEX_LINK:
             index_link =  Config.INDEX_LINK + '/' + quote(path)
@@ -168,84 +138,6 @@ async def create_link(path, basepath):
     return rclone_link, index_link
 
 
-async def zip_handler(folderpath):
-    loop = asyncio.get_running_loop()
-    with ThreadPoolExecutor() as pool:
-        if bot_set.upload_mode == 'Telegram':
-            zips = await loop.run_in_executor(pool, split_zip_folder, folderpath)
-        else:
-            zips = await loop.run_in_executor(pool, zip_folder, folderpath)
-        return zips
-
-
-def split_zip_folder(folderpath) -> list:
-    """
-    Args:
-        folderpath: path to folder to zip
-    Returns:
-        list of zip file paths
-    """
-    zip_paths = []
-    part_num = 1
-    current_size = 0
-    current_files = []
-
-    def add_to_zip(zip_name, files_to_add):
-        if part_num == 1:
-            zip_path = f"{zip_name}.zip"
-        else:
-            zip_path = f"{zip_name}.part{part_num}.zip"
-
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for file_path, arcname in files_to_add:
-                zipf.write(file_path, arcname)
-                os.remove(file_path)  # Delete the file after zipping
-        return zip_path
-
-    for root, dirs, files in os.walk(folderpath):
-        for file in files:
-            file_path = os.path.join(root, file)
-            file_size = os.path.getsize(file_path)
-            arcname = os.path.relpath(file_path, folderpath)
-
-            # If adding this file would exceed the max size, create a zip for the current files
-            if current_size + file_size > MAX_SIZE:
-                zip_paths.append(add_to_zip(folderpath, current_files))
-                part_num += 1
-                current_files = []  # Reset for the next zip part
-                current_size = 0
-
-            # Add the file to the current group
-            current_files.append((file_path, arcname))
-            current_size += file_size
-
-    # Create the final zip with any remaining files
-    if current_files:
-        zip_paths.append(add_to_zip(folderpath, current_files))
-
-    return zip_paths
-
-
-def zip_folder(folderpath) -> str:
-    """
-    Args:
-        folderpath (str): The path of the folder to zip.
-    Returns:
-        str: The path to the created zip file.
-    """
-    zip_path = f"{folderpath}.zip"
-
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for root, dirs, files in os.walk(folderpath):
-            for file in files:
-                file_path = os.path.join(root, file)
-                zipf.write(file_path, os.path.relpath(file_path, folderpath))
-                # Remove file after adding to the zip
-                os.remove(file_path)
-
-    return zip_path
-
-
 async def move_sorted_playlist(metadata, user) -> str:
     """
     Moves the sorted playlist files into a new playlist folder.
@@ -380,7 +272,11 @@ async def cleanup(user=None, metadata=None, ):
             else:
                 is_zip = True if bot_set.playlist_zip else False
             if is_zip:
-                if type(metadata['folderpath']) == list:
+                if isinstance(metadata['folderpath'], ArchiveParts):
+                    # parts are removed as they are uploaded; drop any leftover
+                    metadata['folderpath'].discard()
+                    shutil.rmtree(metadata['folderpath'].folderpath)
+                elif type(metadata['folderpath']) == list:
                     for i in metadata['folderpath']:
                         os.remove(i)
                 else:
@@ -1,19 +1,27 @@
 import os
 import asyncio
+import functools
 import re
 import time
 
-from pyrogram.types import Message
+from pyrogram import raw
+from pyrogram.types import Message, InputMediaAudio
 from pyrogram.errors import MessageNotModified, FloodWait
 from pyrogram.enums import ParseMode
+from pyrogram.file_id import FileId, FileType
 
+from config import Config
 from bot.settings import bot_set
 from bot.logger import LOGGER
 
 import bot.helpers.translations as lang
+from .cover_cache import cover_cache
+from .flood_control import flood_control
 
 current_user = []
 
+MEDIA_GROUP_SIZE = 10  # Telegram albums hold 2-10 items
+
 user_details = {
     'user_id': None,
     'name': None,
@@ -27,6 +35,90 @@ user_details = {
 }
 
 
+async def _resolve_thumbnail(meta: dict | None):
+    """Thumbnails may be local paths or image URLs; URLs are served from the cover cache."""
+    thumbnail = meta.get('thumbnail') if meta else None
+    if isinstance(thumbnail, str) and thumbnail.startswith(('http://', 'https://')):
+        thumbnail = await cover_cache.get(thumbnail)
+    return thumbnail
+
+
+class UploadOrder:
+    """Place of one upload in a run of concurrent uploads (see send_in_order)."""
+
+    def __init__(self, previous=None):
+        self.previous = previous
+        self.started = asyncio.Event()  # file transfer began
+        self.done = asyncio.Event()     # message posted (or failed)
+
+    async def wait_start(self):
+        if self.previous:
+            await self.previous.started.wait()
+
+    async def wait_previous(self):
+        if self.previous:
+            await self.previous.done.wait()
+
+
+class OrderedSends:
+    """
+    Streaming form of send_in_order: uploads are added one at a time (e.g.
+    as their files finish downloading) and run TG_UPLOAD_WORKERS at a time,
+    while their messages still show up in the order they were added.
+    add() waits while every worker is busy.
+    """
+
+    def __init__(self, workers=None):
+        self._semaphore = asyncio.Semaphore(workers or Config.TG_UPLOAD_WORKERS)
+        self._order = None
+        self._tasks = []
+
+    async def add(self, upload):
+        """Queue an async function taking an UploadOrder (passed on to send_message(order=...))."""
+        await self._semaphore.acquire()
+        self._order = UploadOrder(self._order)
+        self._tasks.append(asyncio.create_task(self._run(upload, self._order)))
+
+    async def _run(self, upload, order):
+        try:
+            await order.wait_start()
+            return await upload(order)
+        finally:
+            order.started.set()
+            order.done.set()
+            self._semaphore.release()
+
+    async def join(self) -> list:
+        """Wait for every added upload; returns their results in order."""
+        return await asyncio.gather(*self._tasks)
+
+    def cancel(self):
+        for task in self._tasks:
+            task.cancel()
+
+
+async def send_in_order(uploads, workers=None) -> list:
+    """
+    Run uploads several at a time while their messages still show up in the
+    given order. Each upload is an async function taking an UploadOrder that
+    it passes on to send_message(order=...). An upload starts once the one
+    before it is transferring its file, and its message is posted only after
+    the previous message, so files go up in parallel but land in sequence.
+    Args:
+        uploads: async functions taking an UploadOrder
+        workers: uploads running at once (defaults to TG_UPLOAD_WORKERS)
+    Returns:
+        Results of the uploads, in order
+    """
+    sends = OrderedSends(workers)
+    try:
+        for upload in uploads:
+            await sends.add(upload)
+        return await sends.join()
+    finally:
+        sends.cancel()
+
+
 async def fetch_user_details(msg: Message, reply=False) -> dict:
     details = user_details.copy()
     details['user_id'] = msg.from_user.id
@@ -79,33 +171,30 @@ async def antiSpam(uid=None, cid=None, revoke=False) -> bool:
         return False
 
 
-async def send_message(user, item, itype='text', caption=None, markup=None, chat_id=None, meta=None, progress_reporter=None, progress_label=None, file_index=None, total_files=None, cancel_event: asyncio.Event | None = None):
-    from bot.tgclient import aio
+async def send_message(user, item, itype='text', caption=None, markup=None, chat_id=None, meta=None, progress_reporter=None, progress_label=None, file_index=None, total_files=None, cancel_event: asyncio.Event | None = None, order: UploadOrder | None = None):
     if not isinstance(user, dict):
         user = await fetch_user_details(user)
     chat_id = chat_id if chat_id else user['chat_id']
     msg = None
-    
-    # Get the running event loop safely in the main async context
-    try:
-        main_loop = asyncio.get_running_loop()
-    except RuntimeError:
-        # Fallback for scenarios where there might not be a running loop
-        # (though unlikely in this bot's architecture)
-        main_loop = asyncio.get_event_loop()
-
-    # Progress callback wrapper for uploads
-    def _make_progress_cb(loop, label=None, index=None, total=None):
+
+    # Progress callback for uploads; pyrogram awaits it after every chunk
+    def _make_progress_cb(label=None, index=None, total=None):
         # This dictionary holds the state for the throttle.
         throttle_state = {
             'last_update_time': 0,
             'min_interval': 2.0
         }
 
-        def _cb(current, total_bytes):
+        async def _cb(current, total_bytes):
             if cancel_event and cancel_event.is_set():
                 raise RuntimeError("Upload cancelled by user.")
 
+            if order:
+                order.started.set()
+                if current >= total_bytes:
+                    # Last chunk: post this message only after the previous one
+                    await order.wait_previous()
+
             now = time.monotonic()
             if now - throttle_state['last_update_time'] < throttle_state['min_interval']:
                 return
@@ -114,17 +203,15 @@ async def send_message(user, item, itype='text', caption=None, markup=None, chat
 
             if progress_reporter:
                 try:
-                    # Use the loop object that was passed in from the main thread
-                    loop.create_task(progress_reporter.update_upload(
+                    await progress_reporter.update_upload(
                         current,
                         total_bytes,
                         file_index=index,
                         file_total=total,
                         label=label or 'Uploading'
-                    ))
+                    )
                 except Exception as e:
-                    # Log if task creation fails
-                    LOGGER.error(f"Failed to schedule progress update: {e}")
+                    LOGGER.error(f"Failed to update upload progress: {e}")
 
         return _cb
 
@@ -139,77 +226,402 @@ async def send_message(user, item, itype='text', caption=None, markup=None, chat
         except Exception:
             pass
 
-    # Create the progress callback instance using the main loop
-    progress_callback = _make_progress_cb(main_loop, progress_label, file_index, total_files) if progress_reporter else None
+    progress_callback = _make_progress_cb(progress_label, file_index, total_files) if (progress_reporter or order) else None
 
-    try:
-        if itype == 'text':
-            msg = await aio.send_message(
-                chat_id=chat_id,
-                text=item,
-                reply_to_message_id=user['r_id'],
-                reply_markup=markup,
-                disable_web_page_preview=True,
-                parse_mode=ParseMode.HTML
-            )
-        elif itype == 'doc':
-            msg = await aio.send_document(
-                chat_id=chat_id,
-                document=item,
-                caption=caption,
-                reply_to_message_id=user['r_id'],
-                progress=progress_callback
-            )
-        elif itype == 'audio':
-            duration = int(meta.get('duration', 0)) if meta else 0
-            artist = meta.get('artist', 'Unknown Artist') if meta else 'Unknown Artist'
-            title = meta.get('title', 'Unknown Track') if meta else 'Unknown Track'
-            thumbnail = meta.get('thumbnail') if meta else None
-            
-            msg = await aio.send_audio(
-                chat_id=chat_id,
-                audio=item,
-                caption=caption,
-                duration=duration,
-                performer=artist,
-                title=title,
-                thumb=thumbnail,
-                reply_to_message_id=user['r_id'],
-                progress=progress_callback
-            )
-        elif itype == 'video':
-            duration = int(meta.get('duration', 0)) if meta else 0
-            width = int(meta.get('width', 1920)) if meta else 1920
-            height = int(meta.get('height', 1080)) if meta else 1080
-            thumbnail = meta.get('thumbnail') if meta else None
-            
-            msg = await aio.send_video(
-                chat_id=chat_id,
-                video=item,
-                caption=caption,
-                duration=duration,
-                width=width,
-                height=height,
-                thumb=thumbnail,
-                reply_to_message_id=user['r_id'],
-                progress=progress_callback
-            )
-        elif itype == 'pic':
-            msg = await aio.send_photo(
-                chat_id=chat_id,
-                photo=item,
-                caption=caption,
-                reply_to_message_id=user['r_id']
-            )
-    except FloodWait as e:
-        await asyncio.sleep(e.value)
-        return await send_message(user, item, itype, caption, markup, chat_id, meta, progress_reporter, progress_label, file_index, total_files, cancel_event)
-    except Exception as e:
-        LOGGER.error(f"Error sending message: {str(e)}")
-    
+    # Nothing is uploaded for text or file ids, so keep the order right here
+    if order and not (itype in ('doc', 'audio', 'video') and isinstance(item, str) and await asyncio.to_thread(os.path.isfile, item)):
+        order.started.set()
+        await order.wait_previous()
+
+    while True:
+        # Every send takes a token from the bot-wide bucket; FloodWait pauses all of them
+        await flood_control.acquire()
+        try:
+            msg = await _send(user, item, itype, caption, markup, chat_id, meta, progress_callback)
+            flood_control.reward()
+            _record_sent(user, msg, caption, meta)
+        except FloodWait as e:
+            flood_control.penalize(e.value)
+            continue
+        except Exception as e:
+            LOGGER.error(f"Error sending message: {str(e)}")
+            if itype in ('doc', 'audio', 'video'):
+                mark_incomplete(user)
+        return msg
+
+
+def mark_incomplete(user):
+    """Note that part of a task's result failed to download or upload, so its files are not cached."""
+    if isinstance(user, dict) and user.get('sent_files') is not None:
+        user['incomplete'] = True
+
+
+async def send_error(user, text):
+    """Report a failed item to the user and mark the task's result incomplete."""
+    mark_incomplete(user)
+    return await send_message(user, text)
+
+
+def _record_sent(user, msg, caption=None, meta=None):
+    """Note the file_id of a sent file in user['sent_files'] (when the task collects them)."""
+    files = user.get('sent_files')
+    if files is None or not msg:
+        return
+    for attr, kind in (('audio', 'audio'), ('video', 'video'), ('document', 'doc')):
+        media = getattr(msg, attr, None)
+        if media:
+            files.append({
+                'track_id': str(meta.get('itemid') or meta.get('id') or '') or None if meta else None,
+                'file_id': media.file_id,
+                'kind': kind,
+                'caption': caption,
+                'file_size': media.file_size or 0
+            })
+            return
+
+
+async def _send(user, item, itype, caption, markup, chat_id, meta, progress_callback):
+    from bot.tgclient import aio
+    msg = None
+    if itype == 'text':
+        msg = await aio.send_message(
+            chat_id=chat_id,
+            text=item,
+            reply_to_message_id=user['r_id'],
+            reply_markup=markup,
+            disable_web_page_preview=True,
+            parse_mode=ParseMode.HTML
+        )
+    elif itype == 'doc':
+        msg = await aio.send_document(
+            chat_id=chat_id,
+            document=item,
+            caption=caption,
+            reply_to_message_id=user['r_id'],
+            progress=progress_callback
+        )
+    elif itype == 'audio':
+        duration = int(meta.get('duration', 0)) if meta else 0
+        artist = meta.get('artist', 'Unknown Artist') if meta else 'Unknown Artist'
+        title = meta.get('title', 'Unknown Track') if meta else 'Unknown Track'
+        thumbnail = await _resolve_thumbnail(meta)
+        
+        msg = await aio.send_audio(
+            chat_id=chat_id,
+            audio=item,
+            caption=caption,
+            duration=duration,
+            performer=artist,
+            title=title,
+            thumb=thumbnail,
+            reply_to_message_id=user['r_id'],
+            progress=progress_callback
+        )
+    elif itype == 'video':
+        duration = int(meta.get('duration', 0)) if meta else 0
+        width = int(meta.get('width', 1920)) if meta else 1920
+        height = int(meta.get('height', 1080)) if meta else 1080
+        thumbnail = await _resolve_thumbnail(meta)
+        
+        msg = await aio.send_video(
+            chat_id=chat_id,
+            video=item,
+            caption=caption,
+            duration=duration,
+            width=width,
+            height=height,
+            thumb=thumbnail,
+            reply_to_message_id=user['r_id'],
+            progress=progress_callback
+        )
+    elif itype == 'pic':
+        msg = await aio.send_photo(
+            chat_id=chat_id,
+            photo=item,
+            caption=caption,
+            reply_to_message_id=user['r_id']
+        )
     return msg
 
 
+async def _upload_audio(chat_id, path, meta, progress=None) -> str:
+    """Upload an audio file (with its thumbnail) without posting it and return its file_id."""
+    from bot.tgclient import aio
+    thumbnail = await _resolve_thumbnail(meta)
+    file = await aio.save_file(path, progress=progress)
+    thumb = await aio.save_file(thumbnail)
+    uploaded = raw.types.InputMediaUploadedDocument(
+        mime_type=aio.guess_mime_type(path) or "audio/mpeg",
+        file=file,
+        thumb=thumb,
+        attributes=[
+            raw.types.DocumentAttributeAudio(
+                duration=int(meta.get('duration', 0)) if meta else 0,
+                performer=meta.get('artist', 'Unknown Artist') if meta else 'Unknown Artist',
+                title=meta.get('title', 'Unknown Track') if meta else 'Unknown Track'
+            ),
+            raw.types.DocumentAttributeFilename(file_name=os.path.basename(path))
+        ]
+    )
+    while True:
+        try:
+            media = await aio.invoke(
+                raw.functions.messages.UploadMedia(peer=await aio.resolve_peer(chat_id), media=uploaded)
+            )
+            break
+        except FloodWait as e:
+            flood_control.penalize(e.value)
+            await flood_control.acquire()
+    doc = media.document
+    return FileId(
+        file_type=FileType.AUDIO,
+        dc_id=doc.dc_id,
+        media_id=doc.id,
+        access_hash=doc.access_hash,
+        file_reference=doc.file_reference
+    ).encode()
+
+
+class TrackSends:
+    """
+    Send audio tracks to Telegram while more are still being added (e.g.
+    from the last stage of a download pipeline). Files go up
+    TG_UPLOAD_WORKERS at a time and are posted in the order they were
+    added: as albums of up to 10 when grouped (TG_MEDIA_GROUP), otherwise
+    one message each. Tracks whose upload or album fails are sent on their own.
+
+        sends = TrackSends(user, total=len(tracks))
+        try:
+            for track in tracks:
+                await sends.add(track)
+            messages = await sends.join()
+        finally:
+            sends.cancel()
+    """
+
+    def __init__(self, user, progress_reporter=None, cancel_event: asyncio.Event | None = None,
+                 total: int | None = None, group: bool | None = None):
+        """
+        Args:
+            user: user details
+            progress_reporter: Optional ProgressReporter
+            cancel_event: Optional asyncio.Event to stop between files
+            total: Number of tracks expected, for progress display
+            group: Post albums of up to 10 (defaults to TG_MEDIA_GROUP)
+        """
+        self.user = user
+        self.progress_reporter = progress_reporter
+        self.cancel_event = cancel_event
+        self.total = total
+        self.group = Config.TG_MEDIA_GROUP if group is None else group
+        self.sent = []
+        self._count = 0
+        self._semaphore = asyncio.Semaphore(Config.TG_UPLOAD_WORKERS)
+        self._throttle = {'last': 0.0}
+        self._ordered = OrderedSends()
+        self._batch = []    # (track, upload task) of the album being filled
+        self._uploads = []
+        self._units = asyncio.Queue()  # albums / other uploads, in posting order
+        self._poster = None
+
+    async def _start(self):
+        if self._count == 1 and self.progress_reporter:
+            try:
+                await self.progress_reporter.set_stage('Uploading')
+            except Exception:
+                pass
+        if self.group and self._poster is None:
+            self._poster = asyncio.create_task(self._post_units())
+
+    async def add(self, track: dict):
+        """
+        Queue a track: a dict with 'filepath' (or an already uploaded 'file_id'),
+        'meta' and optional 'caption'. Waits while every upload worker is busy.
+        """
+        self._count += 1
+        index = self._count
+        await self._start()
+        if not self.group:
+            await self._ordered.add(functools.partial(self._send_track, index, track))
+            return
+        await self._semaphore.acquire()
+        task = asyncio.create_task(self._upload(index, track))
+        self._uploads.append(task)
+        self._batch.append((track, task))
+        if len(self._batch) == MEDIA_GROUP_SIZE:
+            self._units.put_nowait(self._batch)
+            self._batch = []
+
+    async def add_upload(self, upload):
+        """
+        Queue any other upload (e.g. a music video) as an async function without
+        arguments. It runs after everything added before it has been posted.
+        """
+        self._count += 1
+        await self._start()
+        if not self.group:
+            async def run(order):
+                await order.wait_previous()
+                return await upload()
+            await self._ordered.add(run)
+            return
+        if self._batch:
+            self._units.put_nowait(self._batch)
+            self._batch = []
+        self._units.put_nowait(upload)
+
+    async def join(self) -> list:
+        """Post everything that was added and return the sent messages."""
+        if not self.group:
+            await self._ordered.join()
+            return self.sent
+        if self._batch:
+            self._units.put_nowait(self._batch)
+            self._batch = []
+        self._units.put_nowait(None)
+        if self._poster:
+            await self._poster
+        return self.sent
+
+    def cancel(self):
+        self._ordered.cancel()
+        if self._poster:
+            self._poster.cancel()
+        for task in self._uploads:
+            task.cancel()
+
+    async def _send_track(self, index, track, order):
+        msg = await send_message(
+            self.user, track.get('file_id') or track['filepath'], 'audio',
+            caption=track.get('caption'), meta=track.get('meta'),
+            progress_reporter=self.progress_reporter, progress_label='Uploading',
+            file_index=index, total_files=self.total,
+            cancel_event=self.cancel_event, order=order
+        )
+        if msg:
+            self.sent.append(msg)
+        return msg
+
+    async def _upload(self, index, track):
+        """Upload a track without posting it and return its file_id (None on failure)."""
+        try:
+            if self.cancel_event and self.cancel_event.is_set():
+                return None
+            if track.get('file_id'):
+                return track['file_id']
+
+            async def progress(current, total_bytes):
+                now = time.monotonic()
+                if self.progress_reporter and (now - self._throttle['last'] >= 2.0 or current >= total_bytes):
+                    self._throttle['last'] = now
+                    try:
+                        await self.progress_reporter.update_upload(current, total_bytes, file_index=index,
+                                                                   file_total=self.total, label='Uploading')
+                    except Exception:
+                        pass
+
+            try:
+                return await _upload_audio(self.user['chat_id'], track['filepath'], track.get('meta'), progress)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                LOGGER.error(f"Uploading {track['filepath']} for an album failed: {e}")
+                return None
+        finally:
+            self._semaphore.release()
+
+    async def _post_units(self):
+        while True:
+            unit = await self._units.get()
+            if unit is None:
+                return
+            if self.cancel_event and self.cancel_event.is_set():
+                continue
+            if callable(unit):
+                try:
+                    await unit()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    LOGGER.error(f"Upload failed: {e}")
+                continue
+            group = [track for track, _ in unit]
+            file_ids = [await task for _, task in unit]
+            if self.cancel_event and self.cancel_event.is_set():
+                continue
+            await self._post_album(group, file_ids)
+
+    async def _post_album(self, group, file_ids):
+        from bot.tgclient import aio
+        user = self.user
+        ready = [(track, file_id) for track, file_id in zip(group, file_ids) if file_id]
+
+        messages = None
+        if len(ready) > 1:
+            media = [
+                InputMediaAudio(
+                    file_id,
+                    caption=track.get('caption') or '',
+                    duration=int(track['meta'].get('duration', 0)) if track.get('meta') else 0,
+                    performer=track['meta'].get('artist', '') if track.get('meta') else '',
+                    title=track['meta'].get('title', '') if track.get('meta') else ''
+                )
+                for track, file_id in ready
+            ]
+            while True:
+                await flood_control.acquire()
+                try:
+                    messages = await aio.send_media_group(user['chat_id'], media, reply_to_message_id=user['r_id'])
+                    flood_control.reward()
+                except FloodWait as e:
+                    flood_control.penalize(e.value)
+                    continue
+                except Exception as e:
+                    LOGGER.error(f"Sending album of {len(media)} tracks failed, sending them one by one: {e}")
+                break
+
+        if messages:
+            self.sent.extend(messages)
+            for (track, _), msg in zip(ready, messages):
+                _record_sent(user, msg, track.get('caption'), track.get('meta'))
+        else:
+            # already uploaded tracks go out by file_id, no second upload
+            for track, file_id in ready:
+                msg = await send_message(user, file_id, 'audio', caption=track.get('caption'), meta=track.get('meta'))
+                if msg:
+                    self.sent.append(msg)
+        for track, file_id in zip(group, file_ids):
+            if not file_id and track.get('filepath'):
+                msg = await send_message(user, track['filepath'], 'audio', caption=track.get('caption'),
+                                         meta=track.get('meta'), progress_reporter=self.progress_reporter,
+                                         cancel_event=self.cancel_event)
+                if msg:
+                    self.sent.append(msg)
+
+
+async def send_audio_group(user, tracks, progress_reporter=None, cancel_event: asyncio.Event | None = None) -> list:
+    """
+    Post tracks as Telegram albums of up to 10 audios instead of one message each.
+    Files are uploaded TG_UPLOAD_WORKERS at a time without being posted, and
+    each album goes out in a single call as soon as its files are up, while
+    the following files keep uploading (see TrackSends).
+    Args:
+        user: user details
+        tracks: dicts with 'filepath' (or an already uploaded 'file_id'), 'meta' and optional 'caption'
+        progress_reporter: Optional ProgressReporter
+        cancel_event: Optional asyncio.Event to stop between files
+    Returns:
+        Sent messages
+    """
+    sends = TrackSends(user, progress_reporter, cancel_event, total=len(tracks), group=True)
+    try:
+        for track in tracks:
+            await sends.add(track)
+        return await sends.join()
+    finally:
+        sends.cancel()
+
+
 async def edit_message(msg:Message, text, markup=None, antiflood=True):
     from bot.tgclient import aio
     try:
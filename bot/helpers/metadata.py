@@ -8,7 +8,7 @@ from mutagen.id3 import TALB, TCOP, TDRC, TIT2, TPE1, TRCK, APIC, \
     TCON, TOPE, TSRC, USLT, TPOS, TXXX
 
 from bot.logger import LOGGER
-from .utils import download_file
+from .cover_cache import cover_cache
 
 
 metadata = {
@@ -167,7 +167,7 @@ async def create_cover_file(url:dict, meta:dict, thumbnail=False):
     cover = meta['tempfolder'] + filename
     
     if not os.path.exists(cover):
-        err = await download_file(url, cover, 1, 5)
-        if err:
+        # served from the shared cover cache; only a miss hits the network
+        if not await cover_cache.fetch_to(url, cover):
             return './project-siesta.png'
     return cover
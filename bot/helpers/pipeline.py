@@ -0,0 +1,149 @@
+import asyncio
+
+from typing import Any, Awaitable, Callable, Optional
+
+from config import Config
+from ..logger import LOGGER
+
+
+StageFn = Callable[[Any], Awaitable[Any]]
+
+_END = object()
+_FAILED = object()
+
+
+class Pipeline:
+    """
+    Run items through a chain of async stages (e.g. download → tag → upload)
+    connected by bounded queues, so an item moves on as soon as its previous
+    stage is done instead of waiting for the whole batch.
+
+    Each stage is given as (fn, workers) and passes its return value on to
+    the next one; returning None or raising drops the item. The last stage
+    runs with a single worker and sees items in the order they were put,
+    whichever order earlier stages finish them in.
+    A full queue blocks the stage feeding it, which keeps at most a few
+    finished files waiting on disk ahead of a slow stage. Leaving the block
+    with an exception, or after cancel(), drops whatever is still queued.
+
+        async with Pipeline((download, 4), (upload, 1)) as pipe:
+            for track in tracks:
+                await pipe.put(track)
+    """
+
+    def __init__(self, *stages: tuple[StageFn, int], maxsize: Optional[int] = None):
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+        self.maxsize = max(1, maxsize or Config.PIPELINE_QUEUE_SIZE)
+        self._stages = [(fn, max(1, workers)) for fn, workers in stages]
+        self._queues = [asyncio.Queue(self.maxsize) for _ in self._stages[:-1]]
+        self._workers: list[list[asyncio.Task]] = []
+        self._final: Optional[asyncio.Task] = None
+        self._order = asyncio.Condition()
+        self._pending: dict[int, Any] = {}
+        self._next = 0
+        self._count = 0
+        self._closed = False
+        self._cancelled = False
+        self.done = 0
+        self.failed = 0
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None and not self._cancelled:
+            await self.join()
+        else:
+            await self.cancel()
+        return False
+
+    def start(self):
+        for index, (fn, workers) in enumerate(self._stages[:-1]):
+            self._workers.append([
+                asyncio.create_task(self._worker(index, fn)) for _ in range(workers)
+            ])
+        self._final = asyncio.create_task(self._final_worker(self._stages[-1][0]))
+
+    async def put(self, item):
+        """Queue an item for the first stage, waiting while the queue is full."""
+        seq = self._count
+        self._count += 1
+        if self._queues:
+            await self._queues[0].put((seq, item))
+        else:
+            await self._deliver(seq, item)
+
+    async def join(self):
+        """Close the input and wait until every queued item went through all stages."""
+        for index, workers in enumerate(self._workers):
+            for _ in workers:
+                await self._queues[index].put(_END)
+            await asyncio.gather(*workers)
+        async with self._order:
+            self._closed = True
+            self._order.notify_all()
+        await self._final
+
+    async def cancel(self):
+        """Stop every stage; items still queued or in progress are dropped."""
+        self._cancelled = True
+        tasks = [t for workers in self._workers for t in workers]
+        if self._final:
+            tasks.append(self._final)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, fn: StageFn, item):
+        try:
+            return await fn(item)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            LOGGER.error(f"Pipeline stage {getattr(fn, '__name__', fn)} failed: {e}")
+            return _FAILED
+
+    async def _worker(self, index: int, fn: StageFn):
+        queue = self._queues[index]
+        last = index == len(self._queues) - 1
+        while True:
+            entry = await queue.get()
+            if entry is _END:
+                return
+            seq, item = entry
+            result = await self._run(fn, item) if item is not None else None
+            if result is _FAILED:
+                result = None
+            # Dropped items still travel on as None so the final stage can keep order
+            if last:
+                await self._deliver(seq, result)
+            else:
+                await self._queues[index + 1].put((seq, result))
+
+    async def _deliver(self, seq: int, item):
+        """Hand an item to the final stage, holding back when too many wait out of order."""
+        async with self._order:
+            await self._order.wait_for(lambda: seq == self._next or len(self._pending) < self.maxsize)
+            self._pending[seq] = item
+            self._order.notify_all()
+
+    async def _final_worker(self, fn: StageFn):
+        while True:
+            async with self._order:
+                await self._order.wait_for(
+                    lambda: self._next in self._pending or (self._closed and self._next >= self._count)
+                )
+                if self._next not in self._pending:
+                    return
+                item = self._pending.pop(self._next)
+                self._next += 1
+                self._order.notify_all()
+            if item is None:
+                self.failed += 1
+                continue
+            if await self._run(fn, item) is _FAILED:
+                self.failed += 1
+            else:
+                self.done += 1
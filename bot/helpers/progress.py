@@ -54,6 +54,7 @@ class ProgressReporter:
         await self._maybe_update()
 
     async def update_zip(self, done: int, total: int):
+        """done/total are bytes written / bytes to archive"""
         self.zip_done = max(0, int(done))
         self.zip_total = max(0, int(total))
         await self._maybe_update()
@@ -116,7 +117,7 @@ class ProgressReporter:
         if self.zip_total:
             percent = int((self.zip_done / self.zip_total) * 100) if self.zip_total else 0
             bar = self._make_bar(percent)
-            lines.append(f"🗜️ {bar} {percent}%  •  Files: {self.zip_done}/{self.zip_total}")
+            lines.append(f"🗜️ {bar} {percent}%  •  {_readable_size(self.zip_done)}/{_readable_size(self.zip_total)}")
 
         # Upload section
         if self.upload_total:
@@ -144,4 +145,11 @@ class ProgressReporter:
 
             return f"🖥️ CPU {cpu}% • RAM {mem_used}/{mem_total} GB • Disk {disk_used}/{disk_total} GB"
         except Exception:
-            return None
\ No newline at end of file
+            return None
+
+
+def _readable_size(num: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if num < 1024 or unit == "GB":
+            return f"{num:.0f}{unit}" if unit == "B" else f"{num:.1f}{unit}"
+        num /= 1024
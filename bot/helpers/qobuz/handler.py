@@ -5,6 +5,8 @@ from config import Config
 from pathvalidate import sanitize_filepath
 
 from ..legacy_utils import *
+from ..utils import zip_handler
+from ..http_client import download_file
 from ..metadata import set_metadata
 
 # FIXED IMPORT: Changed from ..uploder to ..uploader
@@ -32,7 +34,7 @@ async def start_qobuz(url:str, user:dict):
 async def start_album(item_id:int, user:dict, upload=True, basefolder=None):
     album_meta, err = await get_album_metadata(item_id, user['r_id'])
     if err:
-        return await send_message(user, err)
+        return await send_error(user, err)
 
     # Get user quality by doing a track request
     track_meta = await qobuz_api.get_track_url(album_meta['tracks'][0]['itemid'])
@@ -62,6 +64,13 @@ async def start_album(item_id:int, user:dict, upload=True, basefolder=None):
         'title': album_meta['title'],
         'type': album_meta['type']
     }
+
+    # Tracks go up (as albums of up to 10 with TG_MEDIA_GROUP) while the rest of the album downloads
+    if upload and bot_set.upload_mode == 'Telegram' and not bot_set.album_zip:
+        await run_pipelined_tasks(tasks, album_meta['tracks'], user, update_details)
+        await cleanup(None, album_meta)
+        return
+
     await run_concurrent_tasks(tasks, update_details)
 
     if bot_set.album_zip:
@@ -91,7 +100,7 @@ async def start_track(item_id:int, user:dict, track_meta:dict | None, upload=Tru
     if not track_meta:
         track_meta, err = await get_track_metadata(item_id, user['r_id'])
         if err:
-            return await send_message(user, err)
+            return await send_error(user, err)
         filepath = f"{Config.LEGACY_DOWNLOAD_BASE_DIR}/{user['r_id']}/{track_meta['provider']}/{track_meta['albumartist']}/{track_meta['album']}"
     else:
         # set base file path if doesnt exist in metadata
@@ -104,7 +113,7 @@ async def start_track(item_id:int, user:dict, track_meta:dict | None, upload=Tru
     try:
         url = raw_data['url']
     except KeyError:
-        return await send_message(user, lang.s.ERR_QOBUZ_NOT_AVAILABLE)
+        return await send_error(user, lang.s.ERR_QOBUZ_NOT_AVAILABLE)
 
     track_meta['extension'], track_meta['quality'] = await get_quality(raw_data)
 
@@ -116,7 +125,7 @@ async def start_track(item_id:int, user:dict, track_meta:dict | None, upload=Tru
 
     err = await download_file(url, filepath, cancel_event=user.get('cancel_event'))
     if err:
-        return await send_message(user, err)
+        return await send_error(user, err)
 
     await set_metadata(track_meta)
 
@@ -156,7 +165,9 @@ async def start_artist(albums, user, artist):
 
 
 async def start_playlist(tracks, playlist, user):
-    play_meta = await get_playlist_meta(playlist[0], tracks, user['r_id'])
+    # track metadata is resolved below while downloads are already running
+    play_meta = await get_playlist_meta(playlist[0], [], user['r_id'])
+    total = len(tracks)
 
     playlist_folder = None
 
@@ -184,15 +195,26 @@ async def start_playlist(tracks, playlist, user):
     upload = True
     if bot_set.playlist_conc:
         upload = False
+        semaphore = asyncio.Semaphore(Config.MAX_WORKERS)
+        done = [0]
+
+        async def run_track(track):
+            async with semaphore:
+                if await start_track(track['itemid'], user, track, upload, playlist_folder):
+                    done[0] += 1
+                    await progress_message(done[0], total, update_details)
+
         tasks = []
-        for track in play_meta['tracks']:
-            tasks.append(start_track(track['itemid'], user, track, upload, playlist_folder))
-        await run_concurrent_tasks(tasks, update_details)
+        async for track in iter_playlist_tracks(tracks, user['r_id']):
+            play_meta['tracks'].append(track)
+            tasks.append(asyncio.ensure_future(run_track(track)))
+        await asyncio.gather(*tasks)
     else:
         i = 0
         if bot_set.playlist_zip: upload = False
-        for track in play_meta['tracks']:
-            await progress_message(i, len(play_meta['tracks']), update_details)
+        async for track in iter_playlist_tracks(tracks, user['r_id']):
+            play_meta['tracks'].append(track)
+            await progress_message(i, total, update_details)
             await start_track(track['itemid'], user, track, upload, playlist_folder, bot_set.disable_sort_link, True)
             i+=1
 
@@ -1,7 +1,6 @@
 # From vitiko98/qobuz-dl
 import time
 import hashlib
-import aiohttp
 import aiolimiter
 
 from config import Config
@@ -9,6 +8,7 @@ from config import Config
 from .bundle import Bundle
 
 from bot.logger import LOGGER
+from ..http_client import new_session
 
 class QoClient:
     def __init__(self):
@@ -166,7 +166,7 @@ class QoClient:
 
     async def login(self):
         self.get_tokens()
-        self.session = aiohttp.ClientSession()
+        self.session = new_session()
         #self.rate_limiter = self.get_rate_limiter(30)
         self.session.headers.update(
             {
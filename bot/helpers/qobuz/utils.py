@@ -1,6 +1,7 @@
 # From vitiko98/qobuz-dl
 import re
 import copy
+import asyncio
 import bot.helpers.translations as lang
 
 from .qopy import qobuz_api
@@ -13,13 +14,17 @@ from bot.settings import bot_set
 from config import Config
 
 
+# Playlist tracks whose metadata is resolved ahead of the downloads
+PLAYLIST_META_WORKERS = 8
 
-async def get_track_metadata(item_id, r_id, q_meta=None):
+
+async def get_track_metadata(item_id, r_id, q_meta=None, covers=None):
     """
     Args:
         item_id : track id
         r_id: reply to message id
         q_meta : raw metadata from qobuz (pre-fetched)
+        covers : dict shared between tracks so each album cover is fetched once
     """
     if q_meta is None:
         raw_meta = await qobuz_api.get_track_url(item_id)
@@ -54,11 +59,33 @@ async def get_track_metadata(item_id, r_id, q_meta=None):
     metadata['provider'] = 'Qobuz'
     metadata['type'] = 'track'
 
-    metadata['cover'] = await create_cover_file(q_meta['album']['image']['large'], metadata)
-    metadata['thumbnail'] = await create_cover_file(q_meta['album']['image']['thumbnail'], metadata, True)
+    if covers is not None:
+        metadata['cover'], metadata['thumbnail'] = await get_album_covers(q_meta['album'], metadata, covers)
+    else:
+        metadata['cover'] = await create_cover_file(q_meta['album']['image']['large'], metadata)
+        metadata['thumbnail'] = await create_cover_file(q_meta['album']['image']['thumbnail'], metadata, True)
 
     return metadata, None
 
+
+async def get_album_covers(album:dict, meta:dict, covers:dict):
+    """
+    Download cover and thumbnail of an album once; concurrent callers for
+    the same album wait on the same download.
+    Args:
+        album : raw album metadata from qobuz (as nested in a track)
+        meta : track metadata (for tempfolder)
+        covers : album id -> future of (cover, thumbnail)
+    """
+    key = album.get('id') or album['image']['large']
+    if key not in covers:
+        cover_meta = {'itemid': f"album-{key}", 'tempfolder': meta['tempfolder']}
+        covers[key] = asyncio.ensure_future(asyncio.gather(
+            create_cover_file(album['image']['large'], cover_meta),
+            create_cover_file(album['image']['thumbnail'], cover_meta, True)
+        ))
+    return await covers[key]
+
 async def get_album_metadata(item_id, r_id):
     q_meta = await qobuz_api.get_album_meta(item_id)
     if not q_meta.get('streamable'):
@@ -134,11 +161,42 @@ async def get_playlist_meta(raw_meta, tracks, r_id):
     metadata['cover'] = './project-siesta.png' #cannot get real playlist image
     metadata['thumbnail'] = './project-siesta.png'
 
-    for track in tracks:
-        track_meta, _ = await get_track_metadata(track['id'], r_id, track)
+    async for track_meta in iter_playlist_tracks(tracks, r_id):
         metadata['tracks'].append(track_meta)
     return metadata
 
+
+async def iter_playlist_tracks(tracks, r_id, workers=PLAYLIST_META_WORKERS):
+    """
+    Resolve playlist track metadata concurrently and yield it in playlist
+    order, so downloads can start before the whole playlist is resolved.
+    At most `workers` tracks are resolved ahead of the consumer; API calls
+    still go through qobuz_api.ratelimit.
+    Args:
+        tracks : list of tracks (raw metadata)
+        r_id: reply to message id
+    """
+    covers = {}
+    pending = []
+    track_iter = iter(tracks)
+
+    def schedule():
+        track = next(track_iter, None)
+        if track is not None:
+            pending.append(asyncio.ensure_future(get_track_metadata(track['id'], r_id, track, covers)))
+
+    for _ in range(max(1, workers)):
+        schedule()
+    try:
+        while pending:
+            track_meta, _ = await pending.pop(0)
+            schedule()
+            if track_meta:
+                yield track_meta
+    finally:
+        for task in pending:
+            task.cancel()
+
 async def get_artist_meta(artist_raw):
     """
     Args:
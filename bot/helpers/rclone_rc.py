@@ -0,0 +1,514 @@
+import os
+import json
+import time
+import shutil
+import socket
+import asyncio
+import secrets
+import aiohttp
+
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from config import Config
+from ..logger import LOGGER
+
+
+RCLONE_CONFIG_PATH = "./rclone.conf"
+START_TIMEOUT = 15       # seconds for rcd to answer its first call
+JOB_POLL_INTERVAL = 1.0  # seconds between job/status polls
+LIST_CACHE_DIRS = 2000   # directory listings kept in memory
+PREFETCH_DIRS = 5        # subdirectories listed ahead after a directory is shown
+
+# progress(bytes_done, bytes_total, speed_bytes_per_sec)
+ProgressCallback = Callable[[int, int, float], Awaitable[None]]
+
+
+class RcloneError(Exception):
+    pass
+
+
+def split_path(path: str) -> tuple[str, str]:
+    """
+    Split an rclone path into (fs, remote) for the RC API:
+    "gdrive:Music/a.flac" -> ("gdrive:", "Music/a.flac"), "/tmp/a.flac" -> ("/", "tmp/a.flac")
+    """
+    if not path.startswith('/') and ':' in path.split('/', 1)[0]:
+        name, rest = path.split(':', 1)
+        return f"{name}:", rest.strip('/')
+    return '/', os.path.abspath(path).lstrip('/')
+
+
+def join_path(fs: str, remote: str) -> str:
+    if not remote:
+        return fs
+    return f"{fs}{remote}" if fs.endswith((':', '/')) else f"{fs}/{remote}"
+
+
+class _Daemon:
+    """One `rclone rcd` process and the credentials to reach it."""
+
+    __slots__ = ("process", "url", "auth", "jobs", "retired")
+
+    def __init__(self, process: asyncio.subprocess.Process, url: str, auth: aiohttp.BasicAuth):
+        self.process = process
+        self.url = url
+        self.auth = auth
+        self.jobs = 0         # async jobs being waited on
+        self.retired = False  # replaced by a newer daemon, stop once jobs is 0
+
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+
+    async def stop(self):
+        if self.alive:
+            try:
+                self.process.terminate()
+                await asyncio.wait_for(self.process.wait(), 10)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+            except ProcessLookupError:
+                pass
+
+
+class RcloneRC:
+    """
+    A managed `rclone rcd` process and an async client for its remote
+    control API. Remotes are created once in the daemon and stay warm
+    (auth, directory caches), instead of every operation starting a new
+    rclone that re-reads rclone.conf and logs in again. Transfers run as
+    async jobs, report real byte progress and can be stopped by job id.
+
+    The daemon listens on a random loopback port with random credentials.
+    It is started with the bot and again on demand if it dies. After
+    rclone.conf changes (retire) new operations go to a fresh daemon,
+    while the old one finishes its running jobs and is then stopped.
+    """
+
+    def __init__(self, config_path: str = RCLONE_CONFIG_PATH):
+        self.config_path = config_path
+        self._daemon: Optional[_Daemon] = None
+        self._retired: set[_Daemon] = set()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = asyncio.Lock()
+        self._failed_at = 0.0
+
+    @staticmethod
+    def available() -> bool:
+        return Config.RCLONE_RC and shutil.which("rclone") is not None
+
+    @property
+    def running(self) -> bool:
+        return self._daemon is not None and self._daemon.alive
+
+    async def start(self) -> _Daemon:
+        """Start the daemon if it is not running. Raises RcloneError if it cannot be started."""
+        async with self._lock:
+            if self.running:
+                return self._daemon
+            if not self.available():
+                raise RcloneError("rclone rcd is disabled or rclone is not installed")
+            # don't retry a broken setup on every call
+            if time.monotonic() - self._failed_at < 60:
+                raise RcloneError("rclone rcd failed to start recently")
+            with socket.socket() as sock:
+                sock.bind(("127.0.0.1", 0))
+                port = sock.getsockname()[1]
+            user, password = secrets.token_hex(8), secrets.token_hex(16)
+            cmd = [
+                "rclone", "rcd",
+                "--config", self.config_path,
+                "--rc-addr", f"127.0.0.1:{port}",
+                "--rc-user", user,
+                "--rc-pass", password,
+                "--rc-job-expire-duration", "1h",
+            ]
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+                )
+            except OSError as e:
+                self._failed_at = time.monotonic()
+                raise RcloneError(f"could not start rclone rcd: {e}")
+            daemon = _Daemon(process, f"http://127.0.0.1:{port}/", aiohttp.BasicAuth(user, password))
+            if self._session is None or self._session.closed:
+                self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=None, sock_connect=5))
+            deadline = time.monotonic() + START_TIMEOUT
+            while True:
+                try:
+                    await self._post(daemon, "rc/noop", {})
+                    break
+                except Exception as e:
+                    if not daemon.alive or time.monotonic() > deadline:
+                        await daemon.stop()
+                        self._failed_at = time.monotonic()
+                        raise RcloneError(f"rclone rcd did not come up: {e}")
+                    await asyncio.sleep(0.2)
+            self._daemon = daemon
+            LOGGER.info(f"rclone rcd started (pid={process.pid}, port={port})")
+            return daemon
+
+    async def retire(self):
+        """
+        Send new operations to a fresh daemon (e.g. after rclone.conf changed).
+        The current one is stopped right away when idle, otherwise once its
+        running jobs are done.
+        """
+        async with self._lock:
+            daemon, self._daemon = self._daemon, None
+            if daemon is None:
+                return
+            if daemon.jobs and daemon.alive:
+                daemon.retired = True
+                self._retired.add(daemon)
+                LOGGER.info(f"rclone rcd (pid={daemon.process.pid}) retired, stopping after {daemon.jobs} running job(s)")
+                return
+        await daemon.stop()
+
+    async def stop(self):
+        """Stop every daemon, running jobs included, and close the client session."""
+        async with self._lock:
+            daemons = [d for d in (self._daemon, *self._retired) if d is not None]
+            self._daemon = None
+            self._retired.clear()
+            for daemon in daemons:
+                await daemon.stop()
+            if self._session and not self._session.closed:
+                await self._session.close()
+
+    async def _post(self, daemon: _Daemon, command: str, params: dict) -> dict:
+        async with self._session.post(daemon.url + command, json=params, auth=daemon.auth) as resp:
+            data = await resp.json(content_type=None)
+            if resp.status != 200:
+                raise RcloneError((data or {}).get("error") or f"{command} failed with HTTP {resp.status}")
+            return data or {}
+
+    async def _call(self, daemon: _Daemon, command: str, params: dict) -> dict:
+        try:
+            return await self._post(daemon, command, params)
+        except aiohttp.ClientError as e:
+            raise RcloneError(f"{command}: {e}")
+
+    async def call(self, command: str, **params) -> dict:
+        """Call an RC command, starting the daemon first if needed."""
+        daemon = self._daemon if self.running else await self.start()
+        return await self._call(daemon, command, params)
+
+    async def run_job(self, command: str, params: dict, progress: Optional[ProgressCallback] = None,
+                      cancel_event: Optional[asyncio.Event] = None) -> dict:
+        """
+        Run an RC command as an async job and wait for it, reporting
+        transfer progress from the job's stats group. Setting cancel_event
+        stops the job. The job stays on the daemon it was started on.
+        """
+        daemon = self._daemon if self.running else await self.start()
+        daemon.jobs += 1
+        try:
+            job = await self._call(daemon, command, dict(params, _async=True))
+            job_id = job["jobid"]
+            try:
+                while True:
+                    if cancel_event and cancel_event.is_set():
+                        await self.stop_job(job_id, daemon)
+                        raise RcloneError("cancelled")
+                    status = await self._call(daemon, "job/status", {"jobid": job_id})
+                    if status.get("finished"):
+                        if not status.get("success"):
+                            raise RcloneError(status.get("error") or f"{command} failed")
+                        return status.get("output") or {}
+                    if progress:
+                        try:
+                            stats = await self._call(daemon, "core/stats", {"group": f"job/{job_id}"})
+                            await progress(int(stats.get("bytes") or 0), int(stats.get("totalBytes") or 0),
+                                           float(stats.get("speed") or 0))
+                        except Exception as e:
+                            LOGGER.debug(f"rclone job {job_id} progress failed: {e}")
+                    await asyncio.sleep(JOB_POLL_INTERVAL)
+            except asyncio.CancelledError:
+                await self.stop_job(job_id, daemon)
+                raise
+        finally:
+            daemon.jobs -= 1
+            if daemon.retired and not daemon.jobs:
+                self._retired.discard(daemon)
+                await daemon.stop()
+                LOGGER.info(f"Retired rclone rcd (pid={daemon.process.pid}) stopped")
+
+    async def stop_job(self, job_id: int, daemon: Optional[_Daemon] = None):
+        try:
+            if daemon is None:
+                await self.call("job/stop", jobid=job_id)
+            else:
+                await self._call(daemon, "job/stop", {"jobid": job_id})
+        except Exception as e:
+            LOGGER.debug(f"Stopping rclone job {job_id} failed: {e}")
+
+    # --- operations ---
+
+    async def list_remotes(self) -> list:
+        return (await self.call("config/listremotes")).get("remotes") or []
+
+    async def list(self, path: str, dirs_only: bool = False, files_only: bool = False) -> list:
+        fs, remote = split_path(path)
+        opt = {"noModTime": True, "noMimeType": True}
+        if dirs_only:
+            opt["dirsOnly"] = True
+        if files_only:
+            opt["filesOnly"] = True
+        return (await self.call("operations/list", fs=fs, remote=remote, opt=opt)).get("list") or []
+
+    async def is_file(self, path: str) -> bool:
+        if split_path(path)[0] == '/':
+            return os.path.isfile(path)
+        fs, remote = split_path(path)
+        item = (await self.call("operations/stat", fs=fs, remote=remote)).get("item")
+        return bool(item) and not item.get("IsDir")
+
+    async def copyfile(self, src: str, dst_dir: str, move: bool = False, **job) -> dict:
+        """Copy (or move) one file into a directory, keeping its name."""
+        src_fs, src_remote = split_path(src)
+        dst_fs, dst_remote = split_path(dst_dir)
+        name = os.path.basename(src_remote)
+        return await self.run_job(
+            "operations/movefile" if move else "operations/copyfile",
+            {"srcFs": src_fs, "srcRemote": src_remote, "dstFs": dst_fs, "dstRemote": f"{dst_remote}/{name}".lstrip('/')},
+            **job
+        )
+
+    async def copy(self, src: str, dst: str, move: bool = False, create_empty_src_dirs: bool = False, **job) -> dict:
+        """Copy (or move) a directory tree, like `rclone copy`."""
+        params = {"srcFs": src, "dstFs": dst, "createEmptySrcDirs": create_empty_src_dirs}
+        if move:
+            params["deleteEmptySrcDirs"] = True
+        return await self.run_job("sync/move" if move else "sync/copy", params, **job)
+
+    async def public_link(self, path: str) -> str:
+        fs, remote = split_path(path)
+        return (await self.call("operations/publiclink", fs=fs, remote=remote)).get("url")
+
+    async def stats(self, group: Optional[str] = None) -> dict:
+        return await self.call("core/stats", **({"group": group} if group else {}))
+
+
+class ListingCache:
+    """
+    Directory listings of rclone paths, so paging and going back up in the
+    browse menus don't list the same remote directory again. Entries live
+    for RCLONE_LIST_CACHE_TTL seconds and are dropped as soon as one of our
+    own copies/moves changes the directory. Concurrent requests for the same
+    directory share one listing call.
+
+    A scope (the rclone config in use) keeps listings of different configs apart.
+    """
+
+    def __init__(self, ttl: int, max_dirs: int = LIST_CACHE_DIRS):
+        self.ttl = ttl
+        self.max_dirs = max_dirs
+        self._entries: OrderedDict[tuple, tuple[float, list]] = OrderedDict()
+        self._pending: dict[tuple, asyncio.Task] = {}
+
+    @staticmethod
+    def normalize(path: str) -> str:
+        return path if path.endswith(':') else path.rstrip('/')
+
+    def _fresh(self, key: tuple) -> Optional[list]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    async def _load(self, key: tuple, loader: Callable[[str], Awaitable[list]]) -> list:
+        try:
+            items = await loader(key[1])
+            self._entries[key] = (time.monotonic(), items)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_dirs:
+                self._entries.popitem(last=False)
+            return items
+        finally:
+            self._pending.pop(key, None)
+
+    async def get(self, scope: str, path: str, loader: Callable[[str], Awaitable[list]], refresh: bool = False) -> list:
+        """Items of a directory; loader(path) lists it when there is no fresh entry."""
+        key = (scope, self.normalize(path))
+        if not refresh and (items := self._fresh(key)) is not None:
+            return items
+        task = self._pending.get(key)
+        if task is None:
+            task = self._pending[key] = asyncio.create_task(self._load(key, loader))
+        return await asyncio.shield(task)
+
+    def prefetch(self, scope: str, paths: list, loader: Callable[[str], Awaitable[list]]):
+        """List directories in the background so opening them next is instant."""
+        for path in paths:
+            key = (scope, self.normalize(path))
+            if key in self._pending or self._fresh(key) is not None:
+                continue
+            task = self._pending[key] = asyncio.create_task(self._load(key, loader))
+            # failures only mean the directory is listed on demand later
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    def invalidate(self, path: str, scope: Optional[str] = None):
+        """Drop a changed path: its own listing, the listings under it and those of its parents."""
+        path = self.normalize(path)
+        below = path if path.endswith(':') else path + '/'
+        for key in list(self._entries):
+            if scope is not None and key[0] != scope:
+                continue
+            cached = key[1]
+            above = cached if cached.endswith(':') else cached + '/'
+            if cached == path or cached.startswith(below) or path.startswith(above):
+                del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
+
+
+rclone_rc = RcloneRC()
+listing_cache = ListingCache(Config.RCLONE_LIST_CACHE_TTL)
+
+
+# --- Operations used by the bot: through rcd when it is available, else the rclone CLI ---
+
+async def _cli(*args) -> str:
+    proc = await asyncio.create_subprocess_exec(
+        "rclone", *args, "--config", RCLONE_CONFIG_PATH,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    out, err = await proc.communicate()
+    if proc.returncode != 0:
+        raise RcloneError(err.decode().strip() or out.decode().strip() or f"rclone {args[0]} failed")
+    return out.decode()
+
+
+async def list_remotes() -> list:
+    """Names of the configured remotes (without the trailing colon)."""
+    if rclone_rc.available():
+        try:
+            return await rclone_rc.list_remotes()
+        except RcloneError as e:
+            LOGGER.debug(f"rcd listremotes failed, using the CLI: {e}")
+    out = await _cli("listremotes")
+    return [r.strip().rstrip(':') for r in out.splitlines() if r.strip()]
+
+
+async def _list_items(path: str) -> list:
+    # One call for directories and files together
+    if rclone_rc.available():
+        try:
+            return await rclone_rc.list(path)
+        except RcloneError as e:
+            if rclone_rc.running:
+                raise
+            LOGGER.debug(f"rcd unavailable, using the CLI: {e}")
+    out = await _cli("lsjson", "--no-mimetype", "--no-modtime", path)
+    try:
+        return json.loads(out or "[]")
+    except ValueError as e:
+        raise RcloneError(f"unreadable lsjson output: {e}")
+
+
+async def list_dir(path: str, refresh: bool = False) -> tuple[list, list]:
+    """
+    (dirs, files) names directly under an rclone path, from the listing
+    cache when possible. The first few subdirectories are listed in the
+    background since they are the likely next stop.
+    Raises RcloneError if the path cannot be listed.
+    """
+    items = await listing_cache.get(RCLONE_CONFIG_PATH, path, _list_items, refresh)
+    dirs = sorted(item["Name"] for item in items if item.get("IsDir"))
+    files = sorted(item["Name"] for item in items if not item.get("IsDir"))
+    base = listing_cache.normalize(path)
+    listing_cache.prefetch(RCLONE_CONFIG_PATH, [join_path(base, d) for d in dirs[:PREFETCH_DIRS]], _list_items)
+    return dirs, files
+
+
+async def copy(src: str, dst: str, include: Optional[str] = None, move: bool = False,
+               create_empty_src_dirs: bool = False, progress: Optional[ProgressCallback] = None,
+               cancel_event: Optional[asyncio.Event] = None):
+    """
+    Copy (or move) src into dst like `rclone copy src dst`: a file lands in
+    the dst directory, a directory's content is copied into dst.
+    include limits a directory copy to one file name.
+    Raises RcloneError on failure.
+    """
+    if rclone_rc.available():
+        try:
+            job = {"progress": progress, "cancel_event": cancel_event}
+            if include:
+                await rclone_rc.copyfile(join_path(src.rstrip('/'), include), dst, move=move, **job)
+            elif await rclone_rc.is_file(src):
+                await rclone_rc.copyfile(src, dst, move=move, **job)
+            else:
+                await rclone_rc.copy(src, dst, move=move, create_empty_src_dirs=create_empty_src_dirs, **job)
+            return
+        except RcloneError as e:
+            if cancel_event and cancel_event.is_set():
+                raise
+            if rclone_rc.running:
+                raise
+            LOGGER.debug(f"rcd unavailable, using the CLI: {e}")
+        finally:
+            _invalidate_after_copy(src, dst, move)
+    args = ["move" if move else "copy", src, dst]
+    if create_empty_src_dirs:
+        args.append("--create-empty-src-dirs")
+    if include:
+        args += ["--include", include]
+    try:
+        await _cli(*args)
+    finally:
+        _invalidate_after_copy(src, dst, move)
+
+
+def _invalidate_after_copy(src: str, dst: str, move: bool):
+    # Even a failed or cancelled transfer may have written part of its files
+    listing_cache.invalidate(dst)
+    if move:
+        listing_cache.invalidate(src)
+
+
+async def public_link(path: str) -> Optional[str]:
+    """Shareable link of an rclone path, None if the remote cannot make one."""
+    try:
+        if rclone_rc.available():
+            try:
+                return await rclone_rc.public_link(path)
+            except RcloneError as e:
+                if rclone_rc.running:
+                    raise
+                LOGGER.debug(f"rcd unavailable, using the CLI: {e}")
+        return (await _cli("link", path)).strip() or None
+    except RcloneError as e:
+        LOGGER.debug(f"Failed to get Rclone link: {e}")
+        return None
+
+
+async def reload_config():
+    """
+    Pick up a changed rclone.conf: the next operation starts a daemon with
+    the new config, transfers running on the old one are left to finish.
+    """
+    rclone_rc._failed_at = 0.0
+    listing_cache.clear()
+    await rclone_rc.retire()
+
+
+def upload_progress(user: dict) -> Optional[ProgressCallback]:
+    """Report rclone transfer progress on the task's ProgressReporter, if it has one."""
+    reporter = user.get('progress') if user else None
+    if not reporter:
+        return None
+
+    async def progress(done, total, speed):
+        if total:
+            await reporter.update_upload(done, total, label='Rclone')
+
+    return progress
@@ -0,0 +1,61 @@
+import asyncio
+
+from typing import Any, Hashable, Optional
+
+from ..logger import LOGGER
+
+
+class Flight:
+    """One in-flight piece of work and the requests waiting on it."""
+
+    def __init__(self):
+        self.future = asyncio.get_running_loop().create_future()
+        self.followers = 0
+
+    async def wait(self) -> Any:
+        """Wait for the leader's result; cancelling a follower leaves the flight alone."""
+        return await asyncio.shield(self.future)
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent requests: the first caller for a key
+    becomes the leader and does the work, later callers attach to it and
+    get the leader's result instead of repeating the work.
+
+        flight, leader = single_flight.join(key)
+        if not leader:
+            result = await flight.wait()
+        else:
+            try:
+                result = ...
+            finally:
+                single_flight.finish(key, flight, result)
+    """
+
+    def __init__(self):
+        self._flights: dict[Hashable, Flight] = {}
+
+    def join(self, key: Hashable) -> tuple[Flight, bool]:
+        """Return the flight for key and whether the caller leads it."""
+        flight = self._flights.get(key)
+        if flight is not None:
+            flight.followers += 1
+            return flight, False
+        flight = self._flights[key] = Flight()
+        return flight, True
+
+    def finish(self, key: Hashable, flight: Flight, result: Optional[Any] = None):
+        """Publish the leader's result (None for failed/cancelled) and close the flight."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.future.done():
+            flight.future.set_result(result)
+        if flight.followers:
+            LOGGER.info(f"Single-flight: {flight.followers} identical request(s) served by one download")
+
+    def active(self) -> int:
+        return len(self._flights)
+
+
+single_flight = SingleFlight()
@@ -1,8 +1,22 @@
 import asyncio
+import re
 import uuid
 from typing import Dict, Optional, List, Callable, Any, Tuple
 
 from bot.logger import LOGGER
+from config import Config
+
+
+# Providers whose downloader cannot run more than once at a time (shared state on disk).
+# Tidal-NG needs no cap: every task runs with its own config directory.
+DEFAULT_PROVIDER_LIMITS: Dict[str, int] = {}
+
+# Checkpoints of a persisted job, in order. A job restored after a restart
+# skips the stages it had completed (see reached_stage).
+STAGE_DOWNLOADING = "Downloading"
+STAGE_DOWNLOADED = "Downloaded"  # every file is in the task folder, nothing uploaded yet
+STAGE_UPLOADED = "Uploaded"      # delivered, only cleanup was left
+JOB_STAGES = (STAGE_DOWNLOADING, STAGE_DOWNLOADED, STAGE_UPLOADED)
 
 
 class TaskState:
@@ -22,14 +36,25 @@ class TaskManager:
     def __init__(self):
         self._tasks: Dict[str, TaskState] = {}
         self._lock = asyncio.Lock()
-        # Simple per-bot FIFO queue with metadata and cancel support
-        self._pending: List[Dict[str, Any]] = []  # each: {qid, user_id, link, options, job}
-        self._pending_event = asyncio.Event()
+        # Per-bot fair queue with metadata and cancel support
+        self._pending: List[Dict[str, Any]] = []  # each: {qid, user_id, link, options, provider, priority, vtime, seq, job}
+        self._queue_cond = asyncio.Condition(self._lock)
         self._worker_started = False
+        self._seq = 0
+        self._vtime = 0.0
+        self._user_vtime: Dict[int, float] = {}
+        self._user_weights: Dict[int, float] = {
+            int(k): v for k, v in _parse_limits(Config.QUEUE_USER_WEIGHTS, float).items() if k.lstrip('-').isdigit()
+        }
+        self._provider_limits: Dict[str, int] = {
+            **DEFAULT_PROVIDER_LIMITS, **_parse_limits(Config.QUEUE_PROVIDER_LIMITS, int)
+        }
+        self._provider_running: Dict[str, int] = {}
 
-    async def create(self, user: dict, label: str) -> TaskState:
+    async def create(self, user: dict, label: str, task_id: Optional[str] = None) -> TaskState:
+        """Create a task; pass task_id to resume a persisted queue job under its old id."""
         async with self._lock:
-            task_id = uuid.uuid4().hex[:8]
+            task_id = task_id or uuid.uuid4().hex[:8]
             state = TaskState(task_id, user.get("user_id"), user.get("chat_id"), label)
             self._tasks[task_id] = state
             LOGGER.info(f"Task {task_id} created for user {state.user_id} ({label})")
@@ -109,22 +134,54 @@ class TaskManager:
         return {tid: st for tid, st in self._tasks.items() if st.user_id == user_id}
 
     # --- Queue support ---
+    @staticmethod
+    def new_queue_id() -> str:
+        return uuid.uuid4().hex[:8]
+
+    async def _persist(self, method: str, *args, **kwargs):
+        """Mirror queue changes to the database; failures never break the in-memory queue."""
+        try:
+            from bot.helpers.database.pg_impl import async_queue_db
+            return await getattr(async_queue_db, method)(*args, **kwargs)
+        except Exception as e:
+            LOGGER.error(f"Queue persistence ({method}) failed: {e}")
+            return None
+
+    def _dispatch_key(self, item: Dict[str, Any]) -> Tuple[int, float, int]:
+        """Sort key giving the real dispatch order: priority, then fair share, then FIFO."""
+        return (-item.get('priority', 0), item.get('vtime', 0.0), item.get('seq', 0))
+
+    def _provider_has_slot(self, provider: str) -> bool:
+        limit = self._provider_limits.get(provider)
+        return not limit or self._provider_running.get(provider, 0) < limit
+
+    def _next_dispatchable(self) -> Optional[Dict[str, Any]]:
+        """Pop the first pending item whose provider is under its concurrency limit (lock held)."""
+        for it in sorted(self._pending, key=self._dispatch_key):
+            if self._provider_has_slot(it.get('provider')):
+                self._pending.remove(it)
+                return it
+        return None
+
     async def start_worker(self):
         if self._worker_started:
             return
         self._worker_started = True
 
-        async def _worker_loop():
+        async def _worker_loop(worker_no: int):
             while True:
-                await self._pending_event.wait()
-                item = None
-                async with self._lock:
-                    if self._pending:
-                        item = self._pending.pop(0)
-                    if not self._pending:
-                        self._pending_event.clear()
-                if not item:
-                    continue
+                async with self._queue_cond:
+                    item = self._next_dispatchable()
+                    while item is None:
+                        await self._queue_cond.wait()
+                        item = self._next_dispatchable()
+                    provider = item.get('provider')
+                    self._provider_running[provider] = self._provider_running.get(provider, 0) + 1
+                    # Advance virtual time so later arrivals are ordered after this dispatch
+                    self._vtime = max(self._vtime, item.get('vtime', 0.0))
+                if item.get('persisted'):
+                    await self._persist('update_job', item['qid'], status='running')
+                LOGGER.debug(f"Queue worker {worker_no}: dispatching {item.get('qid')} ({provider})")
                 job = item.get('job')
                 try:
                     await job()
@@ -133,23 +190,52 @@ class TaskManager:
                         LOGGER.error(f"Queue job failed: {e}")
                     except Exception:
                         pass
+                finally:
+                    if item.get('persisted'):
+                        await self._persist('delete_job', item['qid'])
+                    async with self._queue_cond:
+                        self._provider_running[provider] = max(0, self._provider_running.get(provider, 1) - 1)
+                        self._queue_cond.notify_all()
 
-        asyncio.get_event_loop().create_task(_worker_loop())
+        loop = asyncio.get_event_loop()
+        for worker_no in range(1, max(1, Config.QUEUE_WORKERS) + 1):
+            loop.create_task(_worker_loop(worker_no))
 
-    async def enqueue(self, user_id: int, link: str, options: Dict[str, Any], job_coro_factory: Callable[[], Any]) -> Tuple[str, int]:
-        """Enqueue a job with metadata, return (queue_id, position)."""
+    async def enqueue(self, user_id: int, link: str, options: Dict[str, Any], job_coro_factory: Callable[[], Any], priority: int = 0, context: Optional[Dict[str, Any]] = None, qid: Optional[str] = None, restored: bool = False) -> Tuple[str, int]:
+        """Enqueue a job with metadata, return (queue_id, position).
+
+        Jobs are ordered by priority (higher first), then by per-user fair share
+        so one user's batch is interleaved with other users' links.
+        When a JSON-serialisable context is given the job is also persisted so it
+        survives a restart (see restore_queue in modules/download.py); pass
+        restored=True when re-enqueueing a job loaded from the database.
+        """
+        qid = qid or self.new_queue_id()
+        # Persist before the job becomes visible so a fast worker can't finish it first
+        if context is not None and not restored:
+            await self._persist('save_job', qid, user_id, link, options or {}, context, priority)
         async with self._lock:
-            qid = uuid.uuid4().hex[:8]
-            self._pending.append({
+            # Start-time fair queueing: each user advances their own virtual clock by 1/weight
+            weight = max(self._user_weights.get(user_id, 1.0), 0.01)
+            vtime = max(self._vtime, self._user_vtime.get(user_id, 0.0)) + 1.0 / weight
+            self._user_vtime[user_id] = vtime
+            self._seq += 1
+            item = {
                 'qid': qid,
                 'user_id': user_id,
                 'link': link,
                 'options': options or {},
+                'provider': provider_for_link(link),
+                'priority': priority,
+                'vtime': vtime,
+                'seq': self._seq,
                 'job': job_coro_factory,
-            })
-            self._pending_event.set()
-            position = len(self._pending)
-            # Ensure worker is running on first enqueue
+                'persisted': context is not None,
+            }
+            self._pending.append(item)
+            self._queue_cond.notify_all()
+            position = sorted(self._pending, key=self._dispatch_key).index(item) + 1
+            # Ensure workers are running on first enqueue
             await self.start_worker()
             return qid, position
 
@@ -161,23 +247,78 @@ class TaskManager:
 
     async def list_pending(self, user_id: Optional[int] = None) -> List[Dict[str, Any]]:
         async with self._lock:
-            items = list(self._pending)
-        if user_id is not None:
-            items = [it for it in items if it.get('user_id') == user_id]
-        # annotate position
+            items = sorted(self._pending, key=self._dispatch_key)
+        # annotate position in the global dispatch order
         for idx, it in enumerate(items, start=1):
             it['position'] = idx
+        if user_id is not None:
+            items = [it for it in items if it.get('user_id') == user_id]
         return items
 
     async def cancel_pending(self, qid: str, user_id: Optional[int] = None) -> bool:
+        removed = None
         async with self._lock:
             for i, it in enumerate(self._pending):
                 if it.get('qid') == qid and (user_id is None or it.get('user_id') == user_id):
-                    del self._pending[i]
-                    if not self._pending:
-                        self._pending_event.clear()
-                    return True
-        return False
+                    removed = self._pending.pop(i)
+                    break
+        if removed is None:
+            return False
+        if removed.get('persisted'):
+            await self._persist('delete_job', qid)
+        return True
+
+    async def set_job_stage(self, qid: str, stage: Optional[str] = None, task_id: Optional[str] = None):
+        """Record the stage / task id of a running persisted job."""
+        await self._persist('update_job', qid, stage=stage, task_id=task_id)
+
+    async def checkpoint(self, user: dict, stage: str):
+        """Record that the persisted job of this task completed a stage (no-op for unqueued tasks)."""
+        if user.get('qid'):
+            await self.set_job_stage(user['qid'], stage=stage)
+
+    async def load_persisted_jobs(self) -> List[Dict[str, Any]]:
+        """Return jobs left over from a previous run (queued or in-flight)."""
+        return await self._persist('get_jobs') or []
+
+
+def provider_for_link(link: str) -> str:
+    """Map a link to the provider key used for per-provider concurrency limits."""
+    link = (link or '').lower()
+    if 'music.apple.com' in link:
+        return 'apple'
+    if 'tidal.com' in link:
+        return 'tidal'
+    if 'qobuz.com' in link:
+        return 'qobuz'
+    if 'deezer.com' in link:
+        return 'deezer'
+    return 'other'
+
+
+def reached_stage(user: dict, stage: str) -> bool:
+    """True when the task is a restored job that had completed stage before the restart."""
+    resume = user.get('resume_stage')
+    return resume in JOB_STAGES and JOB_STAGES.index(resume) >= JOB_STAGES.index(stage)
+
+
+def _parse_limits(raw: str, cast: Callable[[str], Any]) -> Dict[Any, Any]:
+    """Parse 'key:value,key:value' strings from the environment."""
+    result = {}
+    # Entries are separated by commas and/or spaces; spaces around ':' stay in the entry
+    for part in re.split(r'[,\s]+(?=[^:,\s]+\s*:)', (raw or '').strip()):
+        part = part.strip(', ')
+        if not part:
+            continue
+        if ':' not in part:
+            LOGGER.warning(f"Ignoring invalid queue setting: {part}")
+            continue
+        key, value = part.split(':', 1)
+        try:
+            result[key.strip()] = cast(value.strip())
+        except ValueError:
+            LOGGER.warning(f"Ignoring invalid queue setting: {part}")
+    return result
 
 
 # Singleton
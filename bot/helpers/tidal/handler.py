@@ -8,9 +8,11 @@ from .utils import *
 from .metadata import *
 
 from ..legacy_utils import *
+from ..utils import zip_handler
+from ..http_client import download_file
 from ..metadata import set_metadata, get_audio_extension
 from ..legacy_uploader import *
-from ..message import send_message
+from ..message import send_message, send_error
 
 from ...settings import bot_set
 import bot.helpers.translations as lang
@@ -40,7 +42,7 @@ async def start_track(track_id:int, user:dict, track_meta:dict | None, \
         try:
             track_data = await tidalapi.get_track(track_id)
         except Exception as e:
-            return await send_message(user, e)
+            return await send_error(user, e)
 
         track_meta = await get_track_metadata(track_id, track_data, user['r_id'])
         filepath = f"{Config.LEGACY_DOWNLOAD_BASE_DIR}/{user['r_id']}/{track_meta['provider']}/{track_meta['albumartist']}/{track_meta['album']}"
@@ -57,7 +59,7 @@ async def start_track(track_id:int, user:dict, track_meta:dict | None, \
         if 'Asset is not ready for playback' in str(e):
             error = f'Track [{track_id}] is not available in your region'
         LOGGER.error(error)
-        return await send_message(user, error)
+        return await send_error(user, error)
 
 
     if stream_data is not None:
@@ -82,20 +84,17 @@ async def start_track(track_id:int, user:dict, track_meta:dict | None, \
 
 
         if type(urls) == list:
-            i = 0   # flawless
-            temp_files = []
-            for url in urls[0]:
-                temp_path = f"{filepath}.{i}"
-                err = await download_file(url, temp_path, cancel_event=user.get('cancel_event'))
-                if err:
-                    return await send_message(user, err)
-                i+=1
-                temp_files.append(temp_path)
-            await merge_tracks(temp_files, filepath)
+            err = await download_segments(
+                urls[0], filepath,
+                concurrency=Config.TIDAL_SEGMENT_WORKERS,
+                cancel_event=user.get('cancel_event')
+            )
+            if err:
+                return await send_error(user, err)
         else:
             err = await download_file(urls, filepath, cancel_event=user.get('cancel_event'))
             if err:
-                return await send_message(user, err)
+                return await send_error(user, err)
 
         track_meta['extension'] = await get_audio_extension(filepath)
 
@@ -121,7 +120,7 @@ async def start_album(album_id:int, user:dict, upload=True, basefolder=None):
     try:
         album_data = await tidalapi.get_album(album_id)
     except Exception as e:
-        return await send_message(user, e)
+        return await send_error(user, e)
 
     tracks_data = await tidalapi.get_album_tracks(album_id)
 
@@ -157,6 +156,13 @@ async def start_album(album_id:int, user:dict, upload=True, basefolder=None):
         'title': album_meta['title'],
         'type': album_meta['type']
     }
+
+    # Tracks go up (as albums of up to 10 with TG_MEDIA_GROUP) while the rest of the album downloads
+    if upload and bot_set.upload_mode == 'Telegram' and not bot_set.album_zip:
+        await run_pipelined_tasks(tasks, album_meta['tracks'], user, update_details)
+        await cleanup(None, album_meta)
+        return
+
     await run_concurrent_tasks(tasks, update_details)
 
     if bot_set.album_zip:
@@ -180,7 +186,7 @@ async def start_artist(artist_id:int, user:dict):
         artist_albums = await tidalapi.get_artist_albums(artist_id)
         artist_eps = await tidalapi.get_artist_albums_ep_singles(artist_id)
     except Exception as e:
-        return await send_message(user, e)
+        return await send_error(user, e)
 
     albums = await sort_album_from_artist(artist_albums['items'])
     ep_singles = await sort_album_from_artist(artist_eps['items'])
@@ -1,4 +1,3 @@
-import aiohttp
 import asyncio
 import aiolimiter
 
@@ -7,6 +6,7 @@ from datetime import datetime, timedelta
 from config import Config
 
 from bot.logger import LOGGER
+from ..http_client import new_session
 
 # from orpheusdl-tidal
 
@@ -125,7 +125,7 @@ class TidalApi:
             auth_url: URL for authorization
             error: if any error occured
         """
-        self.session = aiohttp.ClientSession()
+        self.session = new_session()
 
         if Config.TIDAL_TV_TOKEN is None and Config.TIDAL_TV_SECRET is None:
             return False, "No Token/Secret added"
@@ -166,7 +166,7 @@ class TidalApi:
 
 
     async def login_from_saved(self, data):
-        self.session = aiohttp.ClientSession()
+        self.session = new_session()
 
         self.tv_session = TvSession(
             Config.TIDAL_TV_TOKEN,
@@ -1,12 +1,17 @@
 import re
 import os
+import aiohttp
 import aiofiles
 import asyncio
+import itertools
+
+from collections import deque
 
 from shutil import copyfileobj
 from xml.etree import ElementTree
 
 from .tidal_api import tidalapi
+from ..http_client import get_session
 
 
 async def parse_url(url):
@@ -137,19 +142,75 @@ def parse_mpd(xml: bytes) -> list:
     return tracks, codec
 
 
-async def merge_tracks(temp_tracks: list, output_path: str):
-    async with aiofiles.open(output_path, 'wb') as dest_file:
-        for temp_location in temp_tracks:
-            async with aiofiles.open(temp_location, 'rb') as segment_file:
-                while True:
-                    chunk = await segment_file.read(1024 * 64)  # Read in chunks
-                    if not chunk:
-                        break
-                    await dest_file.write(chunk)
+class SegmentError(Exception):
+    pass
+
+
+async def download_segments(urls: list, output_path: str, concurrency: int = 8, retries: int = 3,
+                            timeout: int = 30, cancel_event: asyncio.Event | None = None):
+    """
+    Download DASH segments concurrently over the shared HTTP pool and write them
+    to output_path in order (no temp files / merge pass).
+    Args:
+        urls (list): Segment URLs in playback order (init segment first)
+        output_path (str): Full path of the merged file
+        concurrency (int): Segments fetched in parallel
+        retries (int): Attempts per segment
+        timeout (int): Timeout in seconds per segment request
+        cancel_event: Optional asyncio.Event to signal cancellation
+    Returns:
+        str or None: Error message if failed, else None
+    """
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    concurrency = max(1, concurrency)
+
+    async def fetch(url: str) -> bytes:
+        for attempt in range(1, retries + 1):
+            try:
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                    if response.status != 200:
+                        raise SegmentError(f"HTTP Status: {response.status}")
+                    return await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == retries:
+                    raise SegmentError(f"Failed after {retries} attempts: {str(e)}")
+                await asyncio.sleep(2 ** attempt)
+
+    session = get_session()
+    pending = deque()
+    error = None
+    url_iter = iter(urls)
+    try:
+        async with aiofiles.open(output_path, 'wb') as dest_file:
+            # Sliding window: at most `concurrency` segments are in flight or buffered
+            for url in itertools.islice(url_iter, concurrency):
+                pending.append(asyncio.ensure_future(fetch(url)))
+            while pending:
+                if cancel_event and cancel_event.is_set():
+                    error = "Cancelled"
+                    break
+                data = await pending.popleft()
+                next_url = next(url_iter, None)
+                if next_url is not None:
+                    pending.append(asyncio.ensure_future(fetch(next_url)))
+                await dest_file.write(data)
+    except SegmentError as e:
+        error = str(e)
+    except Exception as e:
+        error = f"Unexpected error: {str(e)}"
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    if error:
+        try:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+        except Exception:
+            pass
+    return error
 
-    # Delete temp files asynchronously
-    delete_tasks = [asyncio.to_thread(os.remove, temp_location) for temp_location in temp_tracks]
-    await asyncio.gather(*delete_tasks)
 
 async def get_quality(stream_data: dict):
     quality_dict = qualities = {
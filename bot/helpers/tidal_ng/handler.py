@@ -1,5 +1,4 @@
 import os
-import json
 import asyncio
 import shutil
 import re
@@ -7,22 +6,28 @@ import time
 from pathlib import Path
 
 from config import Config
-from ..message import edit_message, send_message
+from ..message import edit_message, send_message, mark_incomplete
 from bot.logger import LOGGER
-from ..database.pg_impl import download_history
+from ..database.pg_impl import async_download_history
 from bot.helpers.utils import (
     extract_audio_metadata,
     extract_video_metadata,
+    extract_metadata_batch,
 )
 from ..progress import ProgressReporter
 from bot.helpers.tidal_ng.uploader import track_upload, album_upload, playlist_upload, music_video_upload
-from bot.helpers.tidal_ng.utils import get_tidal_ng_download_base_path
+from bot.helpers.tidal_ng.utils import get_tidal_ng_download_base_path, prepare_task_config
+from bot.helpers.tidal_ng.worker_pool import TidalNgWorkerPool, WorkerUnavailable, progress_from_tasks
+from bot.helpers.tasks import task_manager, reached_stage, STAGE_DOWNLOADED
 
 # Define the path to the tidal-dl-ng CLI script
 TIDAL_DL_NG_CLI_PATH = "/usr/src/app/tidal-dl-ng/tidal_dl_ng/cli.py"
 # Define the path to the settings.json for the CLI tool
 TIDAL_DL_NG_SETTINGS_PATH = "/root/.config/tidal_dl_ng/settings.json"
 
+# Warm tidal-dl-ng processes reused across links (TIDAL_NG_WORKERS=0 runs the CLI per link)
+tidal_ng_workers = TidalNgWorkerPool(Config.TIDAL_NG_WORKERS, TIDAL_DL_NG_CLI_PATH)
+
 
 async def log_progress(stream, reporter: ProgressReporter):
     """Reads a stream from the subprocess and will eventually update the ProgressReporter."""
@@ -54,6 +59,46 @@ async def log_progress(stream, reporter: ProgressReporter):
             LOGGER.debug(f"Could not parse progress from Tidal NG line: {output} - {e}")
 
 
+async def report_progress(tasks: list, reporter: ProgressReporter):
+    """Forward structured progress events of a Tidal-NG worker to the reporter."""
+    tracks_done, tracks_total, percent = progress_from_tasks(tasks)
+    if tracks_total:
+        await reporter.set_total_tracks(tracks_total)
+        await reporter.update_download(tracks_done=tracks_done)
+    elif percent is not None:
+        await reporter.update_download(percent=percent)
+
+
+async def run_cli(link: str, download_path: str, config_path: str, reporter: ProgressReporter) -> dict:
+    """
+    Run the tidal-dl-ng CLI once for a link, with a private config directory.
+    Returns:
+        dict: the settings the download ran with
+    """
+    shutil.rmtree(config_path, ignore_errors=True)
+    settings = await asyncio.to_thread(prepare_task_config, config_path, download_path)
+
+    env = os.environ.copy()
+    env["FFMPEG_PATH"] = "/usr/bin/ffmpeg"
+    env["XDG_CONFIG_HOME"] = config_path
+    cmd = ["python", TIDAL_DL_NG_CLI_PATH, "dl", link]
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env=env,
+    )
+    await asyncio.gather(
+        log_progress(process.stdout, reporter),
+        log_progress(process.stderr, reporter),
+    )
+    await process.wait()
+
+    if process.returncode != 0:
+        raise Exception("Tidal-NG download process failed.")
+    return settings
+
+
 def get_content_id_from_url(url: str) -> str:
     """Extracts the content ID from a Tidal URL."""
     match = re.search(r"/(track|album|playlist|video)/(\d+)", url)
@@ -62,8 +107,8 @@ def get_content_id_from_url(url: str) -> str:
 
 async def start_tidal_ng(link: str, user: dict, options: dict = None):
     """
-    Handles downloads using the tidal-dl-ng CLI tool in an isolated directory,
-    and then uploads the result.
+    Handles downloads using a warm tidal-dl-ng worker (or the CLI tool) in an
+    isolated directory, and then uploads the result.
     """
     bot_msg = user.get("bot_msg")
     user_id = user.get("user_id")
@@ -72,9 +117,8 @@ async def start_tidal_ng(link: str, user: dict, options: dict = None):
     # Create a unique temporary directory for this download task
     temp_download_path = os.path.join(Config.LOCAL_STORAGE, str(user_id), f"tidal_ng_temp_{task_id}")
     os.makedirs(temp_download_path, exist_ok=True)
-
-    original_settings = None
-    settings_backup = None
+    # Private CLI config for this task, kept outside the download folder
+    task_config_path = os.path.join(Config.LOCAL_STORAGE, str(user_id), f"tidal_ng_config_{task_id}")
 
     # Initialize progress reporter
     label = "Tidal NG"
@@ -82,39 +126,26 @@ async def start_tidal_ng(link: str, user: dict, options: dict = None):
     await reporter.set_stage("Downloading")
 
     try:
-        # --- Backup and modify settings.json ---
-        try:
-            with open(TIDAL_DL_NG_SETTINGS_PATH, "r") as f:
-                settings_backup = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            settings_backup = {}
-
-        temp_settings = settings_backup.copy()
-        temp_settings["download_base_path"] = temp_download_path
-
-        # Ensure the directory for the settings file exists
-        os.makedirs(os.path.dirname(TIDAL_DL_NG_SETTINGS_PATH), exist_ok=True)
-        with open(TIDAL_DL_NG_SETTINGS_PATH, "w") as f:
-            json.dump(temp_settings, f, indent=4)
-
         # --- Execute Download ---
-        env = os.environ.copy()
-        env["FFMPEG_PATH"] = "/usr/bin/ffmpeg"
-        cmd = ["python", TIDAL_DL_NG_CLI_PATH, "dl", link]
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            env=env,
-        )
-        await asyncio.gather(
-            log_progress(process.stdout, reporter),
-            log_progress(process.stderr, reporter),
-        )
-        await process.wait()
-
-        if process.returncode != 0:
-            raise Exception("Tidal-NG download process failed.")
+        settings_backup = None
+        # A job restored after a restart may have finished its download already
+        if reached_stage(user, STAGE_DOWNLOADED) and any(files for _, _, files in os.walk(temp_download_path)):
+            LOGGER.info(f"Tidal-NG: resuming with the files downloaded before the restart in {temp_download_path}")
+            # Only the settings the download ran with are needed
+            shutil.rmtree(task_config_path, ignore_errors=True)
+            settings_backup = await asyncio.to_thread(prepare_task_config, task_config_path, temp_download_path)
+        elif tidal_ng_workers.enabled:
+            try:
+                settings_backup = await tidal_ng_workers.download(
+                    link, temp_download_path, lambda tasks: report_progress(tasks, reporter), task_id
+                )
+            except WorkerUnavailable as e:
+                cancel_event = user.get("cancel_event")
+                if cancel_event and cancel_event.is_set():
+                    raise Exception("Tidal-NG download process failed.")
+                LOGGER.warning(f"Tidal-NG worker unavailable ({e}), running the CLI for this link")
+        if settings_backup is None:
+            settings_backup = await run_cli(link, temp_download_path, task_config_path, reporter)
 
         # --- Collect Files from the temporary directory ---
         await reporter.set_stage("Processing")
@@ -125,28 +156,30 @@ async def start_tidal_ng(link: str, user: dict, options: dict = None):
 
         if not downloaded_files:
             raise Exception("No files were downloaded into the temporary directory.")
+        await task_manager.checkpoint(user, STAGE_DOWNLOADED)
 
         # --- Metadata Extraction ---
+        # All files at once in the metadata thread pool, keeping the walk order
+        media_files = [f for f in downloaded_files if not f.lower().endswith('.lrc')]
+
+        async def extract(file_path):
+            if file_path.lower().endswith((".mp4", ".m4v", ".ts")):
+                return await extract_video_metadata(file_path)
+            return await extract_audio_metadata(file_path)
+
         items = []
-        for file_path in downloaded_files:
-            if file_path.lower().endswith('.lrc'):
+        for file_path, extracted in zip(media_files, await extract_metadata_batch(media_files, extract)):
+            if isinstance(extracted, Exception):
+                LOGGER.error(f"Metadata extraction failed for {file_path}: {str(extracted)}")
+                mark_incomplete(user)
                 continue
-            try:
-                # Use a combined metadata dictionary for quality and other tags
-                metadata = {}
-                if file_path.lower().endswith((".mp4", ".m4v", ".ts")):
-                    metadata.update(await extract_video_metadata(file_path))
-                else:
-                    metadata.update(await extract_audio_metadata(file_path))
-
-                metadata["filepath"] = file_path
-                metadata["provider"] = "Tidal NG"
-                # Add quality from original settings for later use
-                metadata["quality"] = settings_backup.get("quality_audio", "N/A")
-                items.append(metadata)
-
-            except Exception as e:
-                LOGGER.error(f"Metadata extraction failed for {file_path}: {str(e)}")
+            # Use a combined metadata dictionary for quality and other tags
+            metadata = dict(extracted)
+            metadata["filepath"] = file_path
+            metadata["provider"] = "Tidal NG"
+            # Add quality from original settings for later use
+            metadata["quality"] = settings_backup.get("quality_audio", "N/A")
+            items.append(metadata)
 
         if not items:
             raise Exception("Metadata extraction failed for all downloaded files.")
@@ -201,7 +234,7 @@ async def start_tidal_ng(link: str, user: dict, options: dict = None):
 
         # --- Record History ---
         content_id = get_content_id_from_url(link)
-        download_history.record_download(
+        await async_download_history.record_download(
             user_id=user.get("user_id"),
             provider="Tidal NG",
             content_type=content_type,
@@ -223,17 +256,13 @@ async def start_tidal_ng(link: str, user: dict, options: dict = None):
 
     except Exception as e:
         LOGGER.error(f"An error occurred in start_tidal_ng: {e}", exc_info=True)
+        mark_incomplete(user)
         await edit_message(bot_msg, f"❌ **Fatal Error:** {e}")
 
     finally:
-        # --- Restore settings.json and cleanup ---
-        if settings_backup is not None:
-            try:
-                with open(TIDAL_DL_NG_SETTINGS_PATH, "w") as f:
-                    json.dump(settings_backup, f, indent=4)
-                LOGGER.info("Tidal-NG settings.json restored to original state.")
-            except Exception as e:
-                LOGGER.error(f"Failed to restore Tidal-NG settings.json: {e}")
+        # --- Cleanup ---
+        # rmtree removes the symlinks, not the shared files they point to
+        shutil.rmtree(task_config_path, ignore_errors=True)
 
         if os.path.exists(temp_download_path):
             shutil.rmtree(temp_download_path, ignore_errors=True)
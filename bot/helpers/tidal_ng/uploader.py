@@ -1,11 +1,12 @@
 import os
 import shutil
-import asyncio
 import re
 from config import Config
 from bot.logger import LOGGER
 from bot.settings import bot_set
-from bot.helpers.utils import format_string, send_message, edit_message, MAX_SIZE
+from bot.helpers.utils import format_string, send_message, edit_message, MAX_SIZE, release_cover
+from bot.helpers.archive import ArchiveParts
+from bot.helpers import rclone_rc
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from ..state import conversation_state
 
@@ -21,8 +22,8 @@ def _get_folder_size(folder_path: str) -> int:
     return total_size
 
 
-async def create_tidal_ng_zip(directory: str, user_id: int, metadata: dict) -> str:
-    """Create a zip file for Tidal NG content with provider-aware naming.
+def get_tidal_ng_zip_path(directory: str, metadata: dict) -> str:
+    """Unique zip path for Tidal NG content with provider-aware naming.
 
     Examples:
     - Album:     [Tidal NG] The_Album_Name.zip
@@ -55,15 +56,6 @@ async def create_tidal_ng_zip(directory: str, user_id: int, metadata: dict) -> s
     while os.path.exists(zip_path):
         zip_path = os.path.join(zip_dir, f"{base}_{idx}.zip")
         idx += 1
-    # Simple synchronous zipping (folder small enough or split handled elsewhere)
-    import zipfile
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for root, _, files in os.walk(directory):
-            for f in files:
-                fp = os.path.join(root, f)
-                arc = os.path.relpath(fp, directory)
-                zipf.write(fp, arc)
-    LOGGER.info(f"Created Tidal NG zip: {zip_path}")
     return zip_path
 
 
@@ -109,21 +101,17 @@ async def _rclone_upload(user, path, base_path):
         source_for_copy = os.path.dirname(abs_path)
         dest_path = f"{dest_root}/{os.path.dirname(rel_path)}".rstrip('/')
 
-    # Add verbose flag and include filter for single files
-    copy_cmd = f'rclone copy -v --create-empty-src-dirs --config ./rclone.conf "{source_for_copy}" "{dest_path}"'
-    if not is_dir:
-        # Ensure we only copy the intended file, not everything in the source directory
-        file_name = os.path.basename(abs_path)
-        copy_cmd += f" --include \"{file_name}\""
-
-    proc = await asyncio.create_subprocess_shell(
-        copy_cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
-    )
-    out, err = await proc.communicate()
-    if proc.returncode != 0:
-        LOGGER.error(f"Rclone copy failed for '{source_for_copy}'.\nCMD: {copy_cmd}\nOutput:\n{err.decode().strip()}")
+    # Include filter for single files: only copy the intended file, not everything in the source directory
+    try:
+        await rclone_rc.copy(
+            source_for_copy, dest_path,
+            include=None if is_dir else os.path.basename(abs_path),
+            create_empty_src_dirs=True,
+            progress=rclone_rc.upload_progress(user),
+            cancel_event=user.get('cancel_event')
+        )
+    except rclone_rc.RcloneError as e:
+        LOGGER.error(f"Rclone copy failed for '{source_for_copy}' -> '{dest_path}': {e}")
         return None, None, None
 
     # Link generation
@@ -131,15 +119,7 @@ async def _rclone_upload(user, path, base_path):
     index_link = None
     if bot_set.link_options in ['RCLONE', 'Both']:
         link_target = f"{dest_root}/{rel_path}".rstrip('/')
-        link_cmd = f'rclone link --config ./rclone.conf "{link_target}"'
-        t2 = await asyncio.create_subprocess_shell(
-            link_cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        so, se = await t2.communicate()
-        if t2.returncode == 0:
-            rclone_link = so.decode().strip()
+        rclone_link = await rclone_rc.public_link(link_target)
     if bot_set.link_options in ['Index', 'Both'] and Config.INDEX_LINK:
         index_link = f"{Config.INDEX_LINK}/{rel_path}".replace(' ', '%20')
 
@@ -167,7 +147,7 @@ async def _rclone_upload(user, path, base_path):
 async def _post_manage(user, remote_info: dict):
     """Posts a message with a button to manage the uploaded content via Rclone."""
     try:
-        from ..database.pg_impl import rclone_sessions_db
+        from ..database.pg_impl import async_rclone_sessions_db
         import uuid
 
         token = uuid.uuid4().hex[:10]
@@ -192,7 +172,7 @@ async def _post_manage(user, remote_info: dict):
             'src_page': 0
         }
 
-        rclone_sessions_db.add_session(
+        await async_rclone_sessions_db.add_session(
             token=token,
             user_id=user['user_id'],
             context=context
@@ -271,7 +251,7 @@ async def track_upload(metadata, user, base_path: str, index: int = None, total:
         pass
     if metadata.get('thumbnail'):
         try:
-            os.remove(metadata['thumbnail'])
+            release_cover(metadata['thumbnail'])
         except Exception:
             pass
 
@@ -315,7 +295,7 @@ async def music_video_upload(metadata, user, base_path: str):
         pass
     if metadata.get('thumbnail'):
         try:
-            os.remove(metadata['thumbnail'])
+            release_cover(metadata['thumbnail'])
         except Exception:
             pass
 
@@ -323,9 +303,13 @@ async def music_video_upload(metadata, user, base_path: str):
 async def album_upload(metadata, user, base_path: str):
     if bot_set.upload_mode == 'Telegram':
         if getattr(bot_set, 'tidal_ng_album_zip', False):
-            # Always create a single descriptive zip for Telegram mode
-            zp = await create_tidal_ng_zip(metadata['folderpath'], user['user_id'], metadata)
-            zip_paths = [zp]
+            # Parts are zipped one at a time and deleted after upload
+            zip_parts = ArchiveParts(
+                metadata['folderpath'],
+                get_tidal_ng_zip_path(metadata['folderpath'], metadata),
+                MAX_SIZE,
+                cancel_event=user.get('cancel_event')
+            )
             caption = await format_string(
                 "💿 **{album}**\n👤 {artist}\n🎧 {provider}",
                 {
@@ -334,12 +318,8 @@ async def album_upload(metadata, user, base_path: str):
                     'provider': metadata.get('provider', 'Tidal NG')
                 }
             )
-            for idx, zp in enumerate(zip_paths, start=1):
+            async for zp in zip_parts:
                 await send_message(user, zp, 'doc', caption=caption)
-                try:
-                    os.remove(zp)
-                except Exception:
-                    pass
         else:
             tracks = metadata.get('tracks') or metadata.get('items', [])
             total_tracks = len(tracks)
@@ -370,7 +350,12 @@ async def album_upload(metadata, user, base_path: str):
 async def playlist_upload(metadata, user, base_path: str):
     if bot_set.upload_mode == 'Telegram':
         if getattr(bot_set, 'tidal_ng_playlist_zip', False):
-            zp = await create_tidal_ng_zip(metadata['folderpath'], user['user_id'], metadata)
+            zip_parts = ArchiveParts(
+                metadata['folderpath'],
+                get_tidal_ng_zip_path(metadata['folderpath'], metadata),
+                MAX_SIZE,
+                cancel_event=user.get('cancel_event')
+            )
             caption = await format_string(
                 "🎵 **{title}**\n👤 Curated by {artist}\n🎧 {provider} Playlist",
                 {
@@ -379,11 +364,8 @@ async def playlist_upload(metadata, user, base_path: str):
                     'provider': metadata.get('provider', 'Tidal NG')
                 }
             )
-            await send_message(user, zp, 'doc', caption=caption)
-            try:
-                os.remove(zp)
-            except Exception:
-                pass
+            async for zp in zip_parts:
+                await send_message(user, zp, 'doc', caption=caption)
         else:
             tracks = metadata.get('tracks') or metadata.get('items', [])
             total_tracks = len(tracks)
@@ -32,3 +32,41 @@ def get_tidal_ng_download_base_path() -> str:
     except Exception as e:
         LOGGER.error(f"Unexpected error reading Tidal NG settings.json: {e}")
         return os.path.expanduser("~/download")
+
+
+def prepare_task_config(config_root: str, download_path: str) -> dict:
+    """
+    Build a private tidal-dl-ng config directory for one task (or worker).
+    The CLI reads its config from $XDG_CONFIG_HOME/tidal_dl_ng when that
+    variable is set, so every task gets a copy of settings.json pointing
+    at its own download folder, while the other files (login token, ...)
+    are symlinked to the shared ones. Concurrent tasks never touch the
+    shared settings.json.
+    Returns:
+        dict: the task's settings
+    """
+    shared_dir = os.path.dirname(SETTINGS_PATH)
+    shared_root = os.path.dirname(shared_dir)
+    task_settings = {}
+    # dev builds of the CLI use a "-dev" config folder
+    for name in (os.path.basename(shared_dir), f"{os.path.basename(shared_dir)}-dev"):
+        src = os.path.join(shared_root, name)
+        if name != os.path.basename(shared_dir) and not os.path.isdir(src):
+            continue
+        dst = os.path.join(config_root, name)
+        os.makedirs(dst, exist_ok=True)
+        if os.path.isdir(src):
+            for entry in os.listdir(src):
+                if entry != "settings.json":
+                    os.symlink(os.path.join(src, entry), os.path.join(dst, entry))
+        try:
+            with open(os.path.join(src, "settings.json"), "r") as f:
+                settings = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            settings = {}
+        settings["download_base_path"] = download_path
+        with open(os.path.join(dst, "settings.json"), "w") as f:
+            json.dump(settings, f, indent=4)
+        if src == shared_dir:
+            task_settings = settings
+    return task_settings
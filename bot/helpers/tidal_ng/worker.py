@@ -0,0 +1,115 @@
+"""
+Long-running tidal-dl-ng process, started by worker_pool.py so each link
+does not pay for a new interpreter, the tidal_dl_ng imports and the
+session restore. Runs standalone (no bot imports):
+
+    python worker.py /path/to/tidal_dl_ng/cli.py
+
+Jobs come in on stdin, one JSON object per line:
+    {"id": "...", "link": "...", "download_path": "..."}
+Events go out on stdout, one JSON object per line:
+    {"event": "ready"}
+    {"id": "...", "event": "progress", "tasks": [{"description": "...", "completed": 3, "total": 10}, ...]}
+    {"id": "...", "event": "done", "ok": true, "error": null}
+Everything tidal-dl-ng prints itself goes to stderr.
+"""
+import json
+import os
+import sys
+import threading
+import traceback
+
+PROGRESS_INTERVAL = 1.0  # seconds between progress events
+
+
+def main():
+    cli_path = os.path.abspath(sys.argv[1])
+    sys.path.insert(0, os.path.dirname(os.path.dirname(cli_path)))
+
+    # Keep stdout for the protocol; anything else printing to fd 1 lands on stderr
+    proto = os.fdopen(os.dup(1), "w", buffering=1)
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+    write_lock = threading.Lock()
+
+    def emit(**event):
+        with write_lock:
+            proto.write(json.dumps(event) + "\n")
+            proto.flush()
+
+    # tidal-dl-ng reports through rich progress bars; keep track of them
+    # so their state can be sent as structured events
+    import rich.progress
+    bars = []
+    original_init = rich.progress.Progress.__init__
+
+    def tracking_init(self, *args, **kwargs):
+        original_init(self, *args, **kwargs)
+        bars.append(self)
+
+    rich.progress.Progress.__init__ = tracking_init
+
+    from tidal_dl_ng.cli import app
+
+    def snapshot():
+        tasks = []
+        for bar in list(bars):
+            for task in list(bar.tasks):
+                tasks.append({
+                    "description": str(task.description),
+                    "completed": task.completed,
+                    "total": task.total,
+                })
+        return tasks
+
+    def report(job_id, stop: threading.Event):
+        last = None
+        while not stop.wait(PROGRESS_INTERVAL):
+            tasks = snapshot()
+            if tasks and tasks != last:
+                emit(id=job_id, event="progress", tasks=tasks)
+                last = tasks
+
+    def reload_settings(download_path):
+        # The pool rewrites settings.json before every job; pick the new file
+        # up in the (singleton) settings object the CLI keeps between runs
+        try:
+            from tidal_dl_ng.config import Settings
+            settings = Settings()
+            settings.read(settings.file_path)
+            settings.data.download_base_path = download_path
+        except Exception as e:
+            print(f"Could not reload tidal-dl-ng settings: {e}", file=sys.stderr)
+
+    emit(event="ready")
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        job = json.loads(line)
+        bars.clear()
+        stop = threading.Event()
+        reporter = threading.Thread(target=report, args=(job["id"], stop), daemon=True)
+        reporter.start()
+        ok, error = False, None
+        try:
+            reload_settings(job["download_path"])
+            # With standalone_mode=False click hands back the command's own
+            # return value (download() returns True), not an exit status;
+            # only SystemExit or an exception means the job failed
+            app(["dl", job["link"]], standalone_mode=False)
+            ok = True
+        except SystemExit as e:
+            ok = not e.code
+            if not ok:
+                error = f"tidal-dl-ng exited with {e.code}"
+        except Exception as e:
+            traceback.print_exc()
+            error = f"{type(e).__name__}: {e}"
+        stop.set()
+        reporter.join()
+        emit(id=job["id"], event="progress", tasks=snapshot())
+        emit(id=job["id"], event="done", ok=ok, error=error)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import os
+import re
+import json
+import uuid
+import shutil
+import asyncio
+
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional
+
+from config import Config
+from bot.logger import LOGGER
+from .utils import prepare_task_config
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "worker.py")
+READY_TIMEOUT = 120  # seconds for a new worker to import tidal_dl_ng
+STREAM_LIMIT = 1024 * 1024  # progress events list every bar, allow long lines
+
+ProgressCallback = Callable[[list], Awaitable[None]]
+
+
+class WorkerUnavailable(Exception):
+    """The worker process could not be started or died during a job."""
+
+
+class TidalNgWorker:
+    """
+    One long-running tidal-dl-ng process (see worker.py) with its own
+    config directory. It runs one download at a time.
+    """
+
+    def __init__(self, index: int, cli_path: str):
+        self.index = index
+        self.cli_path = cli_path
+        self.config_path = os.path.join(Config.LOCAL_STORAGE, "tidal_ng_workers", str(index))
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.busy = False
+        self._stderr_task: Optional[asyncio.Task] = None
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    def _configure(self, download_path: str) -> dict:
+        # Rebuilt from the shared settings every time so setting changes apply to the next job
+        shutil.rmtree(self.config_path, ignore_errors=True)
+        return prepare_task_config(self.config_path, download_path)
+
+    async def start(self):
+        await asyncio.to_thread(self._configure, os.path.expanduser("~/download"))
+        env = os.environ.copy()
+        env["FFMPEG_PATH"] = "/usr/bin/ffmpeg"
+        env["XDG_CONFIG_HOME"] = self.config_path
+        env["PYTHONUNBUFFERED"] = "1"
+        try:
+            self.process = await asyncio.create_subprocess_exec(
+                "python", WORKER_SCRIPT, self.cli_path,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=env,
+                limit=STREAM_LIMIT,
+            )
+        except OSError as e:
+            raise WorkerUnavailable(f"could not start worker: {e}")
+        self._stderr_task = asyncio.create_task(self._log_stderr())
+        try:
+            event = await asyncio.wait_for(self._read_event(), READY_TIMEOUT)
+        except (asyncio.TimeoutError, WorkerUnavailable, ValueError) as e:
+            await self.stop()
+            raise WorkerUnavailable(f"worker did not start: {e}")
+        if event.get("event") != "ready":
+            await self.stop()
+            raise WorkerUnavailable(f"unexpected worker event: {event}")
+        LOGGER.info(f"Tidal-NG worker {self.index} started (pid={self.process.pid})")
+
+    async def _log_stderr(self):
+        while True:
+            line = await self.process.stderr.readline()
+            if not line:
+                break
+            LOGGER.info(f"[TidalDL-NG:{self.index}] {line.decode('utf-8', 'replace').strip()}")
+
+    async def _read_event(self) -> dict:
+        line = await self.process.stdout.readline()
+        if not line:
+            raise WorkerUnavailable("worker exited")
+        return json.loads(line)
+
+    async def run(self, link: str, download_path: str, on_progress: Optional[ProgressCallback] = None) -> dict:
+        """
+        Download a link into download_path.
+        Returns:
+            dict: the settings the download ran with
+        Raises:
+            WorkerUnavailable: the worker died (or was killed by a cancel)
+            Exception: tidal-dl-ng reported a failure
+        """
+        self.busy = True
+        settings = await asyncio.to_thread(self._configure, download_path)
+        job_id = uuid.uuid4().hex[:8]
+        try:
+            self.process.stdin.write((json.dumps({
+                "id": job_id, "link": link, "download_path": download_path
+            }) + "\n").encode())
+            await self.process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError) as e:
+            raise WorkerUnavailable(f"worker is gone: {e}")
+
+        while True:
+            event = await self._read_event()
+            if event.get("id") != job_id:
+                continue
+            if event.get("event") == "progress":
+                if on_progress:
+                    try:
+                        await on_progress(event.get("tasks") or [])
+                    except Exception as e:
+                        LOGGER.debug(f"Tidal-NG progress update failed: {e}")
+            elif event.get("event") == "done":
+                self.busy = False
+                if not event.get("ok"):
+                    raise Exception(event.get("error") or "Tidal-NG download process failed.")
+                return settings
+
+    async def stop(self):
+        if self.alive:
+            try:
+                self.process.terminate()
+                await asyncio.wait_for(self.process.wait(), 10)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+            except ProcessLookupError:
+                pass
+        if self._stderr_task:
+            self._stderr_task.cancel()
+        shutil.rmtree(self.config_path, ignore_errors=True)
+
+
+class TidalNgWorkerPool:
+    """
+    Up to TIDAL_NG_WORKERS warm tidal-dl-ng processes shared by all
+    Tidal-NG tasks. Workers start on first use and are reused while they
+    stay healthy; a worker that dies or is killed by a cancel is replaced
+    by a fresh one on the next job.
+    """
+
+    def __init__(self, size: int, cli_path: str):
+        self.size = size
+        self.cli_path = cli_path
+        self._idle: list[TidalNgWorker] = []
+        self._used: set[int] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    @asynccontextmanager
+    async def worker(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.size)
+        async with self._semaphore:
+            worker = None
+            while self._idle and worker is None:
+                candidate = self._idle.pop()
+                if candidate.alive:
+                    worker = candidate
+                else:
+                    await self._discard(candidate)
+            if worker is None:
+                index = min(set(range(self.size)) - self._used)
+                self._used.add(index)
+                worker = TidalNgWorker(index, self.cli_path)
+                try:
+                    await worker.start()
+                except BaseException:
+                    self._used.discard(index)
+                    raise
+            try:
+                yield worker
+            finally:
+                if worker.alive and not worker.busy:
+                    self._idle.append(worker)
+                else:
+                    await self._discard(worker)
+
+    async def _discard(self, worker: TidalNgWorker):
+        await worker.stop()
+        self._used.discard(worker.index)
+
+    async def download(self, link: str, download_path: str, on_progress: Optional[ProgressCallback] = None,
+                       task_id: Optional[str] = None) -> dict:
+        """Run a download on a warm worker; a cancel of task_id kills the worker."""
+        async with self.worker() as worker:
+            if task_id:
+                from bot.helpers.tasks import task_manager
+                await task_manager.register_subprocess(task_id, worker.process)
+            try:
+                return await worker.run(link, download_path, on_progress)
+            finally:
+                if task_id:
+                    await task_manager.clear_subprocess(task_id)
+
+
+def progress_from_tasks(tasks: list) -> tuple[Optional[int], Optional[int], Optional[int]]:
+    """
+    Reduce tidal-dl-ng progress bars to (tracks_done, tracks_total, percent).
+    Collections have a "List ..." bar counting items; single items only have
+    their own bar.
+    """
+    for task in tasks:
+        description = re.sub(r"\[/?[^\]]*\]", "", task.get("description") or "").strip()
+        if description.startswith("List") and task.get("total"):
+            return int(task["completed"]), int(task["total"]), None
+    for task in tasks:
+        if task.get("total"):
+            return None, None, int(task["completed"] * 100 / task["total"])
+    return None, None, None
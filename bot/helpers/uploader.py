@@ -2,17 +2,106 @@ import os
 import shutil
 import zipfile
 import asyncio
+import math
+from functools import partial
 from config import Config
-from bot.helpers.utils import create_apple_zip, format_string, send_message, edit_message, zip_handler, MAX_SIZE
+from bot.helpers.utils import get_apple_zip_path, format_string, send_message, edit_message, MAX_SIZE, get_apple_task_root, release_cover
+from bot.helpers.archive import ArchiveParts
+from bot.helpers.message import send_in_order, send_audio_group
 from bot.logger import LOGGER
 from mutagen import File
 from mutagen.mp4 import MP4
 import re
 from bot.settings import bot_set
 from bot.helpers.progress import ProgressReporter
+from bot.helpers import rclone_rc
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
-async def track_upload(metadata, user, index: int = None, total: int = None):
+VIDEO_EXTENSIONS = ('.mp4', '.m4v', '.mov')
+
+
+async def _track_caption(metadata):
+    return await format_string(
+        "🎵 **{title}**\n👤 {artist}\n🎧 {provider}",
+        {
+            'title': metadata['title'],
+            'artist': metadata['artist'],
+            'provider': metadata.get('provider', 'Apple Music')
+        }
+    )
+
+
+def _track_meta(metadata):
+    return {
+        'duration': metadata['duration'],
+        'artist': metadata['artist'],
+        'title': metadata['title'],
+        'thumbnail': metadata['thumbnail']
+    }
+
+
+async def _remove_track_files(metadata):
+    try:
+        await asyncio.to_thread(os.remove, metadata['filepath'])
+        if metadata.get('thumbnail'):
+            await asyncio.to_thread(release_cover, metadata['thumbnail'])
+    except Exception as e:
+        LOGGER.error(f"Error during file cleanup for track {metadata.get('title')}: {e}")
+
+
+async def tracks_upload(tracks, user):
+    """
+    Upload several tracks to Telegram: as albums of up to 10 when
+    TG_MEDIA_GROUP is on, otherwise one message per track (in parallel)
+    Args:
+        tracks: Track metadata list
+        user: User details
+    """
+    total_tracks = len(tracks)
+    if not Config.TG_MEDIA_GROUP or total_tracks < 2:
+        await send_in_order([
+            partial(track_upload, track, user, idx, total_tracks)
+            for idx, track in enumerate(tracks, start=1)
+        ])
+        return
+
+    items = [
+        {'filepath': track['filepath'], 'caption': await _track_caption(track), 'meta': _track_meta(track)}
+        for track in tracks
+    ]
+    await send_audio_group(user, items, user.get('progress'), user.get('cancel_event'))
+    for track in tracks:
+        await _remove_track_files(track)
+
+
+async def queue_track_upload(sends, metadata, user):
+    """
+    Add a downloaded track or music video to a TrackSends run, to send it
+    while the rest of an album/playlist is still downloading (Telegram).
+    Track files stay on disk until remove_tracks is called after the run.
+    Args:
+        sends: TrackSends run
+        metadata: Track or video metadata
+        user: User details
+    """
+    if metadata['filepath'].endswith(VIDEO_EXTENSIONS):
+        await sends.add_upload(partial(music_video_upload, metadata, user))
+    else:
+        await sends.add({
+            'filepath': metadata['filepath'],
+            'caption': await _track_caption(metadata),
+            'meta': _track_meta(metadata)
+        })
+
+
+async def remove_tracks(tracks):
+    """Delete the files of tracks sent through queue_track_upload (videos clean up after themselves)."""
+    for track in tracks:
+        if not track['filepath'].endswith(VIDEO_EXTENSIONS) and os.path.exists(track['filepath']):
+            await _remove_track_files(track)
+
+
+async def track_upload(metadata, user, index: int = None, total: int = None, order=None):
     """
     Upload a single track
     Args:
@@ -20,10 +109,11 @@ async def track_upload(metadata, user, index: int = None, total: int = None):
         user: User details
         index: Optional file index for progress display
         total: Optional total files for progress display
+        order: Optional UploadOrder when sent through send_in_order
     """
     # Determine base path for different providers
     if "Apple Music" in metadata['filepath']:
-        base_path = os.path.join(Config.LOCAL_STORAGE, str(user['user_id']), "Apple Music")
+        base_path = get_apple_task_root(user)
     else:
         base_path = Config.LOCAL_STORAGE
     
@@ -35,25 +125,14 @@ async def track_upload(metadata, user, index: int = None, total: int = None):
             user,
             metadata['filepath'],
             'audio',
-            caption=await format_string(
-                "🎵 **{title}**\n👤 {artist}\n🎧 {provider}",
-                {
-                    'title': metadata['title'],
-                    'artist': metadata['artist'],
-                    'provider': metadata.get('provider', 'Apple Music')
-                }
-            ),
-            meta={
-                'duration': metadata['duration'],
-                'artist': metadata['artist'],
-                'title': metadata['title'],
-                'thumbnail': metadata['thumbnail']
-            },
+            caption=await _track_caption(metadata),
+            meta=_track_meta(metadata),
             progress_reporter=reporter,
             progress_label="Uploading",
             file_index=index,
             total_files=total,
-            cancel_event=user.get('cancel_event')
+            cancel_event=user.get('cancel_event'),
+            order=order
         )
     elif bot_set.upload_mode == 'RCLONE':
         rclone_link, index_link, remote_info = await rclone_upload(user, metadata['filepath'], base_path)
@@ -72,12 +151,7 @@ async def track_upload(metadata, user, index: int = None, total: int = None):
         await _post_rclone_manage_button(user, remote_info)
     
     # Cleanup
-    try:
-        await asyncio.to_thread(os.remove, metadata['filepath'])
-        if metadata.get('thumbnail'):
-            await asyncio.to_thread(os.remove, metadata['thumbnail'])
-    except Exception as e:
-        LOGGER.error(f"Error during file cleanup for track {metadata.get('title')}: {e}")
+    await _remove_track_files(metadata)
 
 async def music_video_upload(metadata, user):
     """
@@ -88,7 +162,7 @@ async def music_video_upload(metadata, user):
     """
     # Determine base path for different providers
     if "Apple Music" in metadata['filepath']:
-        base_path = os.path.join(Config.LOCAL_STORAGE, str(user['user_id']), "Apple Music")
+        base_path = get_apple_task_root(user)
     else:
         base_path = Config.LOCAL_STORAGE
     
@@ -137,7 +211,7 @@ async def music_video_upload(metadata, user):
     try:
         await asyncio.to_thread(os.remove, metadata['filepath'])
         if metadata.get('thumbnail'):
-            await asyncio.to_thread(os.remove, metadata['thumbnail'])
+            await asyncio.to_thread(release_cover, metadata['thumbnail'])
     except Exception as e:
         LOGGER.error(f"Error during file cleanup for music video {metadata.get('title')}: {e}")
 
@@ -166,7 +240,7 @@ async def album_upload(metadata, user):
     """
     # Determine base path for different providers
     if "Apple Music" in metadata['folderpath']:
-        base_path = os.path.join(Config.LOCAL_STORAGE, str(user['user_id']), "Apple Music")
+        base_path = get_apple_task_root(user)
     else:
         base_path = Config.LOCAL_STORAGE
     
@@ -175,23 +249,17 @@ async def album_upload(metadata, user):
         # Use Apple-specific toggle; do not rely on core
         use_zip = bool(getattr(bot_set, 'apple_album_zip', False))
         if use_zip:
-            # Decide zipping strategy based on folder size and Telegram limits
+            # Parts are zipped one at a time and deleted after upload, so only
+            # one part is ever on disk next to the source files
             total_size = await _get_folder_size(metadata['folderpath'])
-            zip_paths = []
-            if total_size > MAX_SIZE:
-                # Split into multiple zips for Telegram
-                z = await zip_handler(metadata['folderpath'])
-                zip_paths = z if isinstance(z, list) else [z]
-            else:
-                # Single descriptive zip with progress
-                zip_path = await create_apple_zip(
-                    metadata['folderpath'], 
-                    user['user_id'],
-                    metadata,
-                    progress=reporter,
-                    cancel_event=user.get('cancel_event')
-                )
-                zip_paths = [zip_path]
+            total_parts = max(1, math.ceil(total_size / MAX_SIZE))
+            zip_parts = ArchiveParts(
+                metadata['folderpath'],
+                get_apple_zip_path(metadata['folderpath'], metadata),
+                MAX_SIZE,
+                progress=reporter,
+                cancel_event=user.get('cancel_event')
+            )
             
             # Create caption with provider info
             caption = await format_string(
@@ -203,8 +271,9 @@ async def album_upload(metadata, user):
                 }
             )
             
-            total_parts = len(zip_paths)
-            for idx, zp in enumerate(zip_paths, start=1):
+            idx = 0
+            async for zp in zip_parts:
+                idx += 1
                 await send_message(
                     user,
                     zp,
@@ -213,19 +282,12 @@ async def album_upload(metadata, user):
                     progress_reporter=reporter,
                     progress_label="Uploading",
                     file_index=idx,
-                    total_files=total_parts
+                    total_files=max(idx, total_parts)
                 )
-                # Clean up zip file after upload
-                try:
-                    await asyncio.to_thread(os.remove, zp)
-                except Exception as e:
-                    LOGGER.error(f"Error during zip cleanup for album {metadata.get('title')}: {e}")
         else:
             # Upload tracks individually
             tracks = metadata.get('tracks') or metadata.get('items', [])
-            total_tracks = len(tracks)
-            for idx, track in enumerate(tracks, start=1):
-                await track_upload(track, user, index=idx, total=total_tracks)
+            await tracks_upload(tracks, user)
     elif bot_set.upload_mode == 'RCLONE':
         rclone_link, index_link, remote_info = await rclone_upload(user, metadata['folderpath'], base_path)
         text = await format_string(
@@ -258,28 +320,24 @@ async def artist_upload(metadata, user):
     """
     # Determine base path for different providers
     if "Apple Music" in metadata['folderpath']:
-        base_path = os.path.join(Config.LOCAL_STORAGE, str(user['user_id']), "Apple Music")
+        base_path = get_apple_task_root(user)
     else:
         base_path = Config.LOCAL_STORAGE
     
     if bot_set.upload_mode == 'Telegram':
         reporter = user.get('progress')
         if bot_set.artist_zip:
-            # Decide zipping strategy based on size
+            # Parts are zipped one at a time and deleted after upload, so only
+            # one part is ever on disk next to the source files
             total_size = await _get_folder_size(metadata['folderpath'])
-            zip_paths = []
-            if total_size > MAX_SIZE:
-                z = await zip_handler(metadata['folderpath'])
-                zip_paths = z if isinstance(z, list) else [z]
-            else:
-                zip_path = await create_apple_zip(
-                    metadata['folderpath'], 
-                    user['user_id'],
-                    metadata,
-                    progress=reporter,
-                    cancel_event=user.get('cancel_event')
-                )
-                zip_paths = [zip_path]
+            total_parts = max(1, math.ceil(total_size / MAX_SIZE))
+            zip_parts = ArchiveParts(
+                metadata['folderpath'],
+                get_apple_zip_path(metadata['folderpath'], metadata),
+                MAX_SIZE,
+                progress=reporter,
+                cancel_event=user.get('cancel_event')
+            )
             
             # Create caption with provider info
             caption = await format_string(
@@ -290,8 +348,9 @@ async def artist_upload(metadata, user):
                 }
             )
             
-            total_parts = len(zip_paths)
-            for idx, zp in enumerate(zip_paths, start=1):
+            idx = 0
+            async for zp in zip_parts:
+                idx += 1
                 await send_message(
                     user,
                     zp,
@@ -300,12 +359,8 @@ async def artist_upload(metadata, user):
                     progress_reporter=reporter,
                     progress_label="Uploading",
                     file_index=idx,
-                    total_files=total_parts
+                    total_files=max(idx, total_parts)
                 )
-                try:
-                    await asyncio.to_thread(os.remove, zp)
-                except Exception as e:
-                    LOGGER.error(f"Error during zip cleanup for artist {metadata.get('title')}: {e}")
         else:
             # Upload albums or tracks individually
             if 'albums' in metadata:
@@ -313,9 +368,7 @@ async def artist_upload(metadata, user):
                     await album_upload(album, user)
             else:
                 tracks = metadata.get('tracks') or metadata.get('items', [])
-                total_tracks = len(tracks)
-                for idx, track in enumerate(tracks, start=1):
-                    await track_upload(track, user, index=idx, total=total_tracks)
+                await tracks_upload(tracks, user)
     elif bot_set.upload_mode == 'RCLONE':
         rclone_link, index_link, remote_info = await rclone_upload(user, metadata['folderpath'], base_path)
         text = await format_string(
@@ -343,7 +396,7 @@ async def playlist_upload(metadata, user):
     """
     # Determine base path for different providers
     if "Apple Music" in metadata['folderpath']:
-        base_path = os.path.join(Config.LOCAL_STORAGE, str(user['user_id']), "Apple Music")
+        base_path = get_apple_task_root(user)
     else:
         base_path = Config.LOCAL_STORAGE
     
@@ -352,22 +405,17 @@ async def playlist_upload(metadata, user):
         # Use Apple-specific toggle; do not rely on core
         use_zip = bool(getattr(bot_set, 'apple_playlist_zip', False))
         if use_zip:
-            # Decide zipping strategy based on size
+            # Parts are zipped one at a time and deleted after upload, so only
+            # one part is ever on disk next to the source files
             total_size = await _get_folder_size(metadata['folderpath'])
-            zip_paths = []
-            if total_size > MAX_SIZE:
-                z = await zip_handler(metadata['folderpath'])
-                zip_paths = z if isinstance(z, list) else [z]
-            else:
-                # Create descriptive zip file
-                zip_path = await create_apple_zip(
-                    metadata['folderpath'], 
-                    user['user_id'],
-                    metadata,
-                    progress=reporter,
-                    cancel_event=user.get('cancel_event')
-                )
-                zip_paths = [zip_path]
+            total_parts = max(1, math.ceil(total_size / MAX_SIZE))
+            zip_parts = ArchiveParts(
+                metadata['folderpath'],
+                get_apple_zip_path(metadata['folderpath'], metadata),
+                MAX_SIZE,
+                progress=reporter,
+                cancel_event=user.get('cancel_event')
+            )
             
             # Create caption with provider info
             caption = await format_string(
@@ -379,8 +427,9 @@ async def playlist_upload(metadata, user):
                 }
             )
             
-            total_parts = len(zip_paths)
-            for idx, zp in enumerate(zip_paths, start=1):
+            idx = 0
+            async for zp in zip_parts:
+                idx += 1
                 await send_message(
                     user,
                     zp,
@@ -389,18 +438,12 @@ async def playlist_upload(metadata, user):
                     progress_reporter=reporter,
                     progress_label="Uploading",
                     file_index=idx,
-                    total_files=total_parts
+                    total_files=max(idx, total_parts)
                 )
-                try:
-                    await asyncio.to_thread(os.remove, zp)
-                except Exception as e:
-                    LOGGER.error(f"Error during zip cleanup for playlist {metadata.get('title')}: {e}")
         else:
             # Upload tracks individually
             tracks = metadata.get('tracks') or metadata.get('items', [])
-            total_tracks = len(tracks)
-            for idx, track in enumerate(tracks, start=1):
-                await track_upload(track, user, index=idx, total=total_tracks)
+            await tracks_upload(tracks, user)
     elif bot_set.upload_mode == 'RCLONE':
         rclone_link, index_link, remote_info = await rclone_upload(user, metadata['folderpath'], base_path)
         text = await format_string(
@@ -488,18 +531,14 @@ async def rclone_upload(user, path, base_path):
             dest_path = f"{dest_root}/{parent_dir}".rstrip("/")
 
     # 1) Copy source to remote destination
-    copy_cmd = f'rclone copy --config ./rclone.conf "{source_for_copy}" "{dest_path}"'
-    copy_task = await asyncio.create_subprocess_shell(
-        copy_cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
-    )
-    copy_stdout, copy_stderr = await copy_task.communicate()
-    if copy_task.returncode != 0:
-        try:
-            LOGGER.debug(f"Rclone copy failed: {copy_stderr.decode().strip()}")
-        except Exception:
-            pass
+    try:
+        await rclone_rc.copy(
+            source_for_copy, dest_path,
+            progress=rclone_rc.upload_progress(user),
+            cancel_event=user.get('cancel_event')
+        )
+    except rclone_rc.RcloneError as e:
+        LOGGER.debug(f"Rclone copy failed: {e}")
         # Even if copy fails, return None links so caller can handle gracefully
         return None, None, None
 
@@ -511,23 +550,7 @@ async def rclone_upload(user, path, base_path):
     if bot_set.link_options in ['RCLONE', 'Both']:
         # Link target should reflect the relative root of the uploaded entity
         link_target = f"{dest_root}/{relative_path}".rstrip("/")
-        link_cmd = f'rclone link --config ./rclone.conf "{link_target}"'
-        link_task = await asyncio.create_subprocess_shell(
-            link_cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await link_task.communicate()
-        if link_task.returncode == 0:
-            try:
-                rclone_link = stdout.decode().strip()
-            except Exception:
-                rclone_link = None
-        else:
-            try:
-                LOGGER.debug(f"Failed to get Rclone link: {stderr.decode().strip()}")
-            except Exception:
-                pass
+        rclone_link = await rclone_rc.public_link(link_target)
 
     # Optional index link
     if bot_set.link_options in ['Index', 'Both'] and Config.INDEX_LINK:
@@ -560,7 +583,7 @@ async def rclone_upload(user, path, base_path):
 
 async def _post_rclone_manage_button(user, remote_info: dict):
     try:
-        from ..helpers.database.pg_impl import rclone_sessions_db
+        from ..helpers.database.pg_impl import async_rclone_sessions_db
         import uuid
 
         # Generate a unique token for the session
@@ -590,7 +613,7 @@ async def _post_rclone_manage_button(user, remote_info: dict):
         }
 
         # Save the session to the database
-        rclone_sessions_db.add_session(
+        await async_rclone_sessions_db.add_session(
             token=token,
             user_id=user['user_id'],
             context=context
@@ -1,7 +1,9 @@
 from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.http import build_http
+from json import loads
 from logging import getLogger, ERROR
 from os import path as ospath, listdir
 from pickle import load as pload
@@ -38,6 +40,7 @@ class GoogleDriveHelper:
         self.sa_count = 1
         self.sa_number = 100
         self.alt_auth = False
+        self.credentials = None
         self.service = None
         self.total_files = 0
         self.total_folders = 0
@@ -85,8 +88,25 @@ class GoogleDriveHelper:
                 credentials = pload(f)
         else:
             LOGGER.error("token.pickle not found!")
+        self.credentials = credentials
+        return self.build_service(credentials)
+
+    @staticmethod
+    def build_service(credentials):
+        """
+        A new Drive service with its own HTTP connection (httplib2 connections
+        can't be shared between threads). GDRIVE_API_URL points every Drive
+        call, uploads and batches included, at another server, e.g. a local
+        fake Drive.
+        """
         authorized_http = AuthorizedHttp(credentials, http=build_http())
         authorized_http.http.disable_ssl_certificate_validation = True
+        if Config.GDRIVE_API_URL:
+            document = loads(get_static_doc("drive", "v3"))
+            document["rootUrl"] = document["mtlsRootUrl"] = (
+                Config.GDRIVE_API_URL.rstrip("/") + "/"
+            )
+            return build_from_document(document, http=authorized_http)
         return build("drive", "v3", http=authorized_http, cache_discovery=False)
 
     def switch_service_account(self):
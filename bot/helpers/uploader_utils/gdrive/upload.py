@@ -1,7 +1,9 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_EXCEPTION, wait
 from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaFileUpload
 from logging import getLogger
-from os import path as ospath, listdir, remove
+from os import path as ospath, remove, walk
+from threading import Lock, local
 from tenacity import (
     retry,
     wait_exponential,
@@ -17,6 +19,8 @@ from .helper import GoogleDriveHelper
 
 LOGGER = getLogger(__name__)
 
+BATCH_SIZE = 100  # calls per Drive batch request (the API's limit)
+
 
 class GoogleDriveUpload(GoogleDriveHelper):
     def __init__(self, listener, path, token_path="token.pickle"):
@@ -26,6 +30,39 @@ class GoogleDriveUpload(GoogleDriveHelper):
         self._is_errored = False
         super().__init__(token_path)
         self.is_uploading = True
+        # Folder uploads run several files at once, each worker thread with
+        # its own Drive service; progress is summed over the running uploads
+        self._lock = Lock()
+        self._local = local()
+        self._sa_generation = 0
+        self._uploads = {}
+        self._done_bytes = 0
+        self._uploaded_ids = []
+
+    async def progress(self):
+        with self._lock:
+            current = self._done_bytes + sum(
+                status.resumable_progress for status in self._uploads.values()
+            )
+        self.proc_bytes = max(self.proc_bytes, current)
+        self.total_time += self.update_interval
+
+    def _drive(self):
+        """The Drive service of the calling thread, rebuilt after a service account switch."""
+        if getattr(self._local, "generation", None) != self._sa_generation:
+            self._local.service = self.build_service(self.credentials)
+            self._local.generation = self._sa_generation
+        return self._local.service
+
+    def _switch_service_account(self, generation):
+        """Switch once per rate limit, however many workers hit it. Returns False when all accounts were used."""
+        with self._lock:
+            if generation == self._sa_generation:
+                if self.sa_count >= self.sa_number:
+                    return False
+                self.switch_service_account()
+                self._sa_generation += 1
+        return True
 
     def user_setting(self):
         if self.listener.up_dest.startswith("mtp:"):
@@ -102,25 +139,127 @@ class GoogleDriveUpload(GoogleDriveHelper):
             return
 
     def _upload_dir(self, input_directory, dest_id):
-        list_dirs = listdir(input_directory)
-        if len(list_dirs) == 0:
-            return dest_id
-        new_id = None
-        for item in list_dirs:
-            current_file_name = ospath.join(input_directory, item)
-            if ospath.isdir(current_file_name):
-                current_dir_id = self.create_directory(item, dest_id)
-                new_id = self._upload_dir(current_file_name, current_dir_id)
-                self.total_folders += 1
-            else:
-                mime_type = get_mime_type(current_file_name)
-                file_name = current_file_name.split("/")[-1]
-                self._upload_file(current_file_name, file_name, mime_type, dest_id)
-                self.total_files += 1
-                new_id = dest_id
+        folders = []
+        files = []
+        for root, dirs, names in walk(input_directory):
+            relative = ospath.relpath(root, input_directory)
+            relative = "" if relative == "." else relative
+            folders.extend(ospath.join(relative, name) for name in dirs)
+            files.extend((ospath.join(root, name), relative) for name in names)
+        folder_ids = self._create_directories(folders, dest_id)
+        if self.listener.is_cancelled:
+            return None
+        self._upload_files(files, folder_ids)
+        if self.listener.is_cancelled:
+            return None
+        if not Config.IS_TEAM_DRIVE:
+            self._grant_permissions(self._uploaded_ids)
+        return dest_id
+
+    def _create_directories(self, folders, dest_id):
+        """
+        Create the folder tree (paths relative to the uploaded folder) one
+        level at a time, each level in batch requests. Returns path -> id.
+        """
+        folder_ids = {"": dest_id}
+        created = []
+        levels = {}
+        for folder in folders:
+            levels.setdefault(folder.count(ospath.sep), []).append(folder)
+        for depth in sorted(levels):
+            for start in range(0, len(levels[depth]), BATCH_SIZE):
+                if self.listener.is_cancelled:
+                    return folder_ids
+                chunk = levels[depth][start : start + BATCH_SIZE]
+                results = self._batch(
+                    [
+                        self.service.files().create(
+                            body={
+                                "name": ospath.basename(folder),
+                                "description": "Uploaded by Mirror-leech-telegram-bot",
+                                "mimeType": self.G_DRIVE_DIR_MIME_TYPE,
+                                "parents": [folder_ids[ospath.dirname(folder)]],
+                            },
+                            supportsAllDrives=True,
+                            fields="id",
+                        )
+                        for folder in chunk
+                    ]
+                )
+                for folder, (response, error) in zip(chunk, results):
+                    if error is None:
+                        folder_ids[folder] = response["id"]
+                        created.append(response["id"])
+                    else:
+                        # create_directory retries and sets its own permission
+                        folder_ids[folder] = self.create_directory(
+                            ospath.basename(folder), folder_ids[ospath.dirname(folder)]
+                        )
+                self.total_folders += len(chunk)
+        LOGGER.info(f"Created {len(folders)} G-Drive folders")
+        if created and not Config.IS_TEAM_DRIVE:
+            self._grant_permissions(created)
+        return folder_ids
+
+    def _upload_files(self, files, folder_ids):
+        def upload(file_path, parent):
             if self.listener.is_cancelled:
-                break
-        return new_id
+                return
+            self._upload_file(
+                file_path,
+                ospath.basename(file_path),
+                get_mime_type(file_path),
+                folder_ids[parent],
+            )
+            if not self.listener.is_cancelled:
+                with self._lock:
+                    self.total_files += 1
+
+        with ThreadPoolExecutor(
+            max_workers=max(Config.GDRIVE_UPLOAD_WORKERS, 1),
+            thread_name_prefix="gdrive-upload",
+        ) as executor:
+            futures = [executor.submit(upload, *item) for item in files]
+            done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in pending:
+                future.cancel()
+        for future in done:
+            if future.exception() is not None:
+                raise future.exception()
+
+    def _batch(self, requests):
+        """Send requests through the Drive batch endpoint; returns (response, error) per request, in order."""
+        results = [(None, None)] * len(requests)
+
+        def callback(request_id, response, exception):
+            results[int(request_id)] = (response, exception)
+
+        batch = self.service.new_batch_http_request(callback=callback)
+        for index, request in enumerate(requests):
+            batch.add(request, request_id=str(index))
+        batch.execute()
+        return results
+
+    def _grant_permissions(self, file_ids):
+        permissions = {
+            "role": "reader",
+            "type": "anyone",
+            "value": None,
+            "withLink": True,
+        }
+        for start in range(0, len(file_ids), BATCH_SIZE):
+            chunk = file_ids[start : start + BATCH_SIZE]
+            results = self._batch(
+                [
+                    self.service.permissions().create(
+                        fileId=file_id, body=permissions, supportsAllDrives=True
+                    )
+                    for file_id in chunk
+                ]
+            )
+            for file_id, (_, error) in zip(chunk, results):
+                if error is not None:
+                    self.set_permission(file_id)
 
     @retry(
         wait=wait_exponential(multiplier=2, min=3, max=6),
@@ -136,15 +275,21 @@ class GoogleDriveUpload(GoogleDriveHelper):
         if dest_id is not None:
             file_metadata["parents"] = [dest_id]
 
+        generation = self._sa_generation
+        service = self._drive()
         if ospath.getsize(file_path) == 0:
             media_body = MediaFileUpload(file_path, mimetype=mime_type, resumable=False)
             response = (
-                self.service.files()
+                service.files()
                 .create(
                     body=file_metadata, media_body=media_body, supportsAllDrives=True
                 )
                 .execute()
             )
+            if in_dir:
+                with self._lock:
+                    self._uploaded_ids.append(response["id"])
+                return
             if not Config.IS_TEAM_DRIVE:
                 self.set_permission(response["id"])
 
@@ -158,14 +303,17 @@ class GoogleDriveUpload(GoogleDriveHelper):
             file_path, mimetype=mime_type, resumable=True, chunksize=100 * 1024 * 1024
         )
 
-        drive_file = self.service.files().create(
+        drive_file = service.files().create(
             body=file_metadata, media_body=media_body, supportsAllDrives=True
         )
         response = None
         retries = 0
         while response is None and not self.listener.is_cancelled:
             try:
-                self.status, response = drive_file.next_chunk()
+                status, response = drive_file.next_chunk()
+                if status is not None:
+                    with self._lock:
+                        self._uploads[file_path] = status
             except HttpError as err:
                 if err.resp.status in [500, 502, 503, 504, 429] and retries < 10:
                     retries += 1
@@ -180,15 +328,16 @@ class GoogleDriveUpload(GoogleDriveHelper):
                     ]:
                         raise err
                     if self.use_sa:
-                        if self.sa_count >= self.sa_number:
+                        if self.listener.is_cancelled:
+                            return
+                        if not self._switch_service_account(generation):
                             LOGGER.info(
                                 f"Reached maximum number of service accounts switching, which is {self.sa_count}"
                             )
                             raise err
                         else:
-                            if self.listener.is_cancelled:
-                                return
-                            self.switch_service_account()
+                            with self._lock:
+                                self._uploads.pop(file_path, None)
                             LOGGER.info(f"Got: {reason}, Trying Again...")
                             return self._upload_file(
                                 file_path,
@@ -200,20 +349,26 @@ class GoogleDriveUpload(GoogleDriveHelper):
                     else:
                         LOGGER.error(f"Got: {reason}")
                         raise err
+        with self._lock:
+            self._uploads.pop(file_path, None)
+            if not self.listener.is_cancelled:
+                self._done_bytes += ospath.getsize(file_path)
         if self.listener.is_cancelled:
             return
         try:
             remove(file_path)
         except:
             pass
-        self.file_processed_bytes = 0
+        if in_dir:
+            # granted in batches once the folder is uploaded
+            with self._lock:
+                self._uploaded_ids.append(response["id"])
+            return
         if not Config.IS_TEAM_DRIVE:
             self.set_permission(response["id"])
-        if not in_dir:
-            drive_file = (
-                self.service.files()
-                .get(fileId=response["id"], supportsAllDrives=True)
-                .execute()
-            )
-            return self.G_DRIVE_BASE_DOWNLOAD_URL.format(drive_file.get("id"))
-        return
+        drive_file = (
+            self.service.files()
+            .get(fileId=response["id"], supportsAllDrives=True)
+            .execute()
+        )
+        return self.G_DRIVE_BASE_DOWNLOAD_URL.format(drive_file.get("id"))
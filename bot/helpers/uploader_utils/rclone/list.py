@@ -9,6 +9,7 @@ from pyrogram.handlers import CallbackQueryHandler
 from time import time
 
 from bot.logger import LOGGER
+from bot.helpers.rclone_rc import RcloneError, listing_cache, PREFETCH_DIRS
 from config import Config
 from ..ext.bot_utils import cmd_exec, update_user_ldata, new_task
 from ..ext.db_handler import database
@@ -252,50 +253,78 @@ class RcloneList:
         msg += f"\nTimeout: {get_readable_time(self._timeout - (time() - self._time))}"
         await self._send_list_message(msg, button)
 
-    async def get_path(self, itype=""):
-        if self.list_status == "rcu":
-            self.item_type = "--dirs-only"
-        elif itype:
-            self.item_type = itype
+    async def _lsjson(self, path):
+        # Directories and files in one call; get_path filters by item type
         cmd = [
             "rclone",
             "lsjson",
-            self.item_type,
             "--fast-list",
             "--no-mimetype",
             "--no-modtime",
             "--config",
             self.config_path,
-            f"{self.remote}{self.path}",
+            path,
         ]
+        res, err, code = await cmd_exec(cmd)
+        # a killed (-9) or failed lsjson leaves partial output, never cache it
+        if code != 0:
+            raise RcloneError(err or f"rclone lsjson exited with code {code}")
+        try:
+            return loads(res)
+        except ValueError as e:
+            raise RcloneError(f"Invalid rclone lsjson output: {e}")
+
+    async def get_path(self, itype=""):
+        if self.list_status == "rcu":
+            self.item_type = "--dirs-only"
+        elif itype:
+            self.item_type = itype
         if self.listener.is_cancelled:
             return
-        res, err, code = await cmd_exec(cmd)
-        if code in [0, -9]:
-            result = loads(res)
-            if (
-                len(result) == 0
-                and itype != self.item_type
-                and self.list_status == "rcd"
-            ):
-                itype = (
-                    "--dirs-only"
-                    if self.item_type == "--files-only"
-                    else "--files-only"
-                )
-                self.item_type = itype
-                await self.get_path(itype)
-            else:
-                self.path_list = sorted(result, key=lambda x: x["Path"])
-                self.iter_start = 0
-                await self.get_path_buttons()
-        else:
+        try:
+            items = await listing_cache.get(
+                self.config_path, f"{self.remote}{self.path}", self._lsjson
+            )
+        except RcloneError as err:
             LOGGER.error(
                 f"While rclone listing. Path: {self.remote}{self.path}. Stderr: {err}"
             )
-            self.remote = err[:4000]
+            self.remote = str(err)[:4000]
             self.path = ""
             self.event.set()
+            return
+        dirs = [item for item in items if item["IsDir"]]
+        result = (
+            dirs
+            if self.item_type == "--dirs-only"
+            else [item for item in items if not item["IsDir"]]
+        )
+        listing_cache.prefetch(
+            self.config_path,
+            [
+                f"{self.remote}{self.path}/{item['Path']}"
+                if self.path
+                else f"{self.remote}{item['Path']}"
+                for item in sorted(dirs, key=lambda x: x["Path"])[:PREFETCH_DIRS]
+            ],
+            self._lsjson,
+        )
+        if (
+            len(result) == 0
+            and itype != self.item_type
+            and self.list_status == "rcd"
+        ):
+            itype = (
+                "--dirs-only"
+                if self.item_type == "--files-only"
+                else "--files-only"
+            )
+            self.item_type = itype
+            await self.get_path(itype)
+        else:
+            self.path_list = sorted(result, key=lambda x: x["Path"])
+            self.iter_start = 0
+            await self.get_path_buttons()
 
     async def list_remotes(self):
         config = RawConfigParser()
@@ -1,23 +1,21 @@
 import os
 import math
-import aiohttp
 import asyncio
 import shutil
-import zipfile
 import re
 import subprocess
 import json
 import base64
 import time
+import hashlib
+import threading
 import mutagen
 from mutagen.mp4 import MP4
 from pathlib import Path
 from urllib.parse import quote
-from aiohttp import ClientTimeout
-from concurrent.futures import ThreadPoolExecutor
 from pyrogram.errors import FloodWait
-from typing import Optional
-from .progress import ProgressReporter
+from concurrent.futures import ThreadPoolExecutor
+from .archive import write_archive, ArchiveParts
 
 # Import Config for Apple Music settings
 from config import Config
@@ -27,60 +25,16 @@ from ..logger import LOGGER
 from ..settings import bot_set
 from .buttons.links import links_button
 from .message import send_message, edit_message
+from . import rclone_rc
 
 MAX_SIZE = 1.9 * 1024 * 1024 * 1024  # 2GB
+APPLE_RUN_DIR_NAME = ".amdl"  # per-task downloader run dir inside the Apple task root
 
-async def download_file(url, path, retries=3, timeout=30, cancel_event: asyncio.Event | None = None):
-    """
-    Download a file with retry logic, timeout, and cooperative cancellation
-    Args:
-        url (str): URL to download
-        path (str): Full path to save the file
-        retries (int): Number of retry attempts
-        timeout (int): Timeout in seconds
-        cancel_event: Optional asyncio.Event to signal cancellation
-    Returns:
-        str or None: Error message if failed, else None
-    """
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    
-    for attempt in range(1, retries + 1):
-        try:
-            if cancel_event and cancel_event.is_set():
-                # Clean partial file if any
-                try:
-                    if os.path.exists(path):
-                        os.remove(path)
-                except Exception:
-                    pass
-                return "Cancelled"
-            async with aiohttp.ClientSession(timeout=ClientTimeout(total=timeout)) as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        with open(path, 'wb') as f:
-                            async for chunk in response.content.iter_chunked(1024 * 4):
-                                if cancel_event and cancel_event.is_set():
-                                    try:
-                                        f.close()
-                                    except Exception:
-                                        pass
-                                    try:
-                                        if os.path.exists(path):
-                                            os.remove(path)
-                                    except Exception:
-                                        pass
-                                    return "Cancelled"
-                                f.write(chunk)
-                        return None
-                    else:
-                        return f"HTTP Status: {response.status}"
-        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-            if attempt == retries:
-                return f"Failed after {retries} attempts: {str(e)}"
-            await asyncio.sleep(2 ** attempt)
-        except Exception as e:
-            return f"Unexpected error: {str(e)}"
-
+# Tag parsing and cover writes are blocking; they run here instead of on the event loop
+metadata_executor = ThreadPoolExecutor(max_workers=Config.METADATA_WORKERS, thread_name_prefix="metadata")
+# Embedded covers shared by several tracks: path -> number of tracks using it
+_cover_refs: dict = {}
+_cover_lock = threading.Lock()
 
 async def format_string(text:str, data:dict, user=None):
     """
@@ -177,20 +131,7 @@ async def create_link(path, basepath):
     index_link = None
 
     if bot_set.link_options in ['RCLONE', 'Both']:
-        cmd = f'rclone link --config ./rclone.conf "{Config.RCLONE_DEST}/{path}"'
-        task = await asyncio.create_subprocess_shell(
-            cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-
-        stdout, stderr = await task.communicate()
-
-        if task.returncode == 0:
-            rclone_link = stdout.decode().strip()
-        else:
-            error_message = stderr.decode().strip()
-            LOGGER.debug(f"Failed to get link: {error_message}")
+        rclone_link = await rclone_rc.public_link(f"{Config.RCLONE_DEST}/{path}")
             
     if bot_set.link_options in ['Index', 'Both']:
         if Config.INDEX_LINK:
@@ -205,65 +146,23 @@ async def zip_handler(folderpath):
     Args:
         folderpath: Path to folder
     Returns:
-        List of zip paths
+        Telegram: ArchiveParts - parts are built one at a time while uploading (use `async for`)
+        Others: path of a single zip
     """
-    loop = asyncio.get_running_loop()
-    with ThreadPoolExecutor() as pool:
-        if bot_set.upload_mode == 'Telegram':
-            zips = await loop.run_in_executor(pool, split_zip_folder, folderpath)
-        else:
-            zips = await loop.run_in_executor(pool, zip_folder, folderpath)
-        return zips
+    if bot_set.upload_mode == 'Telegram':
+        return ArchiveParts(folderpath, max_size=MAX_SIZE)
+    return await asyncio.to_thread(zip_folder, folderpath)
 
 
 def split_zip_folder(folderpath) -> list:
     """
-    Split large folders into multiple zip files
+    Split large folders into multiple zip files no larger than MAX_SIZE
     Args:
         folderpath: Path to folder
     Returns:
         List of zip file paths
     """
-    zip_paths = []
-    part_num = 1
-    current_size = 0
-    current_files = []
-
-    def add_to_zip(zip_name, files_to_add):
-        nonlocal part_num
-        if part_num == 1:
-            zip_path = f"{zip_name}.zip"
-        else:
-            zip_path = f"{zip_name}.part{part_num}.zip"
-
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for file_path, arcname in files_to_add:
-                zipf.write(file_path, arcname)
-                os.remove(file_path)  # Delete after zipping
-        return zip_path
-
-    for root, dirs, files in os.walk(folderpath):
-        for file in files:
-            file_path = os.path.join(root, file)
-            file_size = os.path.getsize(file_path)
-            arcname = os.path.relpath(file_path, folderpath)
-
-            # Start new zip if adding would exceed max size
-            if current_size + file_size > MAX_SIZE:
-                zip_paths.append(add_to_zip(folderpath, current_files))
-                part_num += 1
-                current_files = []
-                current_size = 0
-
-            # Add to current group
-            current_files.append((file_path, arcname))
-            current_size += file_size
-
-    # Create final zip with remaining files
-    if current_files:
-        zip_paths.append(add_to_zip(folderpath, current_files))
-
-    return zip_paths
+    return write_archive(folderpath, f"{folderpath}.zip", max_size=MAX_SIZE, delete_sources=True)
 
 
 def zip_folder(folderpath) -> str:
@@ -274,16 +173,7 @@ def zip_folder(folderpath) -> str:
     Returns:
         Path to zip file
     """
-    zip_path = f"{folderpath}.zip"
-    
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for root, dirs, files in os.walk(folderpath):
-            for file in files:
-                file_path = os.path.join(root, file)
-                zipf.write(file_path, os.path.relpath(file_path, folderpath))
-                os.remove(file_path)
-    
-    return zip_path
+    return write_archive(folderpath, f"{folderpath}.zip", delete_sources=True)[0]
 
 
 async def move_sorted_playlist(metadata, user) -> str:
@@ -457,19 +347,28 @@ async def cleanup(user=None, metadata=None):
     
     if user:
         try:
-            # Clean up Apple Music directory
-            apple_dir = os.path.join(Config.LOCAL_STORAGE, str(user['user_id']), "Apple Music")
+            # Clean up this task's Apple Music directory (other tasks of the
+            # same user may still be running in sibling folders)
+            apple_dir = get_apple_task_root(user)
             if os.path.exists(apple_dir):
                 shutil.rmtree(apple_dir, ignore_errors=True)
-                # Remove parent user directory if now empty
-                user_dir = os.path.join(Config.LOCAL_STORAGE, str(user['user_id']))
-                try:
-                    if os.path.isdir(user_dir) and not os.listdir(user_dir):
-                        os.rmdir(user_dir)
-                except Exception:
-                    pass
+                # Remove parent directories if now empty
+                parents = [os.path.join(Config.LOCAL_STORAGE, str(user['user_id']), "Apple Music"),
+                           os.path.join(Config.LOCAL_STORAGE, str(user['user_id']))]
+                for parent in parents:
+                    try:
+                        if os.path.isdir(parent) and not os.listdir(parent):
+                            os.rmdir(parent)
+                    except Exception:
+                        pass
         except Exception as e:
             LOGGER.info(f"Apple cleanup error: {str(e)}")
+
+        if user.get('task_id'):
+            # Tidal-NG task folders, left behind when a restored job that had
+            # already uploaded skips the handler
+            for name in (f"tidal_ng_temp_{user['task_id']}", f"tidal_ng_config_{user['task_id']}"):
+                shutil.rmtree(os.path.join(Config.LOCAL_STORAGE, str(user['user_id']), name), ignore_errors=True)
         
         try:
             # Clean up old-style directories
@@ -487,18 +386,85 @@ async def cleanup(user=None, metadata=None):
             LOGGER.info(f"Temp dir cleanup error: {str(e)}")
 
 # Apple Music specific utilities
-async def run_apple_downloader(url: str, output_dir: str, options: list = None, user: dict = None, progress=None, task_id: str | None = None, cancel_event: asyncio.Event | None = None) -> dict:
+def get_apple_task_root(user: dict) -> str:
+    """
+    Return the isolated Apple Music working root for a task
+    Args:
+        user: User details (uses user_id and task_id)
+    Returns:
+        Path to the per-task output root
+    """
+    base = os.path.join(Config.LOCAL_STORAGE, str(user['user_id']), "Apple Music")
+    task_id = user.get('task_id')
+    return os.path.join(base, str(task_id)) if task_id else base
+
+
+def prepare_apple_task_config(task_root: str) -> str | None:
+    """
+    Build a private run directory for one Apple downloader invocation.
+    The run directory mirrors the downloader project folder through symlinks,
+    except for config.yaml which is a copy with every *-save-folder key
+    redirected under task_root.
+    Args:
+        task_root: Per-task output root
+    Returns:
+        Path to the run directory, or None if the project folder is missing
+    """
+    project_dir = os.path.dirname(Config.APPLE_CONFIG_YAML_PATH)
+    if not os.path.isdir(project_dir):
+        LOGGER.error(f"Apple downloader project folder not found: {project_dir}")
+        return None
+
+    run_dir = os.path.join(task_root, APPLE_RUN_DIR_NAME)
+    os.makedirs(run_dir, exist_ok=True)
+    for entry in os.listdir(project_dir):
+        if entry == 'config.yaml':
+            continue
+        link_path = os.path.join(run_dir, entry)
+        if not os.path.lexists(link_path):
+            os.symlink(os.path.join(project_dir, entry), link_path)
+
+    try:
+        with open(Config.APPLE_CONFIG_YAML_PATH, 'r', encoding='utf-8', errors='ignore') as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        lines = []
+
+    seen = set()
+    new_lines = []
+    for line in lines:
+        stripped = line.strip()
+        key = stripped.split(':', 1)[0].strip().lower() if ':' in stripped else ''
+        if key.endswith('-save-folder') and not stripped.startswith('#'):
+            folder = os.path.join(task_root, key[:-len('-save-folder')])
+            new_lines.append(f'{key}: "{folder}"\n')
+            seen.add(key)
+        else:
+            new_lines.append(line)
+    for kind in ('alac', 'atmos', 'aac'):
+        key = f"{kind}-save-folder"
+        if key not in seen:
+            new_lines.append(f'{key}: "{os.path.join(task_root, kind)}"\n')
+
+    with open(os.path.join(run_dir, 'config.yaml'), 'w', encoding='utf-8') as f:
+        f.writelines(new_lines)
+    return run_dir
+
+
+async def run_apple_downloader(url: str, output_dir: str, options: list = None, user: dict = None, progress=None, task_id: str | None = None, cancel_event: asyncio.Event | None = None, on_file=None) -> dict:
     """
     Execute Apple Music downloader script with real-time progress.
 
     Args:
         url: Apple Music URL to download
-        output_dir: Unused for Apple (kept for interface compatibility)
+        output_dir: Per-task output root; all save folders are redirected here
         options: List of command-line options
         user: User details for progress updates
         progress: Optional ProgressReporter for rich progress updates
         task_id: Optional task id to register subprocess for cancellation
         cancel_event: Optional cancellation event to cooperatively stop
+        on_file: Optional async callback given each finished file while the
+            downloader is still running (see watch_apple_output)
 
     Returns:
         dict: {'success': bool, 'error': str if failed}
@@ -509,6 +475,14 @@ async def run_apple_downloader(url: str, output_dir: str, options: list = None,
         cmd.extend(options)
     cmd.append(url)
 
+    # Give this invocation its own config so concurrent tasks never share output folders
+    env = os.environ.copy()
+    if output_dir:
+        run_dir = await asyncio.to_thread(prepare_apple_task_config, output_dir)
+        if not run_dir:
+            return {'success': False, 'error': "Apple downloader project folder not found"}
+        env['AMDL_RUN_DIR'] = run_dir
+
     LOGGER.info(f"Running Apple downloader: {' '.join(cmd)}")
 
     # Set a large buffer limit for readline to handle long lines without newlines
@@ -519,7 +493,8 @@ async def run_apple_downloader(url: str, output_dir: str, options: list = None,
         *cmd,
         stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.PIPE,
-        limit=limit
+        limit=limit,
+        env=env
     )
 
     # Register subprocess for external cancellation
@@ -530,97 +505,119 @@ async def run_apple_downloader(url: str, output_dir: str, options: list = None,
     except Exception:
         pass
 
-    # Process stdout line-by-line for real-time progress
-    stdout_lines = []
-    stage_set = False
-    while True:
-        # Check for cancellation first
-        if cancel_event and cancel_event.is_set():
-            try:
-                process.terminate()
-                await asyncio.wait_for(process.wait(), timeout=5)
-            except Exception:
-                process.kill()
-            return {'success': False, 'error': 'Cancelled'}
+    # Stream finished files to the caller while the downloader keeps going
+    watcher = None
+    watch_stop = asyncio.Event()
+    if on_file and output_dir:
+        watcher = asyncio.create_task(
+            watch_apple_output(get_apple_task_config_path(output_dir), on_file, watch_stop)
+        )
 
-        # Break loop if stdout is closed
-        if process.stdout.at_eof():
-            break
+    try:
+        # Process stdout line-by-line for real-time progress
+        stdout_lines = []
+        stage_set = False
+        while True:
+            # Check for cancellation first
+            if cancel_event and cancel_event.is_set():
+                try:
+                    process.terminate()
+                    await asyncio.wait_for(process.wait(), timeout=5)
+                except Exception:
+                    process.kill()
+                return {'success': False, 'error': 'Cancelled'}
 
-        try:
-            line_bytes = await process.stdout.readline()
-            if not line_bytes:
+            # Break loop if stdout is closed
+            if process.stdout.at_eof():
                 break
 
-            line_str = line_bytes.decode(errors='ignore').strip()
-            stdout_lines.append(line_str)
-            LOGGER.debug(f"Apple Downloader: {line_str}")
-
-            # Update progress based on the current line (simplified to per-track)
-            if progress:
-                try:
-                    # Look for X/Y total pattern (e.g., "1/10" or "Downloading 1/10")
-                    xy_match = re.search(r"(\d+)\s*/\s*(\d+)", line_str)
-                    if xy_match:
-                        done = int(xy_match.group(1))
-                        total = int(xy_match.group(2))
-
-                        if not stage_set:
-                            await progress.set_stage("Downloading")
-                            await progress.set_total_tracks(total)
-                            stage_set = True
+            try:
+                line_bytes = await process.stdout.readline()
+                if not line_bytes:
+                    break
 
-                        # Update progress based on number of tracks done
-                        await progress.update_download(tracks_done=done)
+                line_str = line_bytes.decode(errors='ignore').strip()
+                stdout_lines.append(line_str)
+                LOGGER.debug(f"Apple Downloader: {line_str}")
 
-                except Exception:
-                    pass # Ignore parsing errors
-            elif user and 'bot_msg' in user:
-                # Fallback for simple message update if progress reporter is not used
-                xy_match = re.search(r"(\d+)\s*/\s*(\d+)", line_str)
-                if xy_match:
+                # Update progress based on the current line (simplified to per-track)
+                if progress:
                     try:
-                        done = int(xy_match.group(1))
-                        total = int(xy_match.group(2))
-                        await edit_message(user['bot_msg'], f"Apple Music Download: {done}/{total}")
-                    except Exception:
-                        pass
-        except asyncio.CancelledError:
-            raise # Propagate cancellation
-        except Exception as e:
-            LOGGER.error(f"Error reading stdout line from downloader: {e}")
-            break # Exit loop on read error
+                        # Look for X/Y total pattern (e.g., "1/10" or "Downloading 1/10")
+                        xy_match = re.search(r"(\d+)\s*/\s*(\d+)", line_str)
+                        if xy_match:
+                            done = int(xy_match.group(1))
+                            total = int(xy_match.group(2))
 
-    # Wait for process to finish and get final exit code and stderr
-    await process.wait()
-    stderr_bytes = await process.stderr.read()
-    stderr = stderr_bytes.decode().strip()
+                            if not stage_set:
+                                await progress.set_stage("Downloading")
+                                await progress.set_total_tracks(total)
+                                stage_set = True
 
-    # Clear subprocess registration
-    try:
-        if task_id:
-            from bot.helpers.tasks import task_manager
-            await task_manager.clear_subprocess(task_id)
-    except Exception:
-        pass
+                            # Update progress based on number of tracks done
+                            await progress.update_download(tracks_done=done)
 
-    # Move to processing stage in UI
-    try:
-        if progress:
-            await progress.set_stage("Processing")
-    except Exception:
-        pass
+                    except Exception:
+                        pass # Ignore parsing errors
+                elif user and 'bot_msg' in user:
+                    # Fallback for simple message update if progress reporter is not used
+                    xy_match = re.search(r"(\d+)\s*/\s*(\d+)", line_str)
+                    if xy_match:
+                        try:
+                            done = int(xy_match.group(1))
+                            total = int(xy_match.group(2))
+                            await edit_message(user['bot_msg'], f"Apple Music Download: {done}/{total}")
+                        except Exception:
+                            pass
+            except asyncio.CancelledError:
+                raise # Propagate cancellation
+            except Exception as e:
+                LOGGER.error(f"Error reading stdout line from downloader: {e}")
+                break # Exit loop on read error
+
+        # Wait for process to finish and get final exit code and stderr
+        await process.wait()
+        stderr_bytes = await process.stderr.read()
+        stderr = stderr_bytes.decode().strip()
+
+        # Clear subprocess registration
+        try:
+            if task_id:
+                from bot.helpers.tasks import task_manager
+                await task_manager.clear_subprocess(task_id)
+        except Exception:
+            pass
 
-    # Check return code
-    if process.returncode != 0:
-        error_details = stderr or "\n".join(stdout_lines)
-        LOGGER.error(f"Apple downloader failed with code {process.returncode}: {error_details}")
-        return {'success': False, 'error': error_details}
+        # Move to processing stage in UI
+        try:
+            if progress:
+                await progress.set_stage("Processing")
+        except Exception:
+            pass
 
-    return {'success': True}
+        # Check return code
+        if process.returncode != 0:
+            error_details = stderr or "\n".join(stdout_lines)
+            LOGGER.error(f"Apple downloader failed with code {process.returncode}: {error_details}")
+            return {'success': False, 'error': error_details}
+
+        # Hand over the files the watcher was still holding back
+        if watcher:
+            watch_stop.set()
+            await watcher
+            watcher = None
+
+        return {'success': True}
+    finally:
+        if watcher:
+            watcher.cancel()
+            try:
+                await watcher
+            except (asyncio.CancelledError, Exception):
+                pass
 
 
-async def extract_audio_metadata(file_path: str) -> dict:
+def _read_audio_metadata(file_path: str) -> dict:
     """Extract metadata from audio files"""
     try:
         if file_path.endswith('.m4a'):
@@ -648,7 +645,7 @@ async def extract_audio_metadata(file_path: str) -> dict:
         return default_metadata(file_path)
 
 
-async def extract_video_metadata(file_path: str) -> dict:
+def _read_video_metadata(file_path: str) -> dict:
     """Extract metadata from video files"""
     try:
         if file_path.endswith(('.mp4', '.m4v', '.mov')):
@@ -668,7 +665,7 @@ async def extract_video_metadata(file_path: str) -> dict:
         return default_metadata(file_path)
 
 
-async def extract_apple_metadata(file_path: str) -> dict:
+def _read_apple_metadata(file_path: str) -> dict:
     """
     Extract metadata from Apple Music files (audio or video)
     Args:
@@ -678,9 +675,9 @@ async def extract_apple_metadata(file_path: str) -> dict:
     """
     try:
         if file_path.endswith('.m4a'):
-            return await extract_audio_metadata(file_path)
+            return _read_audio_metadata(file_path)
         elif file_path.endswith(('.mp4', '.m4v', '.mov')):
-            return await extract_video_metadata(file_path)
+            return _read_video_metadata(file_path)
         else:
             # Handle other file types with mutagen
             audio = mutagen.File(file_path)
@@ -708,19 +705,11 @@ def extract_cover_art(media, file_path):
     try:
         # Handle MP4 cover art
         if 'covr' in media:
-            cover_data = media['covr'][0]
-            cover_path = f"{os.path.splitext(file_path)[0]}.jpg"
-            with open(cover_path, 'wb') as f:
-                f.write(cover_data)
-            return cover_path
+            return _save_cover(bytes(media['covr'][0]), file_path)
         
         # Handle ID3 tags (MP3)
         elif hasattr(media, 'pictures') and media.pictures:
-            cover_data = media.pictures[0].data
-            cover_path = f"{os.path.splitext(file_path)[0]}.jpg"
-            with open(cover_path, 'wb') as f:
-                f.write(cover_data)
-            return cover_path
+            return _save_cover(media.pictures[0].data, file_path)
         
         # Handle FLAC/Vorbis comments
         elif 'metadata_block_picture' in media:
@@ -729,10 +718,7 @@ def extract_cover_art(media, file_path):
                     data = base64.b64decode(block)
                     pic = mutagen.flac.Picture(data)
                     if pic.type == 3:  # Front cover
-                        cover_path = f"{os.path.splitext(file_path)[0]}.jpg"
-                        with open(cover_path, 'wb') as f:
-                            f.write(pic.data)
-                        return cover_path
+                        return _save_cover(pic.data, file_path)
                 except:
                     continue
     except Exception as e:
@@ -740,6 +726,69 @@ def extract_cover_art(media, file_path):
     return None
 
 
+def _save_cover(data: bytes, file_path: str) -> str:
+    """
+    Write embedded artwork next to the media file, once per distinct image:
+    tracks of an album share one cover_<hash>.jpg. Release it with
+    release_cover() when a track is done with it.
+    """
+    digest = hashlib.sha1(data).hexdigest()[:16]
+    cover_path = os.path.join(os.path.dirname(file_path), f"cover_{digest}.jpg")
+    with _cover_lock:
+        if not os.path.exists(cover_path):
+            tmp_path = f"{cover_path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, cover_path)
+            _cover_refs[cover_path] = 0
+            if len(_cover_refs) > 1000:
+                # covers removed along with their folder (zips, cleanup) were never released
+                for path in [p for p in _cover_refs if not os.path.exists(p)]:
+                    del _cover_refs[path]
+        _cover_refs[cover_path] = _cover_refs.get(cover_path, 0) + 1
+    return cover_path
+
+
+def release_cover(path: str):
+    """Delete a thumbnail once no other track still needs it."""
+    with _cover_lock:
+        refs = _cover_refs.get(path)
+        if refs is not None:
+            if refs > 1:
+                _cover_refs[path] = refs - 1
+                return
+            del _cover_refs[path]
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def extract_audio_metadata(file_path: str) -> dict:
+    """Extract metadata from audio files (in the metadata thread pool)"""
+    return await asyncio.get_running_loop().run_in_executor(metadata_executor, _read_audio_metadata, file_path)
+
+
+async def extract_video_metadata(file_path: str) -> dict:
+    """Extract metadata from video files (in the metadata thread pool)"""
+    return await asyncio.get_running_loop().run_in_executor(metadata_executor, _read_video_metadata, file_path)
+
+
+async def extract_apple_metadata(file_path: str) -> dict:
+    """Extract metadata from Apple Music files (in the metadata thread pool)"""
+    return await asyncio.get_running_loop().run_in_executor(metadata_executor, _read_apple_metadata, file_path)
+
+
+async def extract_metadata_batch(files: list, extractor) -> list:
+    """
+    Run an extract_*_metadata function over many files at once, at most
+    METADATA_WORKERS at a time.
+    Returns:
+        list: metadata dict, or the exception raised, for each file in order
+    """
+    return await asyncio.gather(*(extractor(file_path) for file_path in files), return_exceptions=True)
+
+
 def default_metadata(file_path):
     """Return default metadata when extraction fails"""
     return {
@@ -780,15 +829,15 @@ def get_readable_time(seconds: int):
     return result or "0s"
 
 
-async def create_apple_zip(directory: str, user_id: int, metadata: dict, progress: Optional[ProgressReporter] = None, cancel_event: asyncio.Event | None = None) -> str:
+def get_apple_zip_path(directory: str, metadata: dict) -> str:
     """
-    Create zip file with descriptive name for downloads
+    Descriptive, unique zip path next to the content directory,
+    e.g. "[Apple Music] Album Name (Playlist).zip"
     Args:
         directory: Path to the content directory
-        user_id: Telegram user ID
         metadata: Content metadata dictionary
     Returns:
-        Path to the created zip file
+        Path for the zip file (not created)
     """
     # Determine content type and name
     content_type = metadata.get('type', 'album').capitalize()
@@ -828,85 +877,55 @@ async def create_apple_zip(directory: str, user_id: int, metadata: dict, progres
         zip_path = os.path.join(zip_dir, f"{zip_name}_{counter}.zip")
         counter += 1
     
-    # Initialize progress
-    if progress:
-        await progress.set_stage("Zipping")
-    
-    # Count total files to zip
-    total_files = 0
-    for root, _, files in os.walk(directory):
-        total_files += len(files)
-    if progress and total_files:
-        await progress.update_zip(0, total_files)
-    
-    # Create the zip file
-    done_files = 0
-    cancelled = False
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if cancel_event and cancel_event.is_set():
-                    cancelled = True
-                    break
-                file_path = os.path.join(root, file)
-                arcname = os.path.relpath(file_path, directory)
-                zipf.write(file_path, arcname)
-                done_files += 1
-                if progress:
-                    await progress.update_zip(done_files, total_files)
-            if cancelled:
-                break
-    if cancelled:
-        try:
-            if os.path.exists(zip_path):
-                os.remove(zip_path)
-        except Exception:
-            pass
-        raise asyncio.CancelledError()
-    
-    LOGGER.info(f"Created descriptive zip: {zip_path}")
     return zip_path
 
 
 def _read_apple_config_paths(config_path: str | None = None) -> dict:
-    """Read $HOME/amalac/config.yaml and return paths for alac/atmos/aac.
+    """Read $HOME/amalac/config.yaml and return paths for alac/atmos/aac
+    (plus any other *-save-folder keys, e.g. mv).
     Falls back to standard Apple Music directories under $HOME if not found.
+    A per-task config_path that does not exist gives no paths: the global
+    folders are shared by every running task.
     """
     try:
+        if config_path and not os.path.exists(config_path):
+            return {}
         home_dir = os.path.expanduser("~")
         cfg_path = config_path or os.path.join(home_dir, "amalac", "config.yaml")
-        alac_dir = os.path.join(home_dir, "Music", "Apple Music", "alac")
-        atmos_dir = os.path.join(home_dir, "Music", "Apple Music", "atmos")
-        aac_dir = os.path.join(home_dir, "Music", "Apple Music", "aac")
+        paths = {
+            'alac': os.path.join(home_dir, "Music", "Apple Music", "alac"),
+            'atmos': os.path.join(home_dir, "Music", "Apple Music", "atmos"),
+            'aac': os.path.join(home_dir, "Music", "Apple Music", "aac"),
+        }
         if os.path.exists(cfg_path):
             with open(cfg_path, 'r', encoding='utf-8', errors='ignore') as f:
                 for line in f:
                     line = line.strip()
-                    if not line or line.startswith('#'):
+                    if not line or line.startswith('#') or ':' not in line:
                         continue
-                    if line.lower().startswith('alac-save-folder:'):
-                        alac_dir = line.split(':', 1)[1].strip()
-                    elif line.lower().startswith('atmos-save-folder:'):
-                        atmos_dir = line.split(':', 1)[1].strip()
-                    elif line.lower().startswith('aac-save-folder:'):
-                        aac_dir = line.split(':', 1)[1].strip()
-        return {
-            'alac': os.path.expanduser(alac_dir),
-            'atmos': os.path.expanduser(atmos_dir),
-            'aac': os.path.expanduser(aac_dir),
-        }
+                    key, value = line.split(':', 1)
+                    key = key.strip().lower()
+                    if key.endswith('-save-folder'):
+                        paths[key[:-len('-save-folder')]] = value.strip().strip('"\'')
+        return {key: os.path.expanduser(path) for key, path in paths.items()}
     except Exception as e:
         LOGGER.error(f"Failed to read Apple config paths: {str(e)}")
         return {}
 
 
-def list_apple_output_files(extensions: tuple[str, ...] | None = None) -> list[str]:
-    """List files from global Apple Music output directories defined in config.yaml."""
+def get_apple_task_config_path(task_root: str) -> str:
+    """Path of the per-task config.yaml written by prepare_apple_task_config."""
+    return os.path.join(task_root, APPLE_RUN_DIR_NAME, 'config.yaml')
+
+
+def list_apple_output_files(extensions: tuple[str, ...] | None = None, config_path: str | None = None) -> list[str]:
+    """List files from the Apple Music output directories defined in config.yaml.
+    Pass a per-task config_path to scope the listing to that task's folders.
+    """
     exts = extensions or ('.m4a', '.flac', '.alac', '.mp4', '.m4v', '.mov')
-    paths = _read_apple_config_paths()
+    paths = _read_apple_config_paths(config_path)
     files: list[str] = []
-    for key in ('alac', 'atmos', 'aac'):
-        base = paths.get(key)
+    for base in dict.fromkeys(paths.values()):
         if not base:
             continue
         for root, _, filenames in os.walk(base):
@@ -916,12 +935,66 @@ def list_apple_output_files(extensions: tuple[str, ...] | None = None) -> list[s
     return files
 
 
-def cleanup_apple_global():
-    """Delete contents inside the alac/atmos/aac folders from the global Apple Music directory."""
+APPLE_WATCH_INTERVAL = 2  # seconds between scans of the output folders
+
+
+def _stat_apple_output(config_path: str | None = None) -> dict:
+    """Return {path: (size, mtime_ns)} for the media files currently in the Apple output folders."""
+    stats = {}
+    for path in list_apple_output_files(config_path=config_path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        stats[path] = (st.st_size, st.st_mtime_ns)
+    return stats
+
+
+async def watch_apple_output(config_path: str, on_file, stop: asyncio.Event):
+    """
+    Hand each media file to on_file as soon as the Apple downloader is done with it.
+    The downloader works through tracks one after another, so a file is done
+    once a later file has been started and its size and mtime did not change
+    since the previous scan. Whatever is left is handed over after stop is
+    set (downloader exited).
+    Args:
+        config_path: Per-task config.yaml of the running downloader
+        on_file: async function called with each finished file path, in download order
+        stop: Set once the downloader process has exited
+    """
+    order = {}  # path -> order first seen
+    last = {}
+    sent = set()
+    while True:
+        final = stop.is_set()
+        stats = await asyncio.to_thread(_stat_apple_output, config_path)
+        for path in sorted(stats, key=lambda p: stats[p][1]):
+            order.setdefault(path, len(order))
+        pending = sorted((p for p in stats if p not in sent), key=order.get)
+        newest = max((order[p] for p in stats), default=-1)
+        for path in pending:
+            if not final and (order[path] == newest or last.get(path) != stats[path]):
+                break  # keep download order: later files wait for this one
+            sent.add(path)
+            await on_file(path)
+        last = stats
+        if final:
+            return
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=APPLE_WATCH_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+def cleanup_apple_global(config_path: str | None = None):
+    """Delete contents inside the alac/atmos/aac folders from the Apple Music directory.
+    Pass a per-task config_path to only clean that task's folders.
+    """
     try:
-        paths = _read_apple_config_paths()
-        for key in ('alac', 'atmos', 'aac'):
-            folder = paths.get(key)
+        paths = _read_apple_config_paths(config_path)
+        if not paths:
+            return
+        for folder in dict.fromkeys(paths.values()):
             if not folder or not os.path.isdir(folder):
                 continue
             for entry in os.listdir(folder):
@@ -49,6 +49,11 @@ class Logger:
     def info(self, message, *args, **kwargs):
         self.logger.info(message, *args, **kwargs)
 
+    def warning(self, message, *args, **kwargs):
+        caller_frame = inspect.currentframe().f_back
+        caller_filename = os.path.basename(caller_frame.f_globals['__file__'])
+        self.logger.warning(f'{caller_filename} - {message}', *args, **kwargs)
+
     def error(self, message, *args, **kwargs):
         caller_frame = inspect.currentframe().f_back
         caller_filename = os.path.basename(caller_frame.f_globals['__file__'])
@@ -1,4 +1,5 @@
 import asyncio
+import functools
 from pyrogram.types import Message, InlineKeyboardButton, InlineKeyboardMarkup
 from pyrogram import Client, filters
 
@@ -14,7 +15,7 @@ from ..helpers.tidal_ng.handler import start_tidal_ng
 from ..helpers.deezer.handler import start_deezer
 from ..providers.apple import start_apple
 # IMPORT EDIT_MESSAGE HERE:
-from ..helpers.message import send_message, antiSpam, check_user, fetch_user_details, edit_message
+from ..helpers.message import send_message, antiSpam, check_user, fetch_user_details, edit_message, user_details
 from ..helpers.state import conversation_state
 
 
@@ -85,31 +86,13 @@ async def download_track(c, msg: Message):
             # If queue mode is ON, enqueue the job to run one-by-one
             if getattr(bot_set, 'queue_mode', False):
                 # Build a small function that will create its own task state when executed
-                async def _job():
-                    state = await task_manager.create(user, label="Download")
-                    u = dict(user)
-                    u['task_id'] = state.task_id
-                    u['cancel_event'] = state.cancel_event
-                    u['bot_msg'] = await send_message(msg, f"Starting download…\nUse /cancel <code>{state.task_id}</code> to stop.")
-                    await send_message(u, f"Task ID:\n<code>{state.task_id}</code>")
-                    try:
-                        await start_link(link, u, options)
-                        await send_message(u, lang.s.TASK_COMPLETED)
-                    except asyncio.CancelledError:
-                        await send_message(u, "⏹️ Task cancelled")
-                    except Exception as e:
-                        LOGGER.error(f"Download failed: {e}")
-                        error_msg = f"Download failed: {str(e)}"
-                        await send_message(u, error_msg)
-                    try:
-                        await c.delete_messages(msg.chat.id, u['bot_msg'].id)
-                    except Exception:
-                        pass
-                    await cleanup(u)
-                    await task_manager.finish(state.task_id, status="cancelled" if state.cancel_event.is_set() else "done")
-                    await antiSpam(msg.from_user.id, msg.chat.id, True)
-
-                qid, pos = await task_manager.enqueue(user['user_id'], link, options, _job)
+                qid = task_manager.new_queue_id()
+                job = functools.partial(run_queued_job, c, user, link, options, status_reply_id=msg.id, qid=qid)
+                priority = _pop_priority(options, msg.from_user.id)
+                qid, pos = await task_manager.enqueue(
+                    user['user_id'], link, options, job, priority=priority,
+                    context=_queue_context(user, msg.id), qid=qid
+                )
                 await send_message(user, f"✅ Added to queue. ID: <code>{qid}</code>\nPosition: {pos}")
                 return
 
@@ -159,15 +142,159 @@ def parse_options(parts: list) -> dict:
     return options
 
 
+async def run_queued_job(c, user: dict, link: str, options: dict, status_reply_id: int, qid: str | None = None, task_id: str | None = None, stage: str | None = None):
+    """
+    Body of a queued download; also used to resume persisted jobs after a restart.
+    Persisted jobs record a checkpoint as each stage completes
+
+    Args:
+        c: Pyrogram client
+        user: User details dictionary (JSON-safe fields only)
+        link: URL to download
+        options: Command-line options passed by user
+        status_reply_id: Message the status message replies to
+        qid: Queue ID of the persisted job
+        task_id: Task ID to reuse when resuming an interrupted job
+        stage: Last checkpoint the interrupted job had reached, if any
+    """
+    from bot.helpers.tasks import task_manager, reached_stage, STAGE_DOWNLOADING, STAGE_UPLOADED
+    state = await task_manager.create(user, label="Download", task_id=task_id)
+    if qid:
+        await task_manager.set_job_stage(qid, stage=stage or STAGE_DOWNLOADING, task_id=state.task_id)
+    u = dict(user)
+    u['task_id'] = state.task_id
+    u['cancel_event'] = state.cancel_event
+    u['qid'] = qid
+    u['resume_stage'] = stage
+    u['bot_msg'] = await send_message(dict(user, r_id=status_reply_id), f"Starting download…\nUse /cancel <code>{state.task_id}</code> to stop.")
+    await send_message(u, f"Task ID:\n<code>{state.task_id}</code>")
+    try:
+        # Delivered before the restart, only the cleanup below was left
+        if not reached_stage(u, STAGE_UPLOADED):
+            await start_link(link, u, options)
+            if not state.cancel_event.is_set():
+                await task_manager.checkpoint(u, STAGE_UPLOADED)
+        await send_message(u, lang.s.TASK_COMPLETED)
+    except asyncio.CancelledError:
+        await send_message(u, "⏹️ Task cancelled")
+    except Exception as e:
+        LOGGER.error(f"Download failed: {e}")
+        error_msg = f"Download failed: {str(e)}"
+        await send_message(u, error_msg)
+    try:
+        await c.delete_messages(u['chat_id'], u['bot_msg'].id)
+    except Exception:
+        pass
+    await cleanup(u)
+    await task_manager.finish(state.task_id, status="cancelled" if state.cancel_event.is_set() else "done")
+    await antiSpam(u['user_id'], u['chat_id'], True)
+
+
+def _queue_context(user: dict, status_reply_id: int) -> dict:
+    """JSON-safe snapshot of the user details needed to rebuild a queued job."""
+    context = {key: user.get(key) for key in ('user_id', 'name', 'user_name', 'r_id', 'chat_id', 'provider', 'link')}
+    context['status_reply_id'] = status_reply_id
+    return context
+
+
+async def restore_queue(c):
+    """
+    Re-enqueue jobs persisted by a previous run. Jobs that were in flight
+    keep their task ID and resume after their last checkpoint: a job that
+    had downloaded everything goes straight to the upload, one that had
+    uploaded only cleans up, anything else starts over.
+    """
+    from bot.helpers.tasks import task_manager, STAGE_DOWNLOADED, STAGE_UPLOADED
+    jobs = await task_manager.load_persisted_jobs()
+    # In-flight jobs go first so they resume before untouched queued ones
+    jobs.sort(key=lambda j: j.get('status') != 'running')
+    for job in jobs:
+        context = dict(job.get('context') or {})
+        status_reply_id = context.pop('status_reply_id', None) or context.get('r_id')
+        user = dict(user_details, **context)
+        resumed = job.get('status') == 'running'
+        factory = functools.partial(
+            run_queued_job, c, user, job['link'], job.get('options') or {},
+            status_reply_id=status_reply_id, qid=job['qid'],
+            task_id=job.get('task_id') if resumed else None,
+            stage=job.get('stage') if resumed else None
+        )
+        await task_manager.enqueue(
+            user['user_id'], job['link'], job.get('options') or {}, factory,
+            priority=job.get('priority') or 0, context=context, qid=job['qid'], restored=True
+        )
+        if resumed:
+            if job.get('stage') == STAGE_UPLOADED:
+                note = "was already delivered, finishing up"
+            elif job.get('stage') == STAGE_DOWNLOADED:
+                note = "will continue with the upload"
+            else:
+                note = "will start over"
+            await send_message(user, f"♻️ Bot restarted, your interrupted download <code>{job['qid']}</code> {note}.")
+    if jobs:
+        LOGGER.info(f"Queue: restored {len(jobs)} persisted job(s)")
+
+
+def _pop_priority(options: dict, user_id: int) -> int:
+    """Remove --priority from options; only admins may raise queue priority."""
+    raw = options.pop('priority', None) if options else None
+    from bot.settings import bot_set
+    if raw is None or user_id not in bot_set.admins:
+        return 0
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        return 0
+
+
 async def start_link(link: str, user: dict, options: dict = None):
     """
-    Route download request to appropriate provider handler
+    Route download request to appropriate provider handler, answering
+    repeat requests from the Telegram file cache when possible. Identical
+    requests running at the same time share one download: the first one
+    downloads and uploads, the others get its files re-sent to their chat.
     
     Args:
         link: URL to download
         user: User details dictionary
         options: Command-line options passed by user
     """
+    from bot.settings import bot_set
+    from ..helpers.file_cache import file_cache
+    from ..helpers.single_flight import single_flight
+    # Sharing goes through Telegram file_ids, other upload modes download on their own
+    key = file_cache.key(link, options) if bot_set.upload_mode == 'Telegram' else None
+    if not key:
+        return await _route_link(link, user, options)
+
+    if await file_cache.resend(link, user, options):
+        LOGGER.info(f"File cache hit for {link}")
+        return None
+
+    flight, leader = single_flight.join(key)
+    if not leader:
+        await edit_message(user['bot_msg'], "Same link is already being downloaded for another request, waiting for it…")
+        files = await flight.wait()
+        if files and await file_cache.send_files(user, files):
+            return None
+        # The other download failed or its files could not be re-sent, try again
+        return await start_link(link, user, options)
+
+    user['sent_files'] = []
+    files = None
+    try:
+        result = await _route_link(link, user, options)
+        cancel_event = user.get('cancel_event')
+        # Partial results (failed tracks or uploads) are neither cached nor shared
+        if not (cancel_event and cancel_event.is_set()) and not user.get('incomplete'):
+            files = user['sent_files']
+            await file_cache.store(link, options, files)
+        return result
+    finally:
+        single_flight.finish(key, flight, files)
+
+
+async def _route_link(link: str, user: dict, options: dict = None):
     tidal = ["https://tidal.com", "https://listen.tidal.com", "tidal.com", "listen.tidal.com"]
     deezer = ["https://link.deezer.com", "https://deezer.com", "deezer.com", "https://www.deezer.com", "link.deezer.com"]
     qobuz = ["https://play.qobuz.com", "https://open.qobuz.com", "https://www.qobuz.com"]
@@ -242,30 +369,13 @@ async def apple_flag_select_cb(c, cb):
         from bot.helpers.tasks import task_manager
         from bot.settings import bot_set
         if getattr(bot_set, 'queue_mode', False):
-            async def _job():
-                state = await task_manager.create(user, label="Download")
-                u = dict(user)
-                u['task_id'] = state.task_id
-                u['cancel_event'] = state.cancel_event
-                u['bot_msg'] = await send_message(cb.message, f"Starting download…\nUse /cancel <code>{state.task_id}</code> to stop.")
-                await send_message(u, f"Task ID:\n<code>{state.task_id}</code>")
-                try:
-                    await start_link(link, u, options)
-                    await send_message(u, lang.s.TASK_COMPLETED)
-                except asyncio.CancelledError:
-                    await send_message(u, "⏹️ Task cancelled")
-                except Exception as e:
-                    LOGGER.error(f"Download failed: {e}")
-                    await send_message(u, f"Download failed: {str(e)}")
-                try:
-                    await c.delete_messages(cb.message.chat.id, u['bot_msg'].id)
-                except Exception:
-                    pass
-                await cleanup(u)
-                await task_manager.finish(state.task_id, status="cancelled" if state.cancel_event.is_set() else "done")
-                await antiSpam(cb.from_user.id, cb.message.chat.id, True)
-
-            qid, pos = await task_manager.enqueue(user['user_id'], link, options, _job)
+            qid = task_manager.new_queue_id()
+            job = functools.partial(run_queued_job, c, user, link, options, status_reply_id=cb.message.id, qid=qid)
+            priority = _pop_priority(options, cb.from_user.id)
+            qid, pos = await task_manager.enqueue(
+                user['user_id'], link, options, job, priority=priority,
+                context=_queue_context(user, cb.message.id), qid=qid
+            )
             await send_message(cb.message, f"✅ Added to queue. ID: <code>{qid}</code>\nPosition: {pos}")
             return
 
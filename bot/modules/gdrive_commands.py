@@ -7,7 +7,7 @@ from pyrogram.types import Message
 from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
 from .. import bot_loop, task_dict, task_dict_lock
-from ..helpers.database.pg_impl import user_set_db
+from ..helpers.database.pg_impl import async_user_set_db
 from ..helpers.message import send_message, edit_message, delete_message
 from ..helpers.uploader_utils.ext.bot_utils import sync_to_async
 from ..helpers.uploader_utils.ext.links_utils import is_gdrive_link
@@ -232,7 +232,7 @@ async def gdrive_search_callback(client: Client, callback_query):
 
     await message.edit(f"Searching for '{search_key}' in {search_type}...")
 
-    gdrive_id, _ = await user_set_db.get_user_setting(user_id, 'gdrive_id')
+    gdrive_id, _ = await async_user_set_db.get_user_setting(user_id, 'gdrive_id')
     if not gdrive_id:
         gdrive_id = Config.GDRIVE_ID or "root"
 
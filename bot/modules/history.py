@@ -1,12 +1,12 @@
 # bot/modules/history.py
 from pyrogram import Client, filters
-from bot.helpers.database.pg_impl import download_history
+from bot.helpers.database.pg_impl import async_download_history
 from bot.helpers.message import send_message
 
 @Client.on_message(filters.command(["history", "downloads"]))
 async def download_history_handler(client, message):
     user_id = message.from_user.id
-    history = download_history.get_user_history(user_id)
+    history = await async_download_history.get_user_history(user_id)
     
     if not history:
         await send_message(message, "You haven't downloaded anything yet!")
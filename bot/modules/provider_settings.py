@@ -8,7 +8,7 @@ from config import Config
 
 from ..settings import bot_set
 from ..helpers.buttons.settings import *
-from ..helpers.database.pg_impl import set_db, user_set_db
+from ..helpers.database.pg_impl import async_set_db, user_set_db
 from ..helpers.tidal.tidal_api import tidalapi
 
 from ..helpers.message import edit_message, check_user
@@ -350,9 +350,8 @@ async def apple_cb(c, cb: CallbackQuery):
 async def apple_format_cb(c, cb: CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
         format_type = cb.data.split('_')[1]
-        # Update configuration
-        set_db.set_variable('APPLE_DEFAULT_FORMAT', format_type)
-        Config.APPLE_DEFAULT_FORMAT = format_type
+        # Update configuration (Config and bot_set.apple follow)
+        await async_set_db.set_variable('APPLE_DEFAULT_FORMAT', format_type)
         await apple_cb(c, cb)
 
 
@@ -388,9 +387,8 @@ async def apple_quality_cb(c, cb: CallbackQuery):
 async def apple_set_quality_cb(c, cb: CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
         _, format_type, quality = cb.data.split('_')
-        # Update configuration
-        set_db.set_variable(f'APPLE_{format_type.upper()}_QUALITY', quality)
-        setattr(Config, f'APPLE_{format_type.upper()}_QUALITY', quality)
+        # Update configuration (Config and bot_set.apple follow)
+        await async_set_db.set_variable(f'APPLE_{format_type.upper()}_QUALITY', quality)
         await apple_quality_cb(c, cb)
 
 
@@ -399,9 +397,8 @@ async def apple_toggle_zip_album(c: Client, cb: CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
         try:
             from ..settings import bot_set
-            from ..helpers.database.pg_impl import set_db
-            bot_set.apple_album_zip = not bool(getattr(bot_set, 'apple_album_zip', False))
-            set_db.set_variable('APPLE_ALBUM_ZIP', bot_set.apple_album_zip)
+            from ..helpers.database.pg_impl import async_set_db
+            await async_set_db.set_variable('APPLE_ALBUM_ZIP', not bool(getattr(bot_set, 'apple_album_zip', False)))
         except Exception:
             pass
         await apple_cb(c, cb)
@@ -412,9 +409,8 @@ async def apple_toggle_zip_playlist(c: Client, cb: CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
         try:
             from ..settings import bot_set
-            from ..helpers.database.pg_impl import set_db
-            bot_set.apple_playlist_zip = not bool(getattr(bot_set, 'apple_playlist_zip', False))
-            set_db.set_variable('APPLE_PLAYLIST_ZIP', bot_set.apple_playlist_zip)
+            from ..helpers.database.pg_impl import async_set_db
+            await async_set_db.set_variable('APPLE_PLAYLIST_ZIP', not bool(getattr(bot_set, 'apple_playlist_zip', False)))
         except Exception:
             pass
         await apple_cb(c, cb)
@@ -469,9 +465,8 @@ async def apple_toggle_flags_popup(c: Client, cb: CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
         try:
             from ..settings import bot_set
-            from ..helpers.database.pg_impl import set_db
-            bot_set.apple_flags_popup = not bool(getattr(bot_set, 'apple_flags_popup', False))
-            set_db.set_variable('APPLE_FLAGS_POPUP', bot_set.apple_flags_popup)
+            from ..helpers.database.pg_impl import async_set_db
+            await async_set_db.set_variable('APPLE_FLAGS_POPUP', not bool(getattr(bot_set, 'apple_flags_popup', False)))
         except Exception:
             pass
         await apple_cb(c, cb)
@@ -482,9 +477,8 @@ async def apple_toggle_preset_guard(c: Client, cb: CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
         try:
             from ..settings import bot_set
-            from ..helpers.database.pg_impl import set_db
-            bot_set.apple_cycle_presets_enabled = not bool(getattr(bot_set, 'apple_cycle_presets_enabled', True))
-            set_db.set_variable('APPLE_CYCLE_PRESETS_ENABLED', bot_set.apple_cycle_presets_enabled)
+            from ..helpers.database.pg_impl import async_set_db
+            await async_set_db.set_variable('APPLE_CYCLE_PRESETS_ENABLED', not bool(getattr(bot_set, 'apple_cycle_presets_enabled', True)))
         except Exception:
             pass
         await apple_cb(c, cb)
@@ -941,8 +935,8 @@ async def qobuz_quality_cb(c, cb: CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
         qobuz = {5: 'MP3 320', 6: 'Lossless', 7: '24B<=96KHZ', 27: '24B>96KHZ'}
         to_set = cb.data.split('_')[1]
-        bot_set.qobuz.quality = list(filter(lambda x: qobuz[x] == to_set, qobuz))[0]
-        set_db.set_variable('QOBUZ_QUALITY', bot_set.qobuz.quality)
+        quality = list(filter(lambda x: qobuz[x] == to_set, qobuz))[0]
+        await async_set_db.set_variable('QOBUZ_QUALITY', quality)
         await qobuz_cb(c, cb)
 
 
@@ -1016,13 +1010,11 @@ async def tidal_set_quality_cb(c, cb: CallbackQuery):
                 current = 0
 
             nexti = (current + 1) % 4
-            tidalapi.spatial = options[nexti]
-            set_db.set_variable('TIDAL_SPATIAL', options[nexti])
+            await async_set_db.set_variable('TIDAL_SPATIAL', options[nexti])
         else:
             qualities = {'LOW': 'LOW', 'HIGH': 'HIGH', 'LOSSLESS': 'LOSSLESS', 'HI_RES': 'MAX'}
             to_set = list(filter(lambda x: qualities[x] == to_set, qualities))[0]
-            tidalapi.quality = to_set
-            set_db.set_variable('TIDAL_QUALITY', to_set)
+            await async_set_db.set_variable('TIDAL_QUALITY', to_set)
 
         await tidal_quality_cb(c, cb)
 
@@ -1087,7 +1079,7 @@ async def tidal_login_cb(c: Client, cb: CallbackQuery):
 @Client.on_callback_query(filters.regex(pattern=r"^tdRemove"))
 async def tidal_remove_login_cb(c: Client, cb: CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
-        set_db.set_variable("TIDAL_AUTH_DATA", 0, True, None)
+        await async_set_db.set_variable("TIDAL_AUTH_DATA", 0, True, None)
 
         tidalapi.tv_session = None
         tidalapi.mobile_atmos = None
@@ -1617,9 +1609,8 @@ async def tidal_ng_toggle_zip_album(c, cb: CallbackQuery):
         return
     try:
         from ..settings import bot_set
-        from ..helpers.database.pg_impl import set_db
-        bot_set.tidal_ng_album_zip = not bool(getattr(bot_set, 'tidal_ng_album_zip', False))
-        set_db.set_variable('TIDAL_NG_ALBUM_ZIP', bot_set.tidal_ng_album_zip)
+        from ..helpers.database.pg_impl import async_set_db
+        await async_set_db.set_variable('TIDAL_NG_ALBUM_ZIP', not bool(getattr(bot_set, 'tidal_ng_album_zip', False)))
     except Exception:
         pass
     await tidal_ng_cb(c, cb)
@@ -1631,9 +1622,8 @@ async def tidal_ng_toggle_zip_playlist(c, cb: CallbackQuery):
         return
     try:
         from ..settings import bot_set
-        from ..helpers.database.pg_impl import set_db
-        bot_set.tidal_ng_playlist_zip = not bool(getattr(bot_set, 'tidal_ng_playlist_zip', False))
-        set_db.set_variable('TIDAL_NG_PLAYLIST_ZIP', bot_set.tidal_ng_playlist_zip)
+        from ..helpers.database.pg_impl import async_set_db
+        await async_set_db.set_variable('TIDAL_NG_PLAYLIST_ZIP', not bool(getattr(bot_set, 'tidal_ng_playlist_zip', False)))
     except Exception:
         pass
     await tidal_ng_cb(c, cb)
@@ -1642,9 +1632,8 @@ async def tidal_ng_toggle_preset_guard(c, cb: CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
         try:
             from ..settings import bot_set
-            from ..helpers.database.pg_impl import set_db
-            bot_set.tidal_ng_cycle_presets_enabled = not bool(getattr(bot_set, 'tidal_ng_cycle_presets_enabled', True))
-            set_db.set_variable('TIDAL_NG_CYCLE_PRESETS_ENABLED', bot_set.tidal_ng_cycle_presets_enabled)
+            from ..helpers.database.pg_impl import async_set_db
+            await async_set_db.set_variable('TIDAL_NG_CYCLE_PRESETS_ENABLED', not bool(getattr(bot_set, 'tidal_ng_cycle_presets_enabled', True)))
         except Exception:
             pass
         await tidal_ng_cb(c, cb)
@@ -3,12 +3,12 @@ from pyrogram import Client, filters
 from pyrogram.types import CallbackQuery, Message, InlineKeyboardButton, InlineKeyboardMarkup
 
 import bot.helpers.translations as lang
-import asyncio
 
 from ..settings import bot_set
 from ..helpers.buttons.settings import *
-from ..helpers.database.pg_impl import set_db
+from ..helpers.database.pg_impl import async_set_db
 from ..helpers.message import send_message, edit_message, check_user, fetch_user_details
+from ..helpers import rclone_rc
 from ..helpers.state import conversation_state
 from ..helpers.state import conversation_state as cs
 
@@ -68,6 +68,7 @@ async def handle_rclone_conf_upload(client, message: Message):
         if os.path.exists('rclone.conf'):
             os.remove('rclone.conf')
         os.replace(temp_path, 'rclone.conf')
+        await rclone_rc.reload_config()
         _import_waiting.discard(user_id)
         await send_message(message, "✅ rclone.conf imported successfully.")
     except Exception:
@@ -83,6 +84,7 @@ async def rclone_delete_cb(client, cb:CallbackQuery):
         try:
             if os.path.exists('rclone.conf'):
                 os.remove('rclone.conf')
+                await rclone_rc.reload_config()
             # Refresh panel regardless
             await rclone_panel_cb(client, cb)
         except Exception:
@@ -91,23 +93,15 @@ async def rclone_delete_cb(client, cb:CallbackQuery):
 @Client.on_callback_query(filters.regex(pattern=r"^rcloneListRemotes"))
 async def rclone_list_remotes_cb(client, cb:CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
-        import asyncio
         import os
         if not os.path.exists('rclone.conf'):
             return await edit_message(cb.message, "rclone.conf not found.", markup=rclone_buttons())
         # Run rclone listremotes using our config
         try:
-            proc = await asyncio.create_subprocess_shell(
-                'rclone listremotes --config ./rclone.conf | cat',
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            out, err = await proc.communicate()
-            if proc.returncode == 0:
-                remotes = out.decode().strip() or "(no remotes)"
-                await edit_message(cb.message, f"Available remotes:\n<code>{remotes}</code>", markup=rclone_buttons())
-            else:
-                await edit_message(cb.message, f"Failed to list remotes:\n<code>{err.decode().strip()}</code>", markup=rclone_buttons())
+            remotes = "\n".join(f"{r}:" for r in await rclone_rc.list_remotes()) or "(no remotes)"
+            await edit_message(cb.message, f"Available remotes:\n<code>{remotes}</code>", markup=rclone_buttons())
+        except rclone_rc.RcloneError as e:
+            await edit_message(cb.message, f"Failed to list remotes:\n<code>{e}</code>", markup=rclone_buttons())
         except Exception as e:
             await edit_message(cb.message, f"Error: {e}", markup=rclone_buttons())
 
@@ -126,19 +120,14 @@ async def rclone_send_cb(client, cb:CallbackQuery):
 @Client.on_callback_query(filters.regex(pattern=r"^rcloneSelectRemote"))
 async def rclone_select_remote_cb(client, cb:CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
-        import asyncio, os
+        import os
         if not os.path.exists('rclone.conf'):
             return await edit_message(cb.message, "rclone.conf not found.", markup=rclone_buttons())
         try:
-            proc = await asyncio.create_subprocess_shell(
-                'rclone listremotes --config ./rclone.conf | cat',
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            out, err = await proc.communicate()
-            if proc.returncode != 0:
-                return await edit_message(cb.message, f"Failed to list remotes:\n<code>{err.decode().strip()}</code>", markup=rclone_buttons())
-            remotes = [r.strip(':') for r in out.decode().splitlines() if r.strip()]
+            try:
+                remotes = await rclone_rc.list_remotes()
+            except rclone_rc.RcloneError as e:
+                return await edit_message(cb.message, f"Failed to list remotes:\n<code>{e}</code>", markup=rclone_buttons())
             if not remotes:
                 return await edit_message(cb.message, "No remotes configured.", markup=rclone_buttons())
             # Build buttons for each remote
@@ -157,13 +146,14 @@ async def rclone_apply_remote_cb(client, cb:CallbackQuery):
             remote = cb.data.split('|', 1)[1]
             # Preserve current path
             suffix = getattr(bot_set, 'rclone_dest_path', '')
-            bot_set.rclone_remote = remote
-            if bot_set.rclone_remote:
-                bot_set.rclone_dest = f"{bot_set.rclone_remote}:{suffix}" if suffix else f"{bot_set.rclone_remote}:"
+            if remote:
+                dest = f"{remote}:{suffix}" if suffix else f"{remote}:"
             else:
-                bot_set.rclone_dest = ''
-            set_db.set_variable('RCLONE_REMOTE', bot_set.rclone_remote)
-            set_db.set_variable('RCLONE_DEST', bot_set.rclone_dest)
+                dest = ''
+            await async_set_db.set_variables([
+                ('RCLONE_REMOTE', remote, False, None),
+                ('RCLONE_DEST', dest, False, None),
+            ])
             await rclone_panel_cb(client, cb)
         except Exception:
             await edit_message(cb.message, "❌ Failed to set remote", markup=rclone_buttons())
@@ -196,17 +186,17 @@ async def handle_dest_path_text(client, message: Message):
             return
         raw = (message.text or '').strip()
         text = raw.strip('/')
-        # Update bot_set and DB
-        bot_set.rclone_dest_path = text
         # Build final
         remote = getattr(bot_set, 'rclone_remote', '')
         if remote:
             final = f"{remote}:{text}" if text else f"{remote}:"
         else:
             final = text
-        bot_set.rclone_dest = final
-        set_db.set_variable('RCLONE_DEST_PATH', text)
-        set_db.set_variable('RCLONE_DEST', final)
+        # Update DB (bot_set follows)
+        await async_set_db.set_variables([
+            ('RCLONE_DEST_PATH', text, False, None),
+            ('RCLONE_DEST', final, False, None),
+        ])
         _dest_path_waiting.discard(user_id)
         await send_message(message, f"✅ Destination set to: <code>{final or '(unset)'}</code>")
     except Exception:
@@ -217,43 +207,12 @@ async def handle_dest_path_text(client, message: Message):
 
 # --- Browse-based destination path selection ---
 
-def _get_rclone_config_arg() -> str:
-    import os
-    from config import Config
-    try:
-        if getattr(Config, "RCLONE_CONFIG", None) and os.path.exists(Config.RCLONE_CONFIG):
-            return f'--config "{Config.RCLONE_CONFIG}"'
-    except Exception:
-        pass
-    for p in ("/workspace/rclone.conf", "rclone.conf"):
-        try:
-            if os.path.exists(p):
-                return f'--config "{p}"'
-        except Exception:
-            continue
-    return ""
-
 async def _list_remote_dirs(remote: str, path: str) -> list:
-    import asyncio
     remote = (remote or "").rstrip(":")
     norm_path = (path or "").strip("/")
     base = f"{remote}:" if norm_path == "" else f"{remote}:{norm_path}/"
-    cfg = _get_rclone_config_arg()
-    cmd = f'rclone lsf --dirs-only {cfg} "{base}"'
-    proc = await asyncio.create_subprocess_shell(
-        cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
-    )
-    out, err = await proc.communicate()
-    if proc.returncode != 0:
-        raise RuntimeError(err.decode().strip() or 'lsf failed')
-    names = []
-    for line in out.decode().splitlines():
-        name = line.strip().rstrip("/")
-        if name:
-            names.append(name)
-    return names
+    dirs, _ = await rclone_rc.list_dir(base)
+    return dirs
 
 async def _render_browse(client, cb_or_msg, path: str):
     # Ensure remote exists
@@ -390,12 +349,12 @@ async def rclone_dest_path_select_here_cb(client, cb:CallbackQuery):
         data = state.get('data', {})
         path = data.get('browse_path', '')
         # Persist
-        bot_set.rclone_dest_path = path
         remote = getattr(bot_set, 'rclone_remote', '')
         final = f"{remote}:{path}" if remote else path
-        bot_set.rclone_dest = final
-        set_db.set_variable('RCLONE_DEST_PATH', path)
-        set_db.set_variable('RCLONE_DEST', final)
+        await async_set_db.set_variables([
+            ('RCLONE_DEST_PATH', path, False, None),
+            ('RCLONE_DEST', final, False, None),
+        ])
         await rclone_panel_cb(client, cb)
 
 
@@ -410,8 +369,7 @@ async def upload_mode_cb(client, cb:CallbackQuery):
 
         current = modes.index(bot_set.upload_mode)
         nexti = (current + 1) % modes_count
-        bot_set.upload_mode = modes[nexti]
-        set_db.set_variable('UPLOAD_MODE', modes[nexti])
+        await async_set_db.set_variable('UPLOAD_MODE', modes[nexti])
         try:
             await core_cb(client, cb)
         except:
@@ -423,8 +381,7 @@ async def video_upload_type_cb(client, cb:CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
         try:
             # toggle
-            bot_set.video_as_document = not bool(getattr(bot_set, 'video_as_document', False))
-            set_db.set_variable('VIDEO_AS_DOCUMENT', bot_set.video_as_document)
+            await async_set_db.set_variable('VIDEO_AS_DOCUMENT', not bool(getattr(bot_set, 'video_as_document', False)))
         except Exception:
             pass
         try:
@@ -437,8 +394,7 @@ async def video_upload_type_cb(client, cb:CallbackQuery):
 async def toggle_extract_cover_cb(client, cb:CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
         try:
-            bot_set.extract_embedded_cover = not bool(getattr(bot_set, 'extract_embedded_cover', True))
-            set_db.set_variable('EXTRACT_EMBEDDED_COVER', bot_set.extract_embedded_cover)
+            await async_set_db.set_variable('EXTRACT_EMBEDDED_COVER', not bool(getattr(bot_set, 'extract_embedded_cover', True)))
         except Exception:
             pass
         try:
@@ -452,8 +408,7 @@ async def link_option_cb(client, cb:CallbackQuery):
         options = ['False', 'Index', 'RCLONE', 'Both']
         current = options.index(bot_set.link_options)
         nexti = (current + 1) % 4
-        bot_set.link_options = options[nexti]
-        set_db.set_variable('RCLONE_LINK_OPTIONS', options[nexti])
+        await async_set_db.set_variable('RCLONE_LINK_OPTIONS', options[nexti])
         try:
             await core_cb(client, cb)
         except:
@@ -463,10 +418,7 @@ async def link_option_cb(client, cb:CallbackQuery):
 @Client.on_callback_query(filters.regex(pattern=r"^albArt"))
 async def alb_art_cb(client, cb:CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
-        art_post = bot_set.art_poster
-        art_post = False if art_post else True
-        bot_set.art_poster = art_post
-        set_db.set_variable('ART_POSTER', art_post)
+        await async_set_db.set_variable('ART_POSTER', not bot_set.art_poster)
         try:
             await core_cb(client, cb)
         except:
@@ -475,10 +427,7 @@ async def alb_art_cb(client, cb:CallbackQuery):
 @Client.on_callback_query(filters.regex(pattern=r"^playCONC"))
 async def playlist_conc_cb(client, cb:CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
-        play_conc = bot_set.playlist_conc
-        play_conc = False if play_conc else True
-        bot_set.playlist_conc = play_conc
-        set_db.set_variable('PLAYLIST_CONCURRENT', play_conc)
+        await async_set_db.set_variable('PLAYLIST_CONCURRENT', not bot_set.playlist_conc)
         try:
             await core_cb(client, cb)
         except:
@@ -487,10 +436,7 @@ async def playlist_conc_cb(client, cb:CallbackQuery):
 @Client.on_callback_query(filters.regex(pattern=r"^artBATCH"))
 async def artist_conc_cb(client, cb:CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
-        artist_batch = bot_set.artist_batch
-        artist_batch = False if artist_batch else True
-        bot_set.artist_batch = artist_batch
-        set_db.set_variable('ARTIST_BATCH_UPLOAD', artist_batch)
+        await async_set_db.set_variable('ARTIST_BATCH_UPLOAD', not bot_set.artist_batch)
         try:
             await core_cb(client, cb)
         except:
@@ -499,10 +445,7 @@ async def artist_conc_cb(client, cb:CallbackQuery):
 @Client.on_callback_query(filters.regex(pattern=r"^sortPlay"))
 async def playlist_sort_cb(client, cb:CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
-        sort = bot_set.playlist_sort
-        sort = False if sort else True
-        bot_set.playlist_sort = sort
-        set_db.set_variable('PLAYLIST_SORT', sort)
+        await async_set_db.set_variable('PLAYLIST_SORT', not bot_set.playlist_sort)
         try:
             await core_cb(client, cb)
         except:
@@ -512,10 +455,7 @@ async def playlist_sort_cb(client, cb:CallbackQuery):
 @Client.on_callback_query(filters.regex(pattern=r"^playZip"))
 async def playlist_zip_cb(client, cb:CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
-        option = bot_set.playlist_zip
-        option = False if option else True
-        bot_set.playlist_zip = option
-        set_db.set_variable('PLAYLIST_ZIP', option)
+        await async_set_db.set_variable('PLAYLIST_ZIP', not bot_set.playlist_zip)
         try:
             await core_cb(client, cb)
         except:
@@ -525,10 +465,7 @@ async def playlist_zip_cb(client, cb:CallbackQuery):
 @Client.on_callback_query(filters.regex(pattern=r"^sortLinkPlay"))
 async def playlist_disable_zip_link(client, cb:CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
-        option = bot_set.disable_sort_link
-        option = False if option else True
-        bot_set.disable_sort_link = option
-        set_db.set_variable('PLAYLIST_LINK_DISABLE', option)
+        await async_set_db.set_variable('PLAYLIST_LINK_DISABLE', not bot_set.disable_sort_link)
         try:
             await core_cb(client, cb)
         except:
@@ -538,10 +475,7 @@ async def playlist_disable_zip_link(client, cb:CallbackQuery):
 @Client.on_callback_query(filters.regex(pattern=r"^artZip"))
 async def artist_zip_cb(client, cb:CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
-        option = bot_set.artist_zip
-        option = False if option else True
-        bot_set.artist_zip = option
-        set_db.set_variable('ARTIST_ZIP', option)
+        await async_set_db.set_variable('ARTIST_ZIP', not bot_set.artist_zip)
         try:
             await core_cb(client, cb)
         except:
@@ -552,8 +486,7 @@ async def artist_zip_cb(client, cb:CallbackQuery):
 async def toggle_safe_zip_names_cb(client, cb:CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
         try:
-            bot_set.zip_name_use_underscores = not bool(getattr(bot_set, 'zip_name_use_underscores', True))
-            set_db.set_variable('ZIP_NAME_USE_UNDERSCORES', bot_set.zip_name_use_underscores)
+            await async_set_db.set_variable('ZIP_NAME_USE_UNDERSCORES', not bool(getattr(bot_set, 'zip_name_use_underscores', True)))
         except Exception:
             pass
         try:
@@ -565,10 +498,7 @@ async def toggle_safe_zip_names_cb(client, cb:CallbackQuery):
 @Client.on_callback_query(filters.regex(pattern=r"^albZip"))
 async def album_zip_cb(client, cb:CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
-        option = bot_set.album_zip
-        option = False if option else True
-        bot_set.album_zip = option
-        set_db.set_variable('ALBUM_ZIP', option)
+        await async_set_db.set_variable('ALBUM_ZIP', not bot_set.album_zip)
         try:
             await core_cb(client, cb)
         except:
@@ -622,12 +552,12 @@ async def ban(client:Client, msg:Message):
         if user:
             if id in bot_set.auth_users:
                 bot_set.auth_users.remove(id)
-                set_db.set_variable('AUTH_USERS', str(bot_set.auth_users))
+                await async_set_db.set_variable('AUTH_USERS', str(bot_set.auth_users))
             else: await send_message(msg, lang.s.USER_DOEST_EXIST)
         else:
             if id in bot_set.auth_chats:
                 bot_set.auth_chats.remove(id)
-                set_db.set_variable('AUTH_CHATS', str(bot_set.auth_chats))
+                await async_set_db.set_variable('AUTH_CHATS', str(bot_set.auth_chats))
             else: await send_message(msg, lang.s.USER_DOEST_EXIST)
         await send_message(msg, lang.s.BAN_ID)
         
@@ -645,12 +575,12 @@ async def auth(client:Client, msg:Message):
         if user:
             if id not in bot_set.auth_users:
                 bot_set.auth_users.append(id)
-                set_db.set_variable('AUTH_USERS', str(bot_set.auth_users))
+                await async_set_db.set_variable('AUTH_USERS', str(bot_set.auth_users))
             else: await send_message(msg, lang.s.USER_EXIST)
         else:
             if id not in bot_set.auth_chats:
                 bot_set.auth_chats.append(id)
-                set_db.set_variable('AUTH_CHATS', str(bot_set.auth_chats))
+                await async_set_db.set_variable('AUTH_CHATS', str(bot_set.auth_chats))
             else: await send_message(msg, lang.s.USER_EXIST)
         await send_message(msg, lang.s.AUTH_ID)
 
@@ -665,6 +595,33 @@ async def send_log(client:Client, msg:Message):
             'doc'
         )
 
+@Client.on_message(filters.command(CMD.FILECACHE))
+async def file_cache_cmd(client:Client, msg:Message):
+    if await check_user(msg.from_user.id, restricted=True):
+        from ..helpers.file_cache import file_cache
+        parts = msg.text.split()
+        if len(parts) > 1 and parts[1].lower() == 'clear':
+            if len(parts) > 2:
+                key = file_cache.key(parts[2])
+                if not key:
+                    return await send_message(msg, "Unsupported link.")
+                removed = await file_cache.invalidate(key[0], key[1])
+            else:
+                removed = await file_cache.invalidate()
+            return await send_message(msg, f"Removed <code>{removed}</code> cached file(s).")
+        stats = await file_cache.stats()
+        await send_message(
+            msg,
+            "<b>File cache</b>\n"
+            f"Enabled: <code>{file_cache.enabled()}</code>\n"
+            f"Contents: <code>{stats['contents']}</code>\n"
+            f"Files: <code>{stats['files']}</code> ({stats['bytes'] / (1024 ** 3):.2f} GB)\n"
+            f"Total hits: <code>{stats['hits']}</code>\n"
+            f"Since restart: <code>{stats['session_hits']}</code> hits, <code>{stats['session_misses']}</code> misses "
+            f"({stats['hit_rate']:.0%})\n\n"
+            "<code>/filecache clear [link]</code> to drop entries"
+        )
+
 @Client.on_callback_query(filters.regex(pattern=r"^rcloneCloudCopyStart$"))
 async def rclone_cloud_copy_start_cb(client, cb:CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
@@ -673,15 +630,10 @@ async def rclone_cloud_copy_start_cb(client, cb:CallbackQuery):
             return await edit_message(cb.message, "rclone.conf not found.", markup=rclone_buttons())
         # List remotes to start picking source
         try:
-            proc = await asyncio.create_subprocess_shell(
-                'rclone listremotes --config ./rclone.conf | cat',
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            out, err = await proc.communicate()
-            if proc.returncode != 0:
-                return await edit_message(cb.message, f"Failed to list remotes:\n<code>{err.decode().strip()}</code>", markup=rclone_buttons())
-            remotes = [r.strip(':') for r in out.decode().splitlines() if r.strip()]
+            try:
+                remotes = await rclone_rc.list_remotes()
+            except rclone_rc.RcloneError as e:
+                return await edit_message(cb.message, f"Failed to list remotes:\n<code>{e}</code>", markup=rclone_buttons())
             if not remotes:
                 return await edit_message(cb.message, "No remotes configured.", markup=rclone_buttons())
             from ..helpers.state import conversation_state
@@ -710,35 +662,9 @@ async def rclone_cc_pick_src_remote(client, cb:CallbackQuery):
         await _rclone_cc_render_browse(client, cb, which='src', include_files=True)
 
 async def _rclone_cc_list(remote: str, path: str, include_files: bool):
-    import asyncio
-    # Directories
-    cfg = _get_rclone_config_arg()
     base = f"{remote}:{path.strip('/')}/" if path else f"{remote}:"
-    cmd_dirs = f'rclone lsf --dirs-only {cfg} "{base}"'
-    proc = await asyncio.create_subprocess_shell(
-        cmd_dirs,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
-    )
-    out_d, err_d = await proc.communicate()
-    if proc.returncode != 0:
-        raise RuntimeError(err_d.decode().strip() or 'lsf dirs failed')
-    dirs = [line.strip().rstrip('/') for line in out_d.decode().splitlines() if line.strip()]
-    files = []
-    if include_files:
-        cmd_files = f'rclone lsf --files-only {cfg} "{base}"'
-        p2 = await asyncio.create_subprocess_shell(
-            cmd_files,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        out_f, err_f = await p2.communicate()
-        if p2.returncode != 0:
-            # If file listing fails, keep dirs at least
-            files = []
-        else:
-            files = [line.strip() for line in out_f.decode().splitlines() if line.strip()]
-    return dirs, files
+    dirs, files = await rclone_rc.list_dir(base)
+    return dirs, (files if include_files else [])
 
 async def _rclone_cc_render_browse(client, cb_or_msg, which: str, include_files: bool):
     from ..helpers.state import conversation_state
@@ -897,15 +823,10 @@ async def rclone_cc_select_folder_cb(client, cb:CallbackQuery):
 async def _rclone_cc_pick_destination_remote(client, cb:CallbackQuery):
     # List remotes again for destination
     try:
-        proc = await asyncio.create_subprocess_shell(
-            'rclone listremotes --config ./rclone.conf | cat',
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        out, err = await proc.communicate()
-        if proc.returncode != 0:
-            return await edit_message(cb.message, f"Failed to list remotes:\n<code>{err.decode().strip()}</code>", markup=rclone_buttons())
-        remotes = [r.strip(':') for r in out.decode().splitlines() if r.strip()]
+        try:
+            remotes = await rclone_rc.list_remotes()
+        except rclone_rc.RcloneError as e:
+            return await edit_message(cb.message, f"Failed to list remotes:\n<code>{e}</code>", markup=rclone_buttons())
         if not remotes:
             return await edit_message(cb.message, "No remotes configured.", markup=rclone_buttons())
         from ..helpers.state import conversation_state
@@ -926,13 +847,10 @@ async def rclone_cc_pick_dst_remote(client, cb:CallbackQuery):
         except Exception:
             idx = -1
         # Re-list remotes to map index
-        proc = await asyncio.create_subprocess_shell(
-            'rclone listremotes --config ./rclone.conf | cat',
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        out, _ = await proc.communicate()
-        remotes = [r.strip(':') for r in out.decode().splitlines() if r.strip()]
+        try:
+            remotes = await rclone_rc.list_remotes()
+        except rclone_rc.RcloneError:
+            remotes = []
         if idx < 0 or idx >= len(remotes):
             return await _rclone_cc_pick_destination_remote(client, cb)
         dst_remote = remotes[idx]
@@ -990,7 +908,6 @@ async def rclone_cc_do_copy(client, cb:CallbackQuery):
         src_remote = data.get('src_remote')
         dst_remote = data.get('dst_remote')
         dst_path = data.get('dst_path', '')
-        cfg = _get_rclone_config_arg()
         # Build list of sources
         srcs = []
         types = {}
@@ -1021,19 +938,11 @@ async def rclone_cc_do_copy(client, cb:CallbackQuery):
             is_dir = (types.get(s) == 'dir')
             base_name = s.strip('/').split('/')[-1] if s else ''
             dst_specific = dst_full_base.rstrip('/') + (f"/{base_name}" if is_dir and base_name else '')
-            proc = await asyncio.create_subprocess_shell(
-                f'rclone {cmd} {cfg} "{src_remote}:{s}" "{dst_specific}"',
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            out, err = await proc.communicate()
-            if proc.returncode == 0:
+            try:
+                await rclone_rc.copy(f"{src_remote}:{s}", dst_specific, move=(cmd == 'move'))
                 successes += 1
-            else:
-                try:
-                    failures.append(f"{base_name or s}: {(err.decode().strip() or out.decode().strip())}")
-                except Exception:
-                    failures.append(f"{base_name or s}: failed")
+            except rclone_rc.RcloneError as e:
+                failures.append(f"{base_name or s}: {e or 'failed'}")
         if failures:
             fail_text = "\n".join([f"• <code>{f}</code>" for f in failures[:5]])
             more = f"\n(and {len(failures)-5} more)" if len(failures) > 5 else ""
@@ -1041,23 +950,6 @@ async def rclone_cc_do_copy(client, cb:CallbackQuery):
         else:
             await edit_message(cb.message, f"✅ {cmd.capitalize()} completed for {successes} item(s).", rclone_buttons())
 
-# Reuse existing helper to get rclone config arg
-def _get_rclone_config_arg() -> str:
-    import os
-    from config import Config
-    try:
-        if getattr(Config, "RCLONE_CONFIG", None) and os.path.exists(Config.RCLONE_CONFIG):
-            return f'--config "{Config.RCLONE_CONFIG}"'
-    except Exception:
-        pass
-    for p in ("/workspace/rclone.conf", "rclone.conf"):
-        try:
-            if os.path.exists(p):
-                return f'--config "{p}"'
-        except Exception:
-            continue
-    return ""
-
 @Client.on_callback_query(filters.regex(pattern=r"^rcloneCcPage\|"))
 async def rclone_cc_page_cb(client, cb:CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
@@ -1169,7 +1061,6 @@ async def rclone_cc_do_copy(client, cb:CallbackQuery):
         src_remote = data.get('src_remote')
         dst_remote = data.get('dst_remote')
         dst_path = data.get('dst_path', '')
-        cfg = _get_rclone_config_arg()
         # Build list of sources
         srcs = []
         types = {}
@@ -1200,19 +1091,11 @@ async def rclone_cc_do_copy(client, cb:CallbackQuery):
             is_dir = (types.get(s) == 'dir')
             base_name = s.strip('/').split('/')[-1] if s else ''
             dst_specific = dst_full_base.rstrip('/') + (f"/{base_name}" if is_dir and base_name else '')
-            proc = await asyncio.create_subprocess_shell(
-                f'rclone {cmd} {cfg} "{src_remote}:{s}" "{dst_specific}"',
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            out, err = await proc.communicate()
-            if proc.returncode == 0:
+            try:
+                await rclone_rc.copy(f"{src_remote}:{s}", dst_specific, move=(cmd == 'move'))
                 successes += 1
-            else:
-                try:
-                    failures.append(f"{base_name or s}: {(err.decode().strip() or out.decode().strip())}")
-                except Exception:
-                    failures.append(f"{base_name or s}: failed")
+            except rclone_rc.RcloneError as e:
+                failures.append(f"{base_name or s}: {e or 'failed'}")
         if failures:
             fail_text = "\n".join([f"• <code>{f}</code>" for f in failures[:5]])
             more = f"\n(and {len(failures)-5} more)" if len(failures) > 5 else ""
@@ -1227,15 +1110,10 @@ async def rclone_cloud_move_start_cb(client, cb:CallbackQuery):
         if not os.path.exists('rclone.conf'):
             return await edit_message(cb.message, "rclone.conf not found.", markup=rclone_buttons())
         try:
-            proc = await asyncio.create_subprocess_shell(
-                'rclone listremotes --config ./rclone.conf | cat',
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            out, err = await proc.communicate()
-            if proc.returncode != 0:
-                return await edit_message(cb.message, f"Failed to list remotes:\n<code>{err.decode().strip()}</code>", markup=rclone_buttons())
-            remotes = [r.strip(':') for r in out.decode().splitlines() if r.strip()]
+            try:
+                remotes = await rclone_rc.list_remotes()
+            except rclone_rc.RcloneError as e:
+                return await edit_message(cb.message, f"Failed to list remotes:\n<code>{e}</code>", markup=rclone_buttons())
             if not remotes:
                 return await edit_message(cb.message, "No remotes configured.", markup=rclone_buttons())
             from ..helpers.state import conversation_state
@@ -1251,7 +1129,7 @@ async def rclone_manage_start_cb(client, cb:CallbackQuery):
     if not await check_user(cb.from_user.id, restricted=True):
         return
 
-    from ..helpers.database.pg_impl import rclone_sessions_db
+    from ..helpers.database.pg_impl import async_rclone_sessions_db
     from ..helpers.state import conversation_state
 
     try:
@@ -1263,7 +1141,7 @@ async def rclone_manage_start_cb(client, cb:CallbackQuery):
         return await cb.answer("Invalid button.", show_alert=True)
 
     # Get the session context from the database
-    ctx = rclone_sessions_db.get_session(token)
+    ctx = await async_rclone_sessions_db.get_session(token)
 
     if not ctx:
         # Fallback for old conversation_state method during transition
@@ -1280,7 +1158,7 @@ async def rclone_manage_start_cb(client, cb:CallbackQuery):
         )
 
     # Clean up the one-time session token from the database if it exists there
-    rclone_sessions_db.delete_session(token)
+    await async_rclone_sessions_db.delete_session(token)
 
     # Proceed with the original logic, using the context from the DB
     src_remote = ctx.get('src_remote')
@@ -1325,9 +1203,8 @@ async def toggle_queue_mode_cb(client, cb:CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
         try:
             from ..settings import bot_set
-            from ..helpers.database.pg_impl import set_db
-            bot_set.queue_mode = not bool(getattr(bot_set, 'queue_mode', False))
-            set_db.set_variable('QUEUE_MODE', bot_set.queue_mode)
+            from ..helpers.database.pg_impl import async_set_db
+            await async_set_db.set_variable('QUEUE_MODE', not bool(getattr(bot_set, 'queue_mode', False)))
         except Exception:
             pass
         try:
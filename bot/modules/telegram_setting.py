@@ -6,7 +6,7 @@ from pyrogram.types import CallbackQuery, Message
 from ..settings import bot_set
 from ..helpers.translations import lang_available
 from ..helpers.buttons.settings import *
-from ..helpers.database.pg_impl import set_db
+from ..helpers.database.pg_impl import async_set_db
 from ..helpers.message import edit_message, check_user, send_message, fetch_user_details
 from ..helpers.state import conversation_state
 from config import Config
@@ -34,8 +34,7 @@ async def tg_cb(c, cb:CallbackQuery):
 @Client.on_callback_query(filters.regex(pattern=r"^botPublic"))
 async def bot_public_cb(client, cb:CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
-        bot_set.bot_public = False if bot_set.bot_public else True
-        set_db.set_variable('BOT_PUBLIC', bot_set.bot_public)
+        await async_set_db.set_variable('BOT_PUBLIC', not bot_set.bot_public)
         try:
             await tg_cb(client, cb)
         except:
@@ -48,8 +47,7 @@ async def anti_spam_cb(client, cb:CallbackQuery):
         anti = ['OFF', 'USER', 'CHAT+']
         current = anti.index(bot_set.anti_spam)
         nexti = (current + 1) % 3
-        bot_set.anti_spam = anti[nexti]
-        set_db.set_variable('ANTI_SPAM', anti[nexti])
+        await async_set_db.set_variable('ANTI_SPAM', anti[nexti])
         try:
             await tg_cb(client, cb)
         except:
@@ -73,9 +71,7 @@ async def language_panel_cb(client, cb:CallbackQuery):
 async def set_language_cb(client, cb:CallbackQuery):
     if await check_user(cb.from_user.id, restricted=True):
         to_set = cb.data.split('_')[1]
-        bot_set.bot_lang = to_set
-        set_db.set_variable('BOT_LANGUAGE', to_set)
-        bot_set.set_language()
+        await async_set_db.set_variable('BOT_LANGUAGE', to_set)
         try:
             await language_panel_cb(client, cb)
         except:
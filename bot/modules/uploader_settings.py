@@ -3,13 +3,13 @@ from pyrogram import Client, filters
 from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
 
 from bot import CMD
-from ..helpers.database.pg_impl import user_set_db
+from ..helpers.database.pg_impl import async_user_set_db
 from config import Config
 
 
 async def _get_main_settings_payload(user_id: int):
     """Generates the text and buttons for the main uploader settings panel."""
-    default_uploader, _ = user_set_db.get_user_setting(user_id, 'default_uploader')
+    default_uploader, _ = await async_user_set_db.get_user_setting(user_id, 'default_uploader')
     if not default_uploader:
         default_uploader = "Telegram"
 
@@ -29,9 +29,9 @@ async def _get_main_settings_payload(user_id: int):
 
 async def _get_gdrive_settings_payload(user_id: int):
     """Generates the text and buttons for the GDrive settings panel."""
-    gdrive_id, _ = user_set_db.get_user_setting(user_id, 'gdrive_id')
-    index_url, _ = user_set_db.get_user_setting(user_id, 'index_url')
-    stop_duplicate, _ = user_set_db.get_user_setting(user_id, 'stop_duplicate')
+    gdrive_id, _ = await async_user_set_db.get_user_setting(user_id, 'gdrive_id')
+    index_url, _ = await async_user_set_db.get_user_setting(user_id, 'index_url')
+    stop_duplicate, _ = await async_user_set_db.get_user_setting(user_id, 'stop_duplicate')
 
     # Fallback to config values if not set by the user
     gdrive_id = gdrive_id or Config.GDRIVE_ID or "Not Set"
@@ -62,8 +62,8 @@ async def _get_gdrive_settings_payload(user_id: int):
 
 async def _get_rclone_settings_payload(user_id: int):
     """Generates the text and buttons for the Rclone settings panel."""
-    rclone_dest, _ = user_set_db.get_user_setting(user_id, 'rclone_dest')
-    rclone_flags, _ = user_set_db.get_user_setting(user_id, 'rclone_flags')
+    rclone_dest, _ = await async_user_set_db.get_user_setting(user_id, 'rclone_dest')
+    rclone_flags, _ = await async_user_set_db.get_user_setting(user_id, 'rclone_flags')
 
     # Fallback to config values if not set by the user
     rclone_dest = rclone_dest or Config.RCLONE_DEST or "Not Set"
@@ -124,7 +124,7 @@ async def uploader_settings_callbacks(client: Client, callback_query: CallbackQu
 
     elif data.startswith("us_set_default_"):
         new_default = data.split("_")[-1]
-        user_set_db.set_user_setting(user_id, 'default_uploader', new_default)
+        await async_user_set_db.set_user_setting(user_id, 'default_uploader', new_default)
         await callback_query.answer(f"Default uploader set to {new_default.capitalize()}", show_alert=True)
         text, buttons = await _get_main_settings_payload(user_id)
         await message.edit_text(text, reply_markup=buttons)
@@ -147,10 +147,10 @@ async def uploader_settings_callbacks(client: Client, callback_query: CallbackQu
         await message.reply_text("Send your Index URL here.")
 
     elif data == "us_gdrive_toggle_duplicate":
-        stop_duplicate, _ = user_set_db.get_user_setting(user_id, 'stop_duplicate')
+        stop_duplicate, _ = await async_user_set_db.get_user_setting(user_id, 'stop_duplicate')
         if stop_duplicate is None: stop_duplicate = True
         new_state = not stop_duplicate
-        user_set_db.set_user_setting(user_id, 'stop_duplicate', new_state)
+        await async_user_set_db.set_user_setting(user_id, 'stop_duplicate', new_state)
         await callback_query.answer(f"Stop Duplicate has been {'Enabled' if new_state else 'Disabled'}.", show_alert=True)
         text, buttons = await _get_gdrive_settings_payload(user_id)
         await message.edit_text(text, reply_markup=buttons)
@@ -226,7 +226,7 @@ async def handle_config_uploads(client: Client, message: Message):
         return
 
     if setting_name and setting_value:
-        user_set_db.set_user_setting(user_id, setting_name, setting_value, is_blob=False)
+        await async_user_set_db.set_user_setting(user_id, setting_name, setting_value, is_blob=False)
         await message.reply_text(success_message)
     else:
         await message.reply_text("❌ No value received.")
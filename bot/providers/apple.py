@@ -6,15 +6,23 @@ import shutil
 from bot.helpers.utils import (
     run_apple_downloader,
     extract_apple_metadata,
+    extract_metadata_batch,
     send_message,
     edit_message,
     format_string,
     cleanup,
     list_apple_output_files,
-    cleanup_apple_global
+    cleanup_apple_global,
+    get_apple_task_root,
+    get_apple_task_config_path
 )
-from bot.helpers.uploader import track_upload, album_upload, music_video_upload, artist_upload, playlist_upload
-from bot.helpers.database.pg_impl import download_history
+from bot.helpers.uploader import track_upload, album_upload, music_video_upload, artist_upload, playlist_upload, \
+    queue_track_upload, remove_tracks
+from bot.helpers.database.pg_impl import async_download_history
+from bot.helpers.message import TrackSends, mark_incomplete
+from bot.helpers.pipeline import Pipeline
+from bot.helpers.tasks import task_manager, reached_stage, STAGE_DOWNLOADED
+from bot.settings import bot_set
 from config import Config
 from bot.logger import LOGGER
 
@@ -35,11 +43,26 @@ class AppleMusicProvider:
         """Extract Apple Music content ID from URL"""
         match = re.search(r'/(album|song|playlist|music-video|artist)/[^/]+/(\d+)', url)
         return match.group(2) if match else "unknown"
+
+    def stream_type(self, url: str) -> str | None:
+        """
+        Content type to upload track by track while the downloader runs,
+        or None when the result has to be complete first (zips, Rclone, single items).
+        """
+        if bot_set.upload_mode != 'Telegram':
+            return None
+        match = re.search(r'/(album|playlist)/', url)
+        if not match or re.search(r'[?&]i=\d+', url):  # album link pointing at a single song
+            return None
+        kind = match.group(1)
+        if getattr(bot_set, f'apple_{kind}_zip', False):
+            return None
+        return kind
     
     async def process(self, url: str, user: dict, options: dict = None) -> dict:
         """Process Apple Music URL with options"""
-        # Create user-specific directory
-        user_dir = os.path.join(Config.LOCAL_STORAGE, str(user['user_id']), "Apple Music")
+        # Create task-specific directory (isolated output root for this download)
+        user_dir = get_apple_task_root(user)
         os.makedirs(user_dir, exist_ok=True)
         LOGGER.info(f"Created temporary working directory for Apple Music task: {user_dir}")
         
@@ -53,40 +76,51 @@ class AppleMusicProvider:
         user['progress'] = reporter
         await reporter.set_stage("Preparing")
         
-        # Download content
-        result = await run_apple_downloader(
-            url,
-            user_dir,
-            cmd_options,
-            user,
-            progress=reporter,
-            task_id=user.get('task_id'),
-            cancel_event=user.get('cancel_event')
-        )
-        if not result['success']:
-            LOGGER.error(f"Apple downloader failed: {result['error']}")
-            return result
-        
-        # Find downloaded files from global Apple folders (alac/atmos/aac)
-        files = list_apple_output_files()
-        
-        if not files:
-            LOGGER.error("No files found in global Apple output folders")
-            return {'success': False, 'error': "No files downloaded"}
-        
-        LOGGER.info(f"Found {len(files)} files in global Apple output folders")
+        # A job restored after a restart may have finished its download already
+        config_path = get_apple_task_config_path(user_dir)
+        files = list_apple_output_files(config_path=config_path) if reached_stage(user, STAGE_DOWNLOADED) else []
+        if files:
+            LOGGER.info(f"Resuming with {len(files)} files downloaded before the restart in {user_dir}")
+        else:
+            stream_type = self.stream_type(url)
+            if stream_type:
+                return await self.process_streamed(url, user, options, cmd_options, stream_type)
+
+            # Download content
+            result = await run_apple_downloader(
+                url,
+                user_dir,
+                cmd_options,
+                user,
+                progress=reporter,
+                task_id=user.get('task_id'),
+                cancel_event=user.get('cancel_event')
+            )
+            if not result['success']:
+                LOGGER.error(f"Apple downloader failed: {result['error']}")
+                return result
+
+            # Find downloaded files in this task's Apple folders (alac/atmos/aac)
+            files = list_apple_output_files(config_path=config_path)
+
+            if not files:
+                LOGGER.error(f"No files found in Apple output folders under {user_dir}")
+                return {'success': False, 'error': "No files downloaded"}
+
+            LOGGER.info(f"Found {len(files)} files in Apple output folders under {user_dir}")
+            await task_manager.checkpoint(user, STAGE_DOWNLOADED)
         
-        # Extract metadata
+        # Extract metadata (all files at once, in the metadata thread pool)
         items = []
-        for file_path in files:
-            try:
-                metadata = await extract_apple_metadata(file_path)
-                metadata['filepath'] = file_path
-                metadata['provider'] = self.name
-                items.append(metadata)
-                LOGGER.info(f"Processed file: {file_path}")
-            except Exception as e:
-                LOGGER.error(f"Metadata extraction failed for {file_path}: {str(e)}")
+        for file_path, metadata in zip(files, await extract_metadata_batch(files, extract_apple_metadata)):
+            if isinstance(metadata, Exception):
+                LOGGER.error(f"Metadata extraction failed for {file_path}: {str(metadata)}")
+                mark_incomplete(user)
+                continue
+            metadata['filepath'] = file_path
+            metadata['provider'] = self.name
+            items.append(metadata)
+            LOGGER.info(f"Processed file: {file_path}")
         
         # Handle case where no metadata was extracted
         if not items:
@@ -122,16 +156,80 @@ class AppleMusicProvider:
             content_type = 'album'
             folder_path = os.path.dirname(os.path.commonpath([i['filepath'] for i in items]))
         
+        return await self.finish(url, user, options, content_type, items, folder_path, has_video)
+
+    async def process_streamed(self, url: str, user: dict, options: dict, cmd_options: list, content_type: str) -> dict:
+        """
+        Download an album/playlist and upload each track as soon as the
+        downloader is done with it: finished files → metadata → upload,
+        connected by bounded queues. Tracks go up TG_UPLOAD_WORKERS at a
+        time, as albums of up to 10 with TG_MEDIA_GROUP (see TrackSends).
+        """
+        user_dir = get_apple_task_root(user)
+        cancel_event = user.get('cancel_event')
+        items = []
+
+        async def extract(file_path):
+            metadata = await extract_apple_metadata(file_path)
+            metadata['filepath'] = file_path
+            metadata['provider'] = self.name
+            LOGGER.info(f"Processed file: {file_path}")
+            return metadata
+
+        async def upload(metadata):
+            items.append(metadata)
+            await queue_track_upload(sends, metadata, user)
+            return metadata
+
+        sends = TrackSends(user, user['progress'], cancel_event)
+        try:
+            async with Pipeline((extract, 1), (upload, 1)) as pipe:
+                result = await run_apple_downloader(
+                    url,
+                    user_dir,
+                    cmd_options,
+                    user,
+                    progress=user['progress'],
+                    task_id=user.get('task_id'),
+                    cancel_event=cancel_event,
+                    on_file=pipe.put
+                )
+                # Nothing more goes up for a failed or cancelled download
+                if not result['success'] or (cancel_event and cancel_event.is_set()):
+                    await pipe.cancel()
+            if not result['success']:
+                LOGGER.error(f"Apple downloader failed: {result['error']}")
+                return result
+            await sends.join()
+        finally:
+            sends.cancel()
+            await remove_tracks(items)
+
+        if not items:
+            LOGGER.error(f"No files found in Apple output folders under {user_dir}")
+            return {'success': False, 'error': "No files downloaded"}
+
+        LOGGER.info(f"Uploaded {len(items)} files from {user_dir} while downloading")
+        folder_path = os.path.dirname(os.path.commonpath([i['filepath'] for i in items]))
+        has_video = any(i['filepath'].endswith(('.mp4', '.m4v', '.mov')) for i in items)
+        result = await self.finish(url, user, options, content_type, items, folder_path, has_video)
+        result['uploaded'] = True
+        return result
+
+    async def finish(self, url: str, user: dict, options: dict, content_type: str, items: list,
+                     folder_path: str, has_video: bool) -> dict:
+        """Record the download in history and build the result for start_apple."""
+        options = options or {}
         # Record download in history
         content_id = self.extract_content_id(url)
         quality = options.get('mv-max', Config.APPLE_ATMOS_QUALITY) if has_video else \
-                 options.get('alac-max', Config.APPLE_ALAC_QUALITY) if 'alac' in (options or {}) else \
+                 options.get('alac-max', Config.APPLE_ALAC_QUALITY) if 'alac' in options else \
                  options.get('atmos-max', Config.APPLE_ATMOS_QUALITY)
         
         # Use first item's title if album title is missing
         album_title = items[0].get('album', items[0]['title'])
         
-        download_history.record_download(
+        await async_download_history.record_download(
             user_id=user['user_id'],
             provider=self.name,
             content_type=content_type,
@@ -191,11 +289,15 @@ async def start_apple(link: str, user: dict, options: dict = None):
         # Process content with options
         result = await provider.process(link, user, options)
         if not result['success']:
+            # Streamed tracks may already be out; the rest never will
+            mark_incomplete(user)
             await edit_message(user['bot_msg'], f"❌ Error: {result['error']}")
             return
         
         # Process and upload content based on type
-        if result['type'] == 'track':
+        if result.get('uploaded'):
+            pass  # tracks already went up while downloading
+        elif result['type'] == 'track':
             await track_upload(result['items'][0], user)
         elif result['type'] == 'video':
             # Update label to show video emoji
@@ -218,9 +320,9 @@ async def start_apple(link: str, user: dict, options: dict = None):
             await user['progress'].set_stage("Finalizing")
         except Exception:
             pass
+        # Clean only the contents of this task's Apple output folders
+        cleanup_apple_global(get_apple_task_config_path(get_apple_task_root(user)))
         await cleanup(user)
-        # Clean only the contents of global Apple output folders
-        cleanup_apple_global()
         try:
             await user['progress'].set_stage("Done")
         except Exception:
@@ -235,6 +337,7 @@ async def start_apple(link: str, user: dict, options: dict = None):
         raise
     except Exception as e:
         logger.error(f"Apple Music error: {str(e)}", exc_info=True)
+        mark_incomplete(user)
         try:
             await user.get('progress', None).set_stage("Done")
         except Exception:
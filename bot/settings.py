@@ -41,6 +41,44 @@ def __decrypt_string__(string):
     except:
         return string
 
+# Settings mirrored 1:1 by a BotSettings attribute, kept in sync on every write
+_BOOL_SETTINGS = {
+    'BOT_PUBLIC': 'bot_public',
+    'ART_POSTER': 'art_poster',
+    'PLAYLIST_SORT': 'playlist_sort',
+    'PLAYLIST_LINK_DISABLE': 'disable_sort_link',
+    'ARTIST_BATCH_UPLOAD': 'artist_batch',
+    'PLAYLIST_CONCURRENT': 'playlist_conc',
+    'QUEUE_MODE': 'queue_mode',
+    'ALBUM_ZIP': 'album_zip',
+    'PLAYLIST_ZIP': 'playlist_zip',
+    'ARTIST_ZIP': 'artist_zip',
+    'ZIP_NAME_USE_UNDERSCORES': 'zip_name_use_underscores',
+    'VIDEO_AS_DOCUMENT': 'video_as_document',
+    'EXTRACT_EMBEDDED_COVER': 'extract_embedded_cover',
+    'APPLE_ALBUM_ZIP': 'apple_album_zip',
+    'APPLE_PLAYLIST_ZIP': 'apple_playlist_zip',
+    'TIDAL_NG_ALBUM_ZIP': 'tidal_ng_album_zip',
+    'TIDAL_NG_PLAYLIST_ZIP': 'tidal_ng_playlist_zip',
+    'APPLE_FLAGS_POPUP': 'apple_flags_popup',
+    'APPLE_CYCLE_PRESETS_ENABLED': 'apple_cycle_presets_enabled',
+    'TIDAL_NG_CYCLE_PRESETS_ENABLED': 'tidal_ng_cycle_presets_enabled',
+}
+_STR_SETTINGS = {
+    'ANTI_SPAM': 'anti_spam',
+    'UPLOAD_MODE': 'upload_mode',
+    'RCLONE_LINK_OPTIONS': 'link_options',
+    'RCLONE_REMOTE': 'rclone_remote',
+    'RCLONE_DEST_PATH': 'rclone_dest_path',
+    'RCLONE_DEST': 'rclone_dest',
+}
+# Apple settings also read straight from Config by the downloader helpers
+_APPLE_SETTINGS = {
+    'APPLE_DEFAULT_FORMAT': 'format',
+    'APPLE_ALAC_QUALITY': 'alac_quality',
+    'APPLE_ATMOS_QUALITY': 'atmos_quality',
+}
+
 class BotSettings:
     def __init__(self):
         # Apple-only build: remove other providers
@@ -161,6 +199,28 @@ class BotSettings:
         self.clients = []
         self.download_history = download_history
 
+        # Settings panels only write to set_db; this keeps the attributes current
+        set_db.subscribe(self._on_setting_changed)
+
+    def _on_setting_changed(self, var_name, value, blob):
+        """Apply a written setting to the live attributes and clients"""
+        if var_name in _BOOL_SETTINGS:
+            setattr(self, _BOOL_SETTINGS[var_name], _to_bool(value))
+        elif var_name in _STR_SETTINGS:
+            setattr(self, _STR_SETTINGS[var_name], value if value is not None else '')
+        elif var_name in _APPLE_SETTINGS:
+            setattr(Config, var_name, value)
+            key = _APPLE_SETTINGS[var_name]
+            self.apple[key] = value if key == 'format' else int(value)
+        elif var_name == 'BOT_LANGUAGE':
+            self.set_language()
+        elif var_name == 'QOBUZ_QUALITY' and self.qobuz:
+            self.qobuz.quality = int(value)
+        elif var_name == 'TIDAL_QUALITY':
+            tidalapi.quality = value
+        elif var_name == 'TIDAL_SPATIAL':
+            tidalapi.spatial = value
+
     def check_upload_mode(self):
         """Determine upload mode based on configuration"""
         if os.path.exists('rclone.conf'):
@@ -36,7 +36,9 @@ class Bot(Client):
             bot_token=Config.TG_BOT_TOKEN,
             plugins=plugins,
             workdir=Config.WORK_DIR,
-            workers=Config.MAX_WORKERS
+            workers=Config.MAX_WORKERS,
+            # one spare slot so a re-sent part never waits behind queued uploads
+            max_concurrent_transmissions=Config.TG_UPLOAD_WORKERS + 1
         )
 
     async def start(self):
@@ -58,10 +60,21 @@ class Bot(Client):
         except Exception:
             pass
 
+        # Resume queued / in-flight jobs persisted before a restart or crash
+        try:
+            from .modules.download import restore_queue
+            await restore_queue(self)
+        except Exception as e:
+            LOGGER.error(f"Queue restore failed: {e}")
+
         LOGGER.info("BOT : Started Successfully with Apple Music support")
 
     async def stop(self, *args):
         await super().stop()
         for client in bot_set.clients:
             await client.session.close()
+        from .helpers import http_client
+        await http_client.close()
+        from .helpers.rclone_rc import rclone_rc
+        await rclone_rc.stop()
         LOGGER.info('BOT : Exited Successfully!')
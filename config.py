@@ -20,11 +20,19 @@ class Config:
     BOT_USERNAME      = getenv("BOT_USERNAME")                             # Bot username (e.g. "@mybot")
     ADMINS            = set(int(x) for x in getenv("ADMINS", "").replace(",", " ").split())  if getenv("ADMINS") else set()  
                                                                              # Admin IDs (space or comma separated ints)
+    TG_UPLOAD_WORKERS = int(getenv("TG_UPLOAD_WORKERS", 3))                # Files uploaded to Telegram at the same time (int)
+    TG_SEND_RATE      = float(getenv("TG_SEND_RATE", 1))                   # Telegram sends per second, lowered on FloodWait (float)
+    TG_MEDIA_GROUP    = getenv("TG_MEDIA_GROUP", "True").lower() == "true" # Send album tracks as groups of up to 10 (True or False)
+    FILE_CACHE_ENABLED   = getenv("FILE_CACHE_ENABLED", "True").lower() == "true" # Re-send already uploaded files by file_id (True or False)
+    FILE_CACHE_MAX_FILES = int(getenv("FILE_CACHE_MAX_FILES", 50000))      # Cached file_ids kept, least recently used dropped first (int)
 
     # Database Configuration
     DATABASE_URL      = getenv("DATABASE_URL")                            # PostgreSQL or MongoDB URL
     DATABASE_TYPE     = getenv("DATABASE_TYPE", "postgres").lower()       # 'postgres' or 'mongodb'
     MONGODB_DATABASE  = getenv("MONGODB_DATABASE", None)                    # Optional: a specific database name for MongoDB
+    DB_POOL_SIZE      = int(getenv("DB_POOL_SIZE", 5))                     # Pooled DB connections / DB worker threads (int)
+    HTTP_POOL_SIZE    = int(getenv("HTTP_POOL_SIZE", 100))                 # Max open HTTP connections shared by all providers (int)
+    HTTP_POOL_PER_HOST = int(getenv("HTTP_POOL_PER_HOST", 16))             # Max open HTTP connections per host (int)
 
     # Working Directory
     UPLOAD_MODE       = getenv("UPLOAD_MODE", "Telegram")                  # Telegram, RCLONE, or Local
@@ -40,6 +48,10 @@ class Config:
     LEGACY_DOWNLOADS_FOLDER = getenv("LEGACY_DOWNLOADS_FOLDER", "DOWNLOADS")
     LEGACY_DOWNLOAD_BASE_DIR = LEGACY_WORK_DIR + LEGACY_DOWNLOADS_FOLDER
 
+    # Cover art cache shared by all providers (kept next to legacy downloads so covers can be hard-linked)
+    COVER_CACHE_DIR     = getenv("COVER_CACHE_DIR", LEGACY_WORK_DIR + "cover_cache")
+    COVER_CACHE_SIZE_MB = int(getenv("COVER_CACHE_SIZE_MB", 256))          # Evict least recently used covers above this size (int)
+
     # File/Folder Naming
     PLAYLIST_NAME_FORMAT = getenv("PLAYLIST_NAME_FORMAT", "{title} - Playlist")  
                                                                             # e.g. "{title} - Playlist"
@@ -53,6 +65,8 @@ class Config:
     GDRIVE_ID         = getenv("GDRIVE_ID")                                # GDrive folder ID
     IS_TEAM_DRIVE     = getenv("IS_TEAM_DRIVE", "False").lower() == "true" # True or False
     USE_SERVICE_ACCOUNTS = getenv("USE_SERVICE_ACCOUNTS", "False").lower() == "true" # True or False
+    GDRIVE_UPLOAD_WORKERS = int(getenv("GDRIVE_UPLOAD_WORKERS", 4))       # Files of a folder uploaded to GDrive at the same time (int)
+    GDRIVE_API_URL    = getenv("GDRIVE_API_URL")                           # Optional: other Drive API root, e.g. a local fake Drive for testing
     STOP_DUPLICATE    = getenv("STOP_DUPLICATE", "False").lower() == "true" # True or False
     INDEX_URL         = getenv("INDEX_URL")                                # Optional index base URL
 
@@ -65,6 +79,8 @@ class Config:
     RCLONE_SERVE_PORT = int(getenv("RCLONE_SERVE_PORT", 8080))             # Port for rclone serve
     RCLONE_SERVE_USER = getenv("RCLONE_SERVE_USER")                        # Username for rclone serve
     RCLONE_SERVE_PASS = getenv("RCLONE_SERVE_PASS")                        # Password for rclone serve
+    RCLONE_RC         = getenv("RCLONE_RC", "True").lower() == "true"      # Run rclone operations through a long-lived rclone rcd (True or False)
+    RCLONE_LIST_CACHE_TTL = int(getenv("RCLONE_LIST_CACHE_TTL", 120))      # Seconds a remote directory listing is reused by the browse menus (int)
 
     # Qobuz Configuration
     QOBUZ_EMAIL       = getenv("QOBUZ_EMAIL")                              # User email (string)
@@ -91,12 +107,21 @@ class Config:
     TIDAL_COUNTRY_CODE     = getenv("TIDAL_COUNTRY_CODE", "US")           # ISO country code (e.g. "US")
     TIDAL_QUALITY          = getenv("TIDAL_QUALITY")                      # LOW, HIGH, LOSSLESS, HI_RES
     TIDAL_SPATIAL          = getenv("TIDAL_SPATIAL")                      # OFF, ATMOS AC3 JOC, ATMOS AC4, Sony 360RA
+    TIDAL_SEGMENT_WORKERS  = int(getenv("TIDAL_SEGMENT_WORKERS", 8))      # DASH segments fetched in parallel (int)
+    TIDAL_NG_WORKERS       = int(getenv("TIDAL_NG_WORKERS", 2))           # Warm tidal-dl-ng processes; 0 runs the CLI per link (int)
     TIDAL_NG_DOWNLOAD_PATH = getenv("TIDAL_NG_DOWNLOAD_PATH")             # Optional: Custom download path for Tidal NG (legacy)
     # New: Env override for Tidal NG download_base_path (takes precedence over settings.json)
     TIDAL_NG_DOWNLOAD_BASE_PATH = getenv("TIDAL_NG_DOWNLOAD_BASE_PATH")
 
     # Concurrent Workers
     MAX_WORKERS      = int(getenv("MAX_WORKERS", 5))                       # Number of threads (int)
+    METADATA_WORKERS = int(getenv("METADATA_WORKERS", 4))                  # Files whose tags/covers are read at the same time (int)
+    PIPELINE_QUEUE_SIZE = int(getenv("PIPELINE_QUEUE_SIZE", 4))            # Finished tracks waiting for the next stage (int)
+
+    # Queue Mode Scheduler
+    QUEUE_WORKERS         = int(getenv("QUEUE_WORKERS", 1))                # Queued jobs run in parallel (int)
+    QUEUE_PROVIDER_LIMITS = getenv("QUEUE_PROVIDER_LIMITS", "")            # e.g. "apple:2,tidal:1,qobuz:2,deezer:2"
+    QUEUE_USER_WEIGHTS    = getenv("QUEUE_USER_WEIGHTS", "")               # Fair-share weights, e.g. "12345:2,67890:0.5"
 
     # Apple Music Configuration
     DOWNLOADER_PATH   = getenv("DOWNLOADER_PATH", "/usr/src/app/downloader/am_downloader.sh")  
@@ -1,6 +1,6 @@
-from httpx import AsyncClient
+from httpx import AsyncClient, Limits
 from apscheduler.triggers.interval import IntervalTrigger
-from asyncio import Lock, sleep
+from asyncio import Lock, Semaphore, gather, sleep
 from datetime import datetime, timedelta
 from feedparser import parse as feed_parse
 from functools import partial
@@ -12,7 +12,12 @@ from re import compile, I
 
 from .. import scheduler, rss_dict, LOGGER
 from ..core.config_manager import Config
-from ..helper.ext_utils.bot_utils import new_task, arg_parser, get_size_bytes
+from ..helper.ext_utils.bot_utils import (
+    new_task,
+    arg_parser,
+    get_size_bytes,
+    sync_to_async,
+)
 from ..helper.ext_utils.status_utils import get_readable_file_size
 from ..helper.ext_utils.db_handler import database
 from ..helper.ext_utils.exceptions import RssShutdownException
@@ -37,6 +42,63 @@ headers = {
     "Accept-Language": "en-US,en;q=0.5",
 }
 
+# Feed polling
+RSS_FETCH_LIMIT = 10  # feeds fetched at the same time
+RSS_MAX_BACKOFF = 4  # a quiet feed is polled at most every RSS_DELAY * RSS_MAX_BACKOFF
+RSS_SEND_INTERVAL = 3  # seconds between two rss messages in RSS_CHAT
+
+rss_client = None
+feed_state = {}
+send_lock = Lock()
+last_send = 0
+
+
+def get_rss_client():
+    global rss_client
+    if rss_client is None or rss_client.is_closed:
+        rss_client = AsyncClient(
+            headers=headers,
+            follow_redirects=True,
+            timeout=60,
+            verify=False,
+            limits=Limits(
+                max_connections=RSS_FETCH_LIMIT * 2,
+                max_keepalive_connections=RSS_FETCH_LIMIT,
+            ),
+        )
+    return rss_client
+
+
+async def fetch_feed(link, validators=None):
+    """
+    Download and parse a feed. With validators (etag/modified of the last
+    fetch) the request is conditional and None is returned when the feed
+    did not change. Returns (rss_d, validators) otherwise.
+    """
+    req_headers = {}
+    if validators:
+        if validators.get("etag"):
+            req_headers["If-None-Match"] = validators["etag"]
+        if validators.get("modified"):
+            req_headers["If-Modified-Since"] = validators["modified"]
+    tries = 0
+    while True:
+        try:
+            res = await get_rss_client().get(link, headers=req_headers)
+            break
+        except:
+            tries += 1
+            if tries > 3:
+                raise
+            continue
+    if res.status_code == 304:
+        return None
+    rss_d = await sync_to_async(feed_parse, res.content)
+    return rss_d, {
+        "etag": res.headers.get("etag"),
+        "modified": res.headers.get("last-modified"),
+    }
+
 
 async def rss_menu(event):
     user_id = event.from_user.id
@@ -133,12 +195,7 @@ async def rss_sub(_, message, pre_event):
             cmd = None
             stv = False
         try:
-            async with AsyncClient(
-                headers=headers, follow_redirects=True, timeout=60, verify=False
-            ) as client:
-                res = await client.get(feed_link)
-            html = res.text
-            rss_d = feed_parse(html)
+            rss_d, _ = await fetch_feed(feed_link)
             last_title = rss_d.entries[0]["title"]
             if rss_d.entries[0].get("size"):
                 size = int(rss_d.entries[0]["size"])
@@ -346,12 +403,7 @@ async def rss_get(_, message, pre_event):
                 msg = await send_message(
                     message, f"Getting the last <b>{count}</b> item(s) from {title}"
                 )
-                async with AsyncClient(
-                    headers=headers, follow_redirects=True, timeout=60, verify=False
-                ) as client:
-                    res = await client.get(data["link"])
-                html = res.text
-                rss_d = feed_parse(html)
+                rss_d, _ = await fetch_feed(data["link"])
                 item_info = ""
                 for item_num in range(count):
                     try:
@@ -658,6 +710,147 @@ Timeout: 60 sec. Argument -c for command and arguments
             await query.answer(text="Already Running!", show_alert=True)
 
 
+async def send_feed_message(feed_msg, rss_chat_id, rss_topic_id):
+    # Messages of all feeds share one pace so RSS_CHAT isn't flooded
+    global last_send
+    async with send_lock:
+        try:
+            await sleep(max(0, last_send + RSS_SEND_INTERVAL - time()))
+        except:
+            raise RssShutdownException("Rss Monitor Stopped!")
+        await send_rss(feed_msg, rss_chat_id, rss_topic_id)
+        last_send = time()
+
+
+def feed_due(user, title, data, now):
+    state = feed_state.get((user, title))
+    if state is None or state["link"] != data["link"]:
+        state = feed_state[(user, title)] = {
+            "link": data["link"],
+            "interval": Config.RSS_DELAY,
+            "last_poll": 0,
+            "validators": None,
+        }
+    # The monitor runs every RSS_DELAY; allow half a run of jitter
+    return now - state["last_poll"] >= state["interval"] - Config.RSS_DELAY / 2
+
+
+def feed_polled(user, title, changed):
+    """Poll busy feeds every RSS_DELAY, back off on quiet or failing ones."""
+    if state := feed_state.get((user, title)):
+        state["interval"] = (
+            Config.RSS_DELAY
+            if changed
+            else min(state["interval"] * 1.5, Config.RSS_DELAY * RSS_MAX_BACKOFF)
+        )
+
+
+async def poll_feed(user, title, data, semaphore, rss_chat_id, rss_topic_id):
+    state = feed_state[(user, title)]
+    state["last_poll"] = time()
+    changed = False
+    try:
+        async with semaphore:
+            result = await fetch_feed(data["link"], state["validators"])
+        if result is None:
+            return
+        rss_d, validators = result
+        try:
+            last_link = rss_d.entries[0]["links"][1]["href"]
+        except IndexError:
+            last_link = rss_d.entries[0]["link"]
+        last_title = rss_d.entries[0]["title"]
+        if data["last_feed"] == last_link or data["last_title"] == last_title:
+            state["validators"] = validators
+            return
+        changed = True
+        feed_count = 0
+        while True:
+            try:
+                item_title = rss_d.entries[feed_count]["title"]
+                try:
+                    url = rss_d.entries[feed_count]["links"][1]["href"]
+                except IndexError:
+                    url = rss_d.entries[feed_count]["link"]
+                if data["last_feed"] == url or data["last_title"] == item_title:
+                    break
+                if rss_d.entries[feed_count].get("size"):
+                    size = int(rss_d.entries[feed_count]["size"])
+                elif rss_d.entries[feed_count].get("summary"):
+                    summary = rss_d.entries[feed_count]["summary"]
+                    matches = size_regex.findall(summary)
+                    sizes = [match[0] for match in matches]
+                    size = get_size_bytes(sizes[0])
+                else:
+                    size = 0
+            except IndexError:
+                LOGGER.warning(
+                    f"Reached Max index no. {feed_count} for this feed: {title}. Maybe you need to use less RSS_DELAY to not miss some torrents"
+                )
+                break
+            parse = True
+            for flist in data["inf"]:
+                if (
+                    data.get("sensitive", False)
+                    and all(x.lower() not in item_title.lower() for x in flist)
+                ) or (
+                    not data.get("sensitive", False)
+                    and all(x not in item_title for x in flist)
+                ):
+                    parse = False
+                    feed_count += 1
+                    break
+            if not parse:
+                continue
+            for flist in data["exf"]:
+                if (
+                    data.get("sensitive", False)
+                    and any(x.lower() in item_title.lower() for x in flist)
+                ) or (
+                    not data.get("sensitive", False)
+                    and any(x in item_title for x in flist)
+                ):
+                    parse = False
+                    feed_count += 1
+                    break
+            if not parse:
+                continue
+            if command := data["command"]:
+                if size and Config.RSS_SIZE_LIMIT and Config.RSS_SIZE_LIMIT < size:
+                    feed_count += 1
+                    continue
+                cmd = command.split(maxsplit=1)
+                cmd.insert(1, url)
+                feed_msg = " ".join(cmd)
+                if not feed_msg.startswith("/"):
+                    feed_msg = f"/{feed_msg}"
+            else:
+                feed_msg = f"<b>Name: </b><code>{item_title.replace('>', '').replace('<', '')}</code>"
+                feed_msg += f"\n\n<b>Link: </b><code>{url}</code>"
+                if size:
+                    feed_msg += f"\n<b>Size: </b>{get_readable_file_size(size)}"
+            feed_msg += f"\n<b>Tag: </b><code>{data['tag']}</code> <code>{user}</code>"
+            await send_feed_message(feed_msg, rss_chat_id, rss_topic_id)
+            feed_count += 1
+        async with rss_dict_lock:
+            if user not in rss_dict or not rss_dict[user].get(title, False):
+                return
+            rss_dict[user][title].update(
+                {"last_feed": last_link, "last_title": last_title}
+            )
+        await database.rss_update(user)
+        # Only skip unchanged content once it has been handled
+        state["validators"] = validators
+        LOGGER.info(f"Feed Name: {title}")
+        LOGGER.info(f"Last item: {last_link}")
+    except RssShutdownException as ex:
+        LOGGER.info(ex)
+    except Exception as e:
+        LOGGER.error(f"{e} - Feed Name: {title} - Feed Link: {data['link']}")
+    finally:
+        feed_polled(user, title, changed)
+
+
 async def rss_monitor():
     chat = Config.RSS_CHAT
     if not chat:
@@ -667,7 +860,6 @@ async def rss_monitor():
     if len(rss_dict) == 0:
         scheduler.pause()
         return
-    all_paused = True
     rss_topic_id = rss_chat_id = None
     if isinstance(chat, int):
         rss_chat_id = chat
@@ -680,133 +872,27 @@ async def rss_monitor():
         )
     elif chat.lstrip("-").isdigit():
         rss_chat_id = int(chat)
-    for user, items in list(rss_dict.items()):
-        for title, data in items.items():
-            try:
-                if data["paused"]:
-                    continue
-                tries = 0
-                while True:
-                    try:
-                        async with AsyncClient(
-                            headers=headers,
-                            follow_redirects=True,
-                            timeout=60,
-                            verify=False,
-                        ) as client:
-                            res = await client.get(data["link"])
-                        html = res.text
-                        break
-                    except:
-                        tries += 1
-                        if tries > 3:
-                            raise
-                        continue
-                rss_d = feed_parse(html)
-                try:
-                    last_link = rss_d.entries[0]["links"][1]["href"]
-                except IndexError:
-                    last_link = rss_d.entries[0]["link"]
-                finally:
-                    all_paused = False
-                last_title = rss_d.entries[0]["title"]
-                if data["last_feed"] == last_link or data["last_title"] == last_title:
-                    continue
-                feed_count = 0
-                while True:
-                    try:
-                        await sleep(10)
-                    except:
-                        raise RssShutdownException("Rss Monitor Stopped!")
-                    try:
-                        item_title = rss_d.entries[feed_count]["title"]
-                        try:
-                            url = rss_d.entries[feed_count]["links"][1]["href"]
-                        except IndexError:
-                            url = rss_d.entries[feed_count]["link"]
-                        if data["last_feed"] == url or data["last_title"] == item_title:
-                            break
-                        if rss_d.entries[feed_count].get("size"):
-                            size = int(rss_d.entries[feed_count]["size"])
-                        elif rss_d.entries[feed_count].get("summary"):
-                            summary = rss_d.entries[feed_count]["summary"]
-                            matches = size_regex.findall(summary)
-                            sizes = [match[0] for match in matches]
-                            size = get_size_bytes(sizes[0])
-                        else:
-                            size = 0
-                    except IndexError:
-                        LOGGER.warning(
-                            f"Reached Max index no. {feed_count} for this feed: {title}. Maybe you need to use less RSS_DELAY to not miss some torrents"
-                        )
-                        break
-                    parse = True
-                    for flist in data["inf"]:
-                        if (
-                            data.get("sensitive", False)
-                            and all(x.lower() not in item_title.lower() for x in flist)
-                        ) or (
-                            not data.get("sensitive", False)
-                            and all(x not in item_title for x in flist)
-                        ):
-                            parse = False
-                            feed_count += 1
-                            break
-                    if not parse:
-                        continue
-                    for flist in data["exf"]:
-                        if (
-                            data.get("sensitive", False)
-                            and any(x.lower() in item_title.lower() for x in flist)
-                        ) or (
-                            not data.get("sensitive", False)
-                            and any(x in item_title for x in flist)
-                        ):
-                            parse = False
-                            feed_count += 1
-                            break
-                    if not parse:
-                        continue
-                    if command := data["command"]:
-                        if (
-                            size
-                            and Config.RSS_SIZE_LIMIT
-                            and Config.RSS_SIZE_LIMIT < size
-                        ):
-                            feed_count += 1
-                            continue
-                        cmd = command.split(maxsplit=1)
-                        cmd.insert(1, url)
-                        feed_msg = " ".join(cmd)
-                        if not feed_msg.startswith("/"):
-                            feed_msg = f"/{feed_msg}"
-                    else:
-                        feed_msg = f"<b>Name: </b><code>{item_title.replace('>', '').replace('<', '')}</code>"
-                        feed_msg += f"\n\n<b>Link: </b><code>{url}</code>"
-                        if size:
-                            feed_msg += f"\n<b>Size: </b>{get_readable_file_size(size)}"
-                    feed_msg += (
-                        f"\n<b>Tag: </b><code>{data['tag']}</code> <code>{user}</code>"
-                    )
-                    await send_rss(feed_msg, rss_chat_id, rss_topic_id)
-                    feed_count += 1
-                async with rss_dict_lock:
-                    if user not in rss_dict or not rss_dict[user].get(title, False):
-                        continue
-                    rss_dict[user][title].update(
-                        {"last_feed": last_link, "last_title": last_title}
-                    )
-                await database.rss_update(user)
-                LOGGER.info(f"Feed Name: {title}")
-                LOGGER.info(f"Last item: {last_link}")
-            except RssShutdownException as ex:
-                LOGGER.info(ex)
-                break
-            except Exception as e:
-                LOGGER.error(f"{e} - Feed Name: {title} - Feed Link: {data['link']}")
-                continue
-    if all_paused:
+    feeds = [
+        (user, title, data)
+        for user, items in list(rss_dict.items())
+        for title, data in list(items.items())
+    ]
+    for key in set(feed_state) - {(user, title) for user, title, _ in feeds}:
+        del feed_state[key]
+    active = [feed for feed in feeds if not feed[2]["paused"]]
+    if not active:
         scheduler.pause()
+        return
+    # Feeds are polled side by side, so a run takes as long as its slowest feed
+    now = time()
+    semaphore = Semaphore(RSS_FETCH_LIMIT)
+    await gather(
+        *(
+            poll_feed(user, title, data, semaphore, rss_chat_id, rss_topic_id)
+            for user, title, data in active
+            if feed_due(user, title, data, now)
+        )
+    )
 
 
 def add_job():
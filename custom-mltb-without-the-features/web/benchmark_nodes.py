@@ -0,0 +1,77 @@
+"""
+Benchmark of the file selector tree on synthetic torrents.
+
+    python -m web.benchmark_nodes [--files 100000]
+
+Builds the tree for a few torrent layouts, then compares the size of the
+full nested document (mode=get) with the first folder page.
+"""
+
+from argparse import ArgumentParser
+from json import dumps
+from random import Random
+from time import perf_counter
+from types import SimpleNamespace
+
+from web.nodes import build_tree
+
+
+def _file(index, path, rnd):
+    return SimpleNamespace(
+        name=path,
+        size=rnd.randint(1, 1 << 30),
+        priority=rnd.choice((0, 1)),
+        index=index,
+        progress=rnd.random(),
+    )
+
+
+def flat(files, rnd):
+    return [_file(i, f"Torrent/file_{i:06d}.bin", rnd) for i in range(files)]
+
+
+def wide(files, rnd):
+    return [
+        _file(i, f"Torrent/folder_{i % 1000:04d}/file_{i:06d}.bin", rnd)
+        for i in range(files)
+    ]
+
+
+def deep(files, rnd):
+    res = []
+    for i in range(files):
+        parts = [f"d{(i >> (3 * level)) % 8}" for level in range(6)]
+        res.append(_file(i, f"Torrent/{'/'.join(parts)}/file_{i:06d}.bin", rnd))
+    return res
+
+
+def timed(func, *args):
+    start = perf_counter()
+    result = func(*args)
+    return result, perf_counter() - start
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("--files", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(
+        f"{'layout':<8}{'build':>10}{'full json':>12}{'full size':>12}"
+        f"{'page json':>12}{'page size':>12}"
+    )
+    for layout in (flat, wide, deep):
+        res = layout(args.files, Random(0))
+        tree, build = timed(build_tree, res, "qbittorrent")
+        full, full_time = timed(lambda: dumps(tree.to_dict()))
+        top = tree.page()["files"][0]["id"]
+        page, page_time = timed(lambda: dumps(tree.page(top)))
+        print(
+            f"{layout.__name__:<8}{build:>9.3f}s{full_time:>11.3f}s"
+            f"{len(full) / 1048576:>10.1f}MB{page_time * 1000:>10.2f}ms"
+            f"{len(page) / 1024:>10.1f}KB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,30 @@
-from anytree import NodeMixin
+from itertools import count
 
+PAGE_SIZE = 200
+
+
+class TorNode:
+    """
+    A file or folder of a torrent/nzb. Subfolders are indexed by name, so
+    placing a file under a deep path costs one dict lookup per component
+    instead of a scan over all siblings.
+    """
+
+    __slots__ = (
+        "name",
+        "is_folder",
+        "is_file",
+        "parent",
+        "children",
+        "folders",
+        "fsize",
+        "priority",
+        "file_id",
+        "progress",
+        "file_count",
+        "selected_count",
+    )
 
-class TorNode(NodeMixin):
     def __init__(
         self,
         name,
@@ -13,21 +36,26 @@ class TorNode(NodeMixin):
         file_id=None,
         progress=None,
     ):
-        super().__init__()
         self.name = name
         self.is_folder = is_folder
         self.is_file = is_file
-
+        self.parent = None
+        self.children = []
+        self.folders = {}
+        self.fsize = size
+        self.priority = priority
+        self.file_id = file_id
+        self.progress = progress
+        self.file_count = 0
+        self.selected_count = 0
         if parent is not None:
-            self.parent = parent
-        if size is not None:
-            self.fsize = size
-        if priority is not None:
-            self.priority = priority
-        if file_id is not None:
-            self.file_id = file_id
-        if progress is not None:
-            self.progress = progress
+            parent.add(self)
+
+    def add(self, node):
+        node.parent = self
+        self.children.append(node)
+        if node.is_folder:
+            self.folders.setdefault(node.name, node)
 
 
 def qb_get_folders(path):
@@ -39,123 +67,144 @@ def get_folders(path, root_path):
     return fs.split("/")
 
 
-def make_tree(res, tool, root_path=""):
+class TorTree:
+    """
+    File tree of a download with folder totals (size, file and selected
+    counts) and folders indexed by id, so the selector can be served one
+    folder page at a time instead of as one nested document.
+    """
+
+    def __init__(self, engine, root_name):
+        self.engine = engine
+        self.root = TorNode(root_name)
+        self.folders = {}
+        self._folder_ids = count()
+
+    def folder_for(self, names):
+        """The folder at a path of folder names below the root, created as needed."""
+        node = self.root
+        for name in names:
+            child = node.folders.get(name)
+            if child is None:
+                child = TorNode(
+                    name, is_folder=True, parent=node, file_id=next(self._folder_ids)
+                )
+                self.folders[child.file_id] = child
+            node = child
+        return node
+
+    def add_file(self, path_parts, size, priority, file_id, progress):
+        TorNode(
+            path_parts[-1],
+            is_file=True,
+            parent=self.folder_for(path_parts[:-1]),
+            size=size,
+            priority=priority,
+            file_id=file_id,
+            progress=progress,
+        )
+
+    def finish(self):
+        """Compute folder totals; call once after all files are added."""
+        folders = [self.root, *self.folders.values()]
+        for folder in folders:
+            folder.fsize = 0
+            folder.file_count = 0
+            folder.selected_count = 0
+        for folder in folders:
+            for node in folder.children:
+                if node.is_file:
+                    folder.fsize += node.fsize
+                    folder.file_count += 1
+                    folder.selected_count += bool(node.priority)
+        # A subfolder always gets a higher id than its parent: fold totals upwards
+        for folder in reversed(self.folders.values()):
+            folder.parent.fsize += folder.fsize
+            folder.parent.file_count += folder.file_count
+            folder.parent.selected_count += folder.selected_count
+        return self
+
+    def to_dict(self):
+        return {"files": create_list(self.root), "engine": self.engine}
+
+    def page(self, folder_id=None, offset=0, limit=PAGE_SIZE):
+        """
+        One page of a folder's direct children. Folders come without their
+        content, with totals instead, and are opened with their own page.
+        Raises KeyError for an unknown folder id.
+        """
+        if folder_id in (None, ""):
+            folder = self.root
+        else:
+            folder = self.folders[int(str(folder_id).removeprefix("folderNode_"))]
+        offset = max(int(offset), 0)
+        limit = min(max(int(limit), 1), PAGE_SIZE)
+        parent = folder.parent
+        return {
+            "engine": self.engine,
+            "folder": None if folder is self.root else _folder_dict(folder),
+            "parent": (
+                f"folderNode_{parent.file_id}"
+                if parent is not None and parent is not self.root
+                else None
+            ),
+            "total": len(folder.children),
+            "offset": offset,
+            "limit": limit,
+            "files": [
+                _folder_dict(node) if node.is_folder else _file_dict(node)
+                for node in folder.children[offset : offset + limit]
+            ],
+        }
+
+
+def _file_progress(i, tool):
+    try:
+        if tool == "aria2":
+            return round((int(i["completedLength"]) / int(i["length"])) * 100, 5)
+        return round(
+            ((float(i["mb"]) - float(i["mbleft"])) / float(i["mb"])) * 100, 5
+        )
+    except:
+        return 0
+
+
+def build_tree(res, tool, root_path=""):
     if tool == "qbittorrent":
-        parent = TorNode("QBITTORRENT")
-        folder_id = 0
+        tree = TorTree(tool, "QBITTORRENT")
         for i in res:
-            folders = qb_get_folders(i.name)
-            if len(folders) > 1:
-                previous_node = parent
-                for j in range(len(folders) - 1):
-                    current_node = next(
-                        (k for k in previous_node.children if k.name == folders[j]),
-                        None,
-                    )
-                    if current_node is None:
-                        previous_node = TorNode(
-                            folders[j],
-                            is_folder=True,
-                            parent=previous_node,
-                            file_id=folder_id,
-                        )
-                        folder_id += 1
-                    else:
-                        previous_node = current_node
-                TorNode(
-                    folders[-1],
-                    is_file=True,
-                    parent=previous_node,
-                    size=i.size,
-                    priority=i.priority,
-                    file_id=i.index,
-                    progress=round(i.progress * 100, 5),
-                )
-            else:
-                TorNode(
-                    folders[-1],
-                    is_file=True,
-                    parent=parent,
-                    size=i.size,
-                    priority=i.priority,
-                    file_id=i.index,
-                    progress=round(i.progress * 100, 5),
-                )
+            tree.add_file(
+                qb_get_folders(i.name),
+                size=i.size,
+                priority=i.priority,
+                file_id=i.index,
+                progress=round(i.progress * 100, 5),
+            )
     elif tool == "aria2":
-        parent = TorNode("ARIA2")
-        folder_id = 0
+        tree = TorTree(tool, "ARIA2")
         for i in res:
-            folders = get_folders(i["path"], root_path)
-            priority = 1
-            if i["selected"] == "false":
-                priority = 0
-            if len(folders) > 1:
-                previous_node = parent
-                for j in range(len(folders) - 1):
-                    current_node = next(
-                        (k for k in previous_node.children if k.name == folders[j]),
-                        None,
-                    )
-                    if current_node is None:
-                        previous_node = TorNode(
-                            folders[j],
-                            is_folder=True,
-                            parent=previous_node,
-                            file_id=folder_id,
-                        )
-                        folder_id += 1
-                    else:
-                        previous_node = current_node
-                try:
-                    progress = round(
-                        (int(i["completedLength"]) / int(i["length"])) * 100, 5
-                    )
-                except:
-                    progress = 0
-                TorNode(
-                    folders[-1],
-                    is_file=True,
-                    parent=previous_node,
-                    size=int(i["length"]),
-                    priority=priority,
-                    file_id=i["index"],
-                    progress=progress,
-                )
-            else:
-                try:
-                    progress = round(
-                        (int(i["completedLength"]) / int(i["length"])) * 100, 5
-                    )
-                except:
-                    progress = 0
-                TorNode(
-                    folders[-1],
-                    is_file=True,
-                    parent=parent,
-                    size=int(i["length"]),
-                    priority=priority,
-                    file_id=i["index"],
-                    progress=progress,
-                )
+            tree.add_file(
+                get_folders(i["path"], root_path),
+                size=int(i["length"]),
+                priority=0 if i["selected"] == "false" else 1,
+                file_id=i["index"],
+                progress=_file_progress(i, tool),
+            )
     else:
-        parent = TorNode("SABNZBD+")
-        priority = 1
+        tree = TorTree(tool, "SABNZBD+")
         for i in res["files"]:
-            TorNode(
-                i["filename"],
-                is_file=True,
-                parent=parent,
+            tree.add_file(
+                [i["filename"]],
                 size=float(i["mb"]) * 1048576,
-                priority=priority,
+                priority=1,
                 file_id=i["nzf_id"],
-                progress=round(
-                    ((float(i["mb"]) - float(i["mbleft"])) / float(i["mb"])) * 100,
-                    5,
-                ),
+                progress=_file_progress(i, tool),
             )
+    return tree.finish()
+
 
-    result = create_list(parent)
-    return {"files": result, "engine": tool}
+def make_tree(res, tool, root_path=""):
+    return build_tree(res, tool, root_path).to_dict()
 
 
 """
@@ -166,6 +215,29 @@ def print_tree(parent):
 """
 
 
+def _file_dict(node):
+    return {
+        "id": node.file_id,
+        "name": node.name,
+        "size": node.fsize,
+        "type": "file",
+        "selected": bool(node.priority),
+        "progress": node.progress,
+    }
+
+
+def _folder_dict(node):
+    return {
+        "id": f"folderNode_{node.file_id}",
+        "name": node.name,
+        "type": "folder",
+        "size": node.fsize,
+        "fileCount": node.file_count,
+        "selectedCount": node.selected_count,
+        "childCount": len(node.children),
+    }
+
+
 def create_list(parent, contents=None):
     if contents is None:
         contents = []
@@ -178,20 +250,12 @@ def create_list(parent, contents=None):
                     "id": f"folderNode_{i.file_id}",
                     "name": i.name,
                     "type": "folder",
+                    "size": i.fsize,
                     "children": children,
                 }
             )
         else:
-            contents.append(
-                {
-                    "id": i.file_id,
-                    "name": i.name,
-                    "size": i.fsize,
-                    "type": "file",
-                    "selected": bool(i.priority),
-                    "progress": i.progress,
-                }
-            )
+            contents.append(_file_dict(i))
     return contents
 
 
@@ -14,16 +14,18 @@ CUSTOM_GO_BIN="$HOME/go-sdk/go/bin"
 SYSTEM_GO_BIN="/usr/local/go/bin"
 BINARY_PATH="$HOME/amalac/$CUSTOM_BINARY_NAME"
 PROJECT_DIR="$HOME/amalac"
+# Per-task run dir (mirrors PROJECT_DIR with its own config.yaml) set by the bot
+RUN_DIR="${AMDL_RUN_DIR:-$PROJECT_DIR}"
 
 # If we are using the binary → skip Go setup
 if [ "$USE_BINARY_EXECUTION" = true ]; then
     if [ -x "$BINARY_PATH" ]; then
-        cd "$PROJECT_DIR"
+        cd "$RUN_DIR"
         cmd=(
-            "./$CUSTOM_BINARY_NAME"
+            "$BINARY_PATH"
             "$@"
         )
-        echo "🚀 Executing compiled binary from: $PROJECT_DIR/$CUSTOM_BINARY_NAME"
+        echo "🚀 Executing compiled binary from: $BINARY_PATH (run dir: $RUN_DIR)"
     else
         echo "❌ Compiled binary not found at $BINARY_PATH"
         exit 1
@@ -56,8 +58,8 @@ else
         fi
     fi
 
-    # 🛠️ For go run, must cd into project dir
-    cd "$PROJECT_DIR"
+    # 🛠️ For go run, must cd into project dir (or its per-task mirror)
+    cd "$RUN_DIR"
     cmd=(
         go run main.go
         "$@"